@@ -0,0 +1,3 @@
+"""
+AXP Pipeline Benchmarks
+"""
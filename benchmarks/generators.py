@@ -0,0 +1,187 @@
+"""
+AXP Benchmark Data Generators
+Synthetic catalogs scaled from the shapes in examples/data
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Iterator
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[1] / 'examples' / 'data'
+
+RETURN_REASONS = ['size_issue', 'quality_expectation', 'changed_mind', 'color_mismatch', 'damaged']
+EVENT_TYPES = ['view_size_guide', 'view_3d', 'use_configurator', 'compare_products', 'read_guide', 'add_to_cart']
+GUIDE_TYPES = ['Running shoe guide', 'Basketball fit guide', 'Care guide']
+UTM_CAMPAIGNS = ['holiday_gifts', 'sport_summer', 'business_essentials', 'brand_awareness', '']
+UTM_TERMS = ['gift for runner', 'running shoes', 'travel sneakers', 'luxury leather', 'value pack', '']
+ITEM_CATEGORIES = ['running_shoes', 'running_socks', 'dress_shoes', 'dress_shirt', 'gift_card', 'accessories']
+MATERIAL_GRADES = ['premium', 'high', 'standard', 'basic']
+CERTIFICATIONS = ['bluesign', 'fair_trade', 'gots', 'b_corp', 'climate_neutral']
+
+
+def _load_jsonl(path: Path) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class SyntheticCatalog:
+    """
+    Deterministic synthetic products, reviews and pipeline inputs
+
+    Every generated product is one of the example catalog products with a new
+    ID and perturbed numbers, so record shapes and sizes match the examples.
+    Generation is streaming; nothing is kept in memory between records.
+    """
+
+    def __init__(self, seed: int = 42, as_of: datetime = datetime(2025, 9, 1)):
+        """
+        Args:
+            seed: Random seed; the same seed always yields the same data
+            as_of: Reference date for generated timestamps
+        """
+        self.seed = seed
+        self.as_of = as_of
+        self.products = [record['product'] for record in _load_jsonl(EXAMPLES_DIR / 'catalog_products.jsonl')]
+        self.reviews = _load_jsonl(EXAMPLES_DIR / 'ratings_reviews.jsonl')
+
+    def catalog_records(self, n: int) -> Iterator[Dict[str, Any]]:
+        """catalog_products.jsonl-style records ({"product": {...}}) with kpi_inputs and intent_sources"""
+        rng = random.Random(self.seed)
+        for i in range(n):
+            template = self.products[i % len(self.products)]
+            product_id = f"{template['id']}_{i:07d}"
+            product = {
+                **template,
+                'id': product_id,
+                'trust_signals': {
+                    **template.get('trust_signals', {}),
+                    'review_summary': self.review_summary(rng, template)
+                }
+            }
+            yield {
+                'product': product,
+                'category': template['breadcrumbs'][0].lower(),
+                'kpi_inputs': self.kpi_inputs(rng, template),
+                'intent_sources': self.intent_sources(rng)
+            }
+
+    def kpi_inputs(self, rng: random.Random, template: Dict) -> Dict[str, Any]:
+        """KPICalculator product_data seeded from a template product's specs and attributes"""
+        attributes = {a['code']: a['value'] for a in template.get('attributes', []) if a.get('type') == 'number'}
+        purchases = rng.randint(10, 5000)
+        returns_total = int(purchases * rng.uniform(0.02, 0.25))
+        review_count = rng.randint(5, 2000)
+        return {
+            'returns_total': returns_total,
+            'returns_size': int(returns_total * rng.uniform(0.1, 0.6)),
+            'exchanges_size': int(purchases * rng.uniform(0.0, 0.05)),
+            'purchases_with_advisor': int(purchases * rng.uniform(0.0, 0.5)),
+            'purchases_total': purchases,
+            'reviews_fit_positive': int(review_count * rng.uniform(0.1, 0.6)),
+            'reviews_with_fit': int(review_count * 0.7),
+            'rma_count': rng.randint(0, 40),
+            'claim_count': rng.randint(0, 30),
+            'units_sold': purchases,
+            'avg_days_to_claim': rng.uniform(30, 900),
+            'warranty_claims': rng.randint(0, 20),
+            'reviews_durability_avg': rng.random(),
+            'energy_return_percent': attributes.get('energy_ret', rng.uniform(30, 90)),
+            'weight_grams': template.get('tech_specs', {}).get('weight_grams', 300) * rng.uniform(0.9, 1.1),
+            'cushioning_index': attributes.get('cushion_idx', rng.uniform(1, 10)),
+            'avg_rating': rng.uniform(2.5, 5.0),
+            'avg_rating_verified': rng.uniform(2.5, 5.0),
+            'review_count_verified': int(review_count * rng.uniform(0.5, 1.0)),
+            'review_count_total': review_count,
+            'csat_product': rng.random(),
+            'csat_responses': rng.randint(0, 200),
+            'sentiment_90d': rng.random(),
+            'sentiment_prev_90d': rng.random(),
+            'repeat_purchase_rate': rng.uniform(0.0, 0.4),
+            'rare_feature_count': rng.randint(0, 5),
+            'total_feature_count': rng.randint(5, 20),
+            'is_limited_edition': rng.random() < 0.1,
+            'price_percentile_category': rng.uniform(0, 100),
+            'material_grade': rng.choice(MATERIAL_GRADES),
+            'warranty_days': template.get('trust_signals', {}).get('warranty_days', 90),
+            'sustainability_certifications': rng.sample(CERTIFICATIONS, rng.randint(0, 3)),
+            'recycled_content_percent': attributes.get('ocean_plastic', rng.uniform(0, 60)),
+            'carbon_footprint_kg': attributes.get('carbon_fp', rng.uniform(2, 20)),
+            'sustainable_packaging': rng.random() < 0.5,
+            'new_feature_count': rng.randint(0, 4),
+            'patent_count': rng.randint(0, 3),
+            'award_count': rng.randint(0, 2),
+            'press_mention_count': rng.randint(0, 15)
+        }
+
+    def intent_sources(self, rng: random.Random, orders: int = 20, events: int = 40,
+                       texts: int = 8, acquisitions: int = 15) -> Dict[str, List[Dict]]:
+        """IntentExtractor data_sources with orders, returns, events, texts and acquisitions"""
+        def created_at() -> str:
+            return (self.as_of - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1439))).isoformat()
+
+        return {
+            'orders': [
+                {
+                    'created_at': created_at(),
+                    'gift_wrap': rng.random() < 0.15,
+                    'items': [{'category': rng.choice(ITEM_CATEGORIES)} for _ in range(rng.randint(1, 4))]
+                }
+                for _ in range(orders)
+            ],
+            'returns': [
+                {'reason': rng.choice(RETURN_REASONS), 'created_at': created_at()}
+                for _ in range(rng.randint(0, orders // 4))
+            ],
+            'events': [
+                {'type': event_type, 'guide_type': rng.choice(GUIDE_TYPES), 'timestamp': created_at()}
+                if event_type == 'read_guide' else {'type': event_type, 'timestamp': created_at()}
+                for event_type in (rng.choice(EVENT_TYPES) for _ in range(events))
+            ],
+            'texts': [
+                {
+                    'text': review['text'],
+                    'source': 'review',
+                    'verified_purchase': review.get('verified_purchase', False),
+                    'created_at': created_at()
+                }
+                for review in (rng.choice(self.reviews) for _ in range(texts))
+            ],
+            'acquisitions': [
+                {
+                    'utm_campaign': rng.choice(UTM_CAMPAIGNS),
+                    'utm_source': rng.choice(['google', 'instagram', 'newsletter']),
+                    'utm_term': rng.choice(UTM_TERMS),
+                    'landing_page': '/products/' + rng.choice(['sneakers', 'running', 'sandals']),
+                    'timestamp': created_at()
+                }
+                for _ in range(acquisitions)
+            ]
+        }
+
+    def review_summary(self, rng: random.Random, template: Dict, history_days: int = 30) -> Dict[str, Any]:
+        """trust_signals.review_summary with a perturbed distribution and a daily count history"""
+        base = template.get('trust_signals', {}).get('review_summary', {})
+        distribution = {
+            stars: max(0, int(count * rng.uniform(0.5, 1.5)))
+            for stars, count in base.get('distribution', {'5': 10, '4': 5, '3': 2, '2': 1, '1': 1}).items()
+        }
+        total = sum(distribution.values())
+        mean_daily = max(1, total // 365)
+        history = [{'count': max(0, int(rng.gauss(mean_daily, mean_daily ** 0.5)))} for _ in range(history_days)]
+        if rng.random() < 0.05:
+            history[rng.randrange(history_days)]['count'] *= 10  # injected spike
+        return {
+            **base,
+            'avg_rating': round(sum(int(s) * c for s, c in distribution.items()) / max(total, 1), 2),
+            'count_total': total,
+            'count_verified': int(total * rng.uniform(0.2, 1.0)),
+            'distribution': distribution,
+            'history': history
+        }
+
+    def brand_domains(self, n: int) -> Iterator[str]:
+        """Distinct brand domains for enrichment benchmarks"""
+        for i in range(n):
+            yield f"brand-{i:07d}.example.com"
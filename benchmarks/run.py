@@ -0,0 +1,254 @@
+"""
+AXP Pipeline Benchmarks
+Throughput and peak memory of the Python pipeline on synthetic catalogs
+
+Usage (from the repository root):
+    python -m benchmarks.run --sizes 10k,100k --output report.json
+    python -m benchmarks.run --sizes 10k --baseline benchmarks/baseline.json
+    python -m benchmarks.run --sizes 10k --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Callable, Iterable, Iterator
+
+SRC_DIR = Path(__file__).resolve().parents[1] / 'src'
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from .generators import SyntheticCatalog
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+# Items generated and scored per timed chunk; bounds memory at 1M products
+CHUNK_SIZE = 10_000
+
+
+def _timed(items: Iterable[Any], call: Callable[[Any], Any]) -> Dict[str, float]:
+    """Run call over items chunk by chunk, timing only the calls (not data generation)"""
+    elapsed = 0.0
+    count = 0
+    iterator = iter(items)
+    while True:
+        chunk = [item for _, item in zip(range(CHUNK_SIZE), iterator)]
+        if not chunk:
+            break
+        start = time.perf_counter()
+        for item in chunk:
+            call(item)
+        elapsed += time.perf_counter() - start
+        count += len(chunk)
+    return {'items': count, 'seconds': elapsed}
+
+
+def bench_kpi(catalog: SyntheticCatalog, n: int) -> Dict[str, float]:
+    """KPICalculator.calculate_all_soft_signals per product"""
+    from pipeline.kpi_calculator import KPICalculator
+
+    calculator = KPICalculator()
+    rng = random.Random(catalog.seed)
+    categories = [p['breadcrumbs'][0].lower() for p in catalog.products]
+
+    def inputs() -> Iterator[tuple]:
+        for i in range(n):
+            template = catalog.products[i % len(catalog.products)]
+            yield catalog.kpi_inputs(rng, template), categories[i % len(categories)]
+
+    return _timed(inputs(), lambda item: calculator.calculate_all_soft_signals(*item))
+
+
+def bench_intent(catalog: SyntheticCatalog, n: int) -> Dict[str, float]:
+    """IntentExtractor.compute_intent_signals per product"""
+    from pipeline.intent_extractor import IntentExtractor
+
+    extractor = IntentExtractor()
+    rng = random.Random(catalog.seed)
+    inputs = ((f"sku_{i:07d}", catalog.intent_sources(rng)) for i in range(n))
+    return _timed(inputs, lambda item: extractor.compute_intent_signals(*item, as_of=catalog.as_of))
+
+
+def bench_trust(catalog: SyntheticCatalog, n: int) -> Dict[str, float]:
+    """TrustVerifier time and distribution anomaly detectors via verify_review_summary"""
+    from pipeline.trust_verifier import TrustVerifier
+
+    verifier = TrustVerifier()
+    rng = random.Random(catalog.seed)
+    inputs = (catalog.review_summary(rng, catalog.products[i % len(catalog.products)]) for i in range(n))
+    return _timed(inputs, verifier.verify_review_summary)
+
+
+def bench_enrichment(catalog: SyntheticCatalog, n: int) -> Dict[str, float]:
+    """EnrichmentOrchestrator.enrich_brand per domain against in-process mock providers"""
+    from enrichment.providers import BaseProvider, EnrichmentOrchestrator, ProviderEvidence, ProviderType
+
+    class MockProvider(BaseProvider):
+        """Answers immediately with a fixed-shape payload"""
+
+        def __init__(self, provider_type: ProviderType):
+            super().__init__(api_key='benchmark')
+            self.provider_type = provider_type
+
+        async def fetch_brand_data(self, domain: str) -> ProviderEvidence:
+            return ProviderEvidence(
+                source=self.provider_type.value,
+                entity='brand',
+                source_id=domain,
+                retrieved_at=datetime.utcnow(),
+                evidence_url=f"https://{self.provider_type.value}.example.com/{domain}",
+                data={'avg_rating': 4.4, 'count_total': 1200, 'count_verified': 950}
+            )
+
+        async def fetch_product_data(self, product_id: str) -> ProviderEvidence:
+            raise NotImplementedError
+
+    orchestrator = EnrichmentOrchestrator()
+    for provider_type in [ProviderType.TRUSTPILOT, ProviderType.TRUSTED_SHOPS,
+                          ProviderType.GOOGLE_SELLER, ProviderType.BUILTWITH]:
+        orchestrator.register_provider(MockProvider(provider_type))
+
+    loop = asyncio.new_event_loop()
+    try:
+        return _timed(catalog.brand_domains(n), lambda domain: loop.run_until_complete(orchestrator.enrich_brand(domain)))
+    finally:
+        loop.close()
+
+
+BENCHMARKS: Dict[str, Callable[[SyntheticCatalog, int], Dict[str, float]]] = {
+    'kpi': bench_kpi,
+    'intent': bench_intent,
+    'trust': bench_trust,
+    'enrichment': bench_enrichment
+}
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_benchmark(name: str, n: int, seed: int) -> Dict[str, Any]:
+    """Run one benchmark; executed in a fresh process so peak RSS is its own"""
+    try:
+        result = BENCHMARKS[name](SyntheticCatalog(seed), n)
+    except ImportError as e:
+        return {'skipped': f"missing dependency: {e}"}
+    seconds = result['seconds']
+    return {
+        'items': result['items'],
+        'seconds': round(seconds, 4),
+        'throughput_per_s': round(result['items'] / seconds, 1) if seconds > 0 else None,
+        'peak_rss_mb': round(_peak_rss_mb(), 1)
+    }
+
+
+def run_benchmarks(names: List[str], sizes: List[str], seed: int = 42) -> Dict[str, Any]:
+    """
+    Run benchmarks at the given sizes
+
+    Returns:
+        Report with environment metadata and results keyed "name@size"
+    """
+    results = {}
+    spawn = multiprocessing.get_context('spawn')
+    for size in sizes:
+        for name in names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                results[f"{name}@{size}"] = pool.submit(_run_benchmark, name, SIZES[size], seed).result()
+            print(f"{name}@{size}: {json.dumps(results[f'{name}@{size}'])}", file=sys.stderr)
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'chunk_size': CHUNK_SIZE,
+        'results': results
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """
+    Regressions of report against baseline
+
+    A result regresses when throughput drops, or peak RSS grows, by more
+    than tolerance (a fraction) relative to the baseline entry of the same key.
+    """
+    regressions = []
+    for key, current in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous or 'skipped' in current or 'skipped' in previous:
+            continue
+
+        if previous.get('throughput_per_s') and current.get('throughput_per_s'):
+            ratio = current['throughput_per_s'] / previous['throughput_per_s']
+            if ratio < 1 - tolerance:
+                regressions.append(
+                    f"{key}: throughput {current['throughput_per_s']}/s vs baseline "
+                    f"{previous['throughput_per_s']}/s ({ratio - 1:+.1%})"
+                )
+
+        if previous.get('peak_rss_mb') and current.get('peak_rss_mb'):
+            ratio = current['peak_rss_mb'] / previous['peak_rss_mb']
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{key}: peak RSS {current['peak_rss_mb']} MB vs baseline "
+                    f"{previous['peak_rss_mb']} MB ({ratio - 1:+.1%})"
+                )
+
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: python -m benchmarks.run"""
+    parser = argparse.ArgumentParser(description="Benchmark the AXP Python pipeline on synthetic catalogs")
+    parser.add_argument('--sizes', default='10k,100k,1m', help=f"Comma-separated sizes out of {', '.join(SIZES)}")
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help=f"Comma-separated benchmarks out of {', '.join(BENCHMARKS)}")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument('--baseline', default=None, help="Baseline report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed relative regression (default 0.2)")
+    parser.add_argument('--save-baseline', default=None, help="Also write the report as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(',') if s.strip()]
+    names = [b.strip() for b in args.only.split(',') if b.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [b for b in names if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown sizes or benchmarks: {', '.join(unknown)}")
+
+    report = run_benchmarks(names, sizes, args.seed)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        report['regressions'] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(output + '\n')
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+AXP Pipeline
+Intent extraction, soft KPI calculation and trust verification over shop data
+"""
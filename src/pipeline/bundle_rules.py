@@ -0,0 +1,216 @@
+"""
+AXP Bundle Rules
+Co-purchase association mining over order lines, compiled into intent rules for bundle analysis
+"""
+
+import json
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+import numpy as np
+
+
+# Intent tags of item categories; a frequent pair scores the intents both
+# categories share, with the sum of their weights
+CATEGORY_INTENTS: Dict[str, Dict[str, float]] = {
+    'running_shoes': {'running': 0.4, 'sport': 0.25},
+    'running_socks': {'running': 0.4, 'sport': 0.25},
+    'dress_shoes': {'professional_use': 0.35},
+    'dress_shirt': {'professional_use': 0.35}
+}
+
+# Order lines buffered by CoPurchaseCounter.add_orders before a columnar count
+ORDER_LINE_CHUNK = 1_000_000
+
+
+class BundleRuleTable:
+    """
+    Compiled category-pair rules: (category, category) -> intent scores
+
+    match() looks up only the pairs present in an order: for each category
+    of the order, its partner rules are checked with set membership.
+    """
+
+    def __init__(self, rules: Optional[Dict[Tuple[str, str], Dict[str, float]]] = None):
+        self.rules: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._partners: Dict[str, List[Tuple[str, Dict[str, float]]]] = defaultdict(list)
+        for (a, b), intents in (rules or {}).items():
+            self.add(a, b, intents)
+
+    def add(self, a: str, b: str, intents: Dict[str, float]):
+        """Add (or replace) the rule for a category pair"""
+        a, b = sorted((a, b))
+        if (a, b) in self.rules:
+            self._partners[a] = [(other, s) for other, s in self._partners[a] if other != b]
+        self.rules[(a, b)] = dict(intents)
+        self._partners[a].append((b, self.rules[(a, b)]))
+
+    def match(self, categories: Iterable[str]) -> Dict[str, float]:
+        """Intent scores of all rules whose two categories occur in the order"""
+        present = set(categories)
+        scores: Dict[str, float] = {}
+        for category in present:
+            for other, intents in self._partners.get(category, ()):
+                if other in present:
+                    for intent, score in intents.items():
+                        scores[intent] = scores.get(intent, 0.0) + score
+        return scores
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def save(self, path: str):
+        """Write the rules as JSON"""
+        with open(path, 'w') as f:
+            json.dump([[a, b, intents] for (a, b), intents in self.rules.items()], f)
+
+    @classmethod
+    def load(cls, path: str) -> 'BundleRuleTable':
+        """Read rules written by save()"""
+        with open(path) as f:
+            return cls({(a, b): intents for a, b, intents in json.load(f)})
+
+
+def default_bundle_rules() -> BundleRuleTable:
+    """Hand-written rules used until a mined table is supplied"""
+    return BundleRuleTable({
+        ('running_shoes', 'running_socks'): {'running': 0.8, 'sport': 0.5},
+        ('dress_shoes', 'dress_shirt'): {'professional_use': 0.7}
+    })
+
+
+class CoPurchaseCounter:
+    """
+    Sparse category co-occurrence counts from order lines
+
+    Counting is columnar: a chunk of (order_id, category) lines is deduplicated,
+    expanded into within-order category pairs and counted with np.unique, so
+    the Python cost is per chunk rather than per line. Counters built on
+    separate shards of the orders can be merged.
+    """
+
+    def __init__(self):
+        self.categories: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.orders = 0
+        self.item_counts: Dict[int, int] = defaultdict(int)  # category code -> orders containing it
+        self.pair_counts: Dict[Tuple[int, int], int] = defaultdict(int)  # (code, code) -> orders containing both
+
+    def add_columns(self, order_ids: Any, categories: Any):
+        """
+        Count one chunk of order lines
+
+        Args:
+            order_ids: Order ID per line; every order must lie entirely within one chunk
+            categories: Item category per line
+        """
+        order_ids = np.asarray(order_ids)
+        categories = np.asarray(categories, dtype=object)
+        if len(order_ids) != len(categories):
+            raise ValueError(f"{len(order_ids)} order IDs but {len(categories)} categories")
+        if len(order_ids) == 0:
+            return
+
+        labels, inverse = np.unique(categories.astype(str), return_inverse=True)
+        codes = np.array([self._code(str(label)) for label in labels], dtype=np.int64)[inverse]
+        _, orders = np.unique(order_ids, return_inverse=True)
+
+        # Distinct (order, category) lines, sorted by order then category code
+        width = max(len(self.categories), 1)
+        lines = np.unique(orders.astype(np.int64) * width + codes)
+        orders, codes = lines // width, lines % width
+
+        self.orders += int(orders[-1]) + 1 if len(orders) else 0
+        for code, count in zip(*np.unique(codes, return_counts=True)):
+            self.item_counts[int(code)] += int(count)
+
+        # Pair each line with the later lines of its order
+        order_end = np.searchsorted(orders, orders, side='right')
+        partners = order_end - np.arange(len(orders)) - 1
+        total = int(partners.sum())
+        if total == 0:
+            return
+        left = np.repeat(np.arange(len(orders)), partners)
+        offsets = np.arange(total) - np.repeat(np.cumsum(partners) - partners, partners)
+        right = left + 1 + offsets
+        pairs, counts = np.unique(codes[left] * width + codes[right], return_counts=True)
+        for pair, count in zip(pairs.tolist(), counts.tolist()):
+            self.pair_counts[(pair // width, pair % width)] += count
+
+    def add_orders(self, orders: Iterable[Dict], chunk_lines: int = ORDER_LINE_CHUNK):
+        """Count a stream of orders with 'items' lists, in chunks of about chunk_lines lines"""
+        order_ids: List[int] = []
+        categories: List[str] = []
+        for index, order in enumerate(orders):
+            for item in order.get('items') or ():
+                order_ids.append(index)
+                categories.append(item.get('category', ''))
+            if len(order_ids) >= chunk_lines:
+                self.add_columns(order_ids, categories)
+                order_ids, categories = [], []
+        self.add_columns(order_ids, categories)
+
+    def merge(self, other: 'CoPurchaseCounter') -> 'CoPurchaseCounter':
+        """Fold another counter (e.g. from a parallel shard) into this one; returns self"""
+        remap = [self._code(category) for category in other.categories]
+        self.orders += other.orders
+        for code, count in other.item_counts.items():
+            self.item_counts[remap[code]] += count
+        for (a, b), count in other.pair_counts.items():
+            a, b = sorted((remap[a], remap[b]))
+            self.pair_counts[(a, b)] += count
+        return self
+
+    def associations(self, min_support: int = 10) -> List[Dict[str, Any]]:
+        """
+        Category pairs bought together in at least min_support orders
+
+        Returns:
+            Dicts with both categories, support (orders), confidence in each
+            direction and lift, strongest lift first
+        """
+        results = []
+        for (a, b), support in self.pair_counts.items():
+            if support < min_support:
+                continue
+            count_a, count_b = self.item_counts[a], self.item_counts[b]
+            results.append({
+                'categories': (self.categories[a], self.categories[b]),
+                'support': support,
+                'confidence': (support / count_a, support / count_b),
+                'lift': support * self.orders / (count_a * count_b)
+            })
+        results.sort(key=lambda r: r['lift'], reverse=True)
+        return results
+
+    def mine(self,
+             min_support: int = 10,
+             min_lift: float = 1.2,
+             category_intents: Optional[Dict[str, Dict[str, float]]] = None) -> BundleRuleTable:
+        """
+        Compile frequent, positively associated pairs into a rule table
+
+        Args:
+            min_support: Minimum orders containing both categories
+            min_lift: Minimum lift (1.0 = bought together as often as by chance)
+            category_intents: Intent tags per category (defaults to CATEGORY_INTENTS);
+                a pair scores the intents both categories share
+        """
+        category_intents = category_intents or CATEGORY_INTENTS
+        table = BundleRuleTable()
+        for association in self.associations(min_support):
+            if association['lift'] < min_lift:
+                continue
+            a, b = association['categories']
+            tags_a, tags_b = category_intents.get(a, {}), category_intents.get(b, {})
+            intents = {intent: tags_a[intent] + tags_b[intent] for intent in tags_a.keys() & tags_b.keys()}
+            if intents:
+                table.add(a, b, intents)
+        return table
+
+    def _code(self, category: str) -> int:
+        code = self.codes.get(category)
+        if code is None:
+            code = self.codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
@@ -0,0 +1,206 @@
+"""
+AXP Category Baselines
+Per-category metric distributions used to normalize soft KPIs
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterable
+from collections import defaultdict
+
+import numpy as np
+
+
+# Percentiles kept for every category metric
+BASELINE_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def _rma_per_1000(product_data: Dict) -> Optional[float]:
+    """RMA rate per 1000 units, computed like calculate_reliability_score"""
+    if 'rma_count' not in product_data:
+        return None
+    units_sold = max(product_data.get('units_sold', 1000), 1)
+    return (product_data['rma_count'] / units_sold) * 1000
+
+
+# metric -> (value extractor, product_data field the category mean is injected into)
+BASELINE_METRICS: Dict[str, Tuple[Callable[[Dict], Optional[float]], str]] = {
+    'rma_per_1000': (_rma_per_1000, 'category_rma_avg'),
+    'carbon_footprint_kg': (lambda d: d.get('carbon_footprint_kg'), 'category_avg_carbon_kg'),
+    'reviews_performance_avg': (lambda d: d.get('reviews_performance_avg'), 'category_performance_avg')
+}
+
+
+@dataclass
+class MetricBaseline:
+    """Distribution summary of one metric within one category"""
+    count: int
+    mean: float
+    std: float
+    percentiles: Dict[str, float]  # "p50" -> value
+
+
+class CategoryBaselineIndex:
+    """
+    Means, stddevs and percentiles per category and metric
+
+    Built once per run from the catalog, then injected into product_data so
+    callers no longer compute category_rma_avg, category_avg_carbon_kg and
+    category_performance_avg themselves.
+    """
+
+    def __init__(self, baselines: Optional[Dict[str, Dict[str, MetricBaseline]]] = None,
+                 built_at: Optional[float] = None,
+                 ttl_seconds: int = 86400):
+        self.baselines = baselines or {}
+        self.built_at = built_at if built_at is not None else time.time()
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def build(cls, products: Iterable[Tuple[str, Dict]], ttl_seconds: int = 86400) -> 'CategoryBaselineIndex':
+        """
+        Build the index in one pass over (category, product_data) pairs
+
+        Args:
+            products: Iterable of (category, product_data)
+            ttl_seconds: How long the index stays valid
+        """
+        values: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+
+        for category, product_data in products:
+            for metric, (extract, _) in BASELINE_METRICS.items():
+                value = extract(product_data)
+                if value is not None:
+                    values[category][metric].append(value)
+
+        baselines = {}
+        for category, metrics in values.items():
+            baselines[category] = {}
+            for metric, samples in metrics.items():
+                data = np.asarray(samples, dtype=np.float64)
+                baselines[category][metric] = MetricBaseline(
+                    count=len(data),
+                    mean=float(data.mean()),
+                    std=float(data.std(ddof=1)) if len(data) > 1 else 0.0,
+                    percentiles={
+                        f"p{p}": float(v)
+                        for p, v in zip(BASELINE_PERCENTILES, np.percentile(data, BASELINE_PERCENTILES))
+                    }
+                )
+
+        return cls(baselines, ttl_seconds=ttl_seconds)
+
+    def get(self, category: str, metric: str) -> Optional[MetricBaseline]:
+        """Baseline for a category metric, or None if the category had no samples"""
+        return self.baselines.get(category, {}).get(metric)
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Whether the index is older than its TTL"""
+        return (now if now is not None else time.time()) - self.built_at > self.ttl_seconds
+
+    def inject(self, product_data: Dict, category: str) -> Dict:
+        """
+        Return product_data with missing category baseline fields filled in
+
+        The formulas divide by these averages, so non-positive means (e.g. a
+        category without any RMAs) are not injected and the formula defaults apply.
+        """
+        missing = {}
+        for metric, (_, field) in BASELINE_METRICS.items():
+            baseline = self.get(category, metric)
+            if field not in product_data and baseline is not None and baseline.mean > 0:
+                missing[field] = baseline.mean
+        return {**product_data, **missing} if missing else product_data
+
+    def inject_columns(self, columns: Dict[str, Any], categories: Any) -> Dict[str, Any]:
+        """
+        Columnar inject for calculate_batch: fill absent or NaN baseline cells per row category
+
+        Non-positive means are left NaN, so those cells fall back to the formula defaults (see inject).
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        categories = np.broadcast_to(np.asarray(categories, dtype=object), (n,))
+        columns = dict(columns)
+
+        # Look up each distinct category once, then broadcast by row
+        unique_categories, row_index = np.unique(categories.astype(str), return_inverse=True)
+
+        for metric, (_, field) in BASELINE_METRICS.items():
+            category_means = np.array([
+                baseline.mean if baseline is not None and baseline.mean > 0 else np.nan
+                for baseline in (self.get(category, metric) for category in unique_categories)
+            ], dtype=np.float64)
+            means = category_means[row_index]
+            if field in columns:
+                existing = np.asarray(columns[field], dtype=np.float64)
+                means = np.where(np.isnan(existing), means, existing)
+            columns[field] = means
+
+        return columns
+
+    def save(self, path: str):
+        """
+        Write the index and its build time as JSON
+
+        The file is written under a temp name and renamed into place, so
+        processes sharing the path never read a partly written index.
+        """
+        payload = {
+            'built_at': self.built_at,
+            'ttl_seconds': self.ttl_seconds,
+            'baselines': {
+                category: {metric: asdict(baseline) for metric, baseline in metrics.items()}
+                for category, metrics in self.baselines.items()
+            }
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> 'CategoryBaselineIndex':
+        """Read an index written by save()"""
+        with open(path) as f:
+            payload = json.load(f)
+        baselines = {
+            category: {metric: MetricBaseline(**raw) for metric, raw in metrics.items()}
+            for category, metrics in payload['baselines'].items()
+        }
+        return cls(baselines, built_at=payload['built_at'], ttl_seconds=payload['ttl_seconds'])
+
+
+class CategoryBaselineCache:
+    """Serve a CategoryBaselineIndex until its TTL expires, optionally shared via a JSON file"""
+
+    def __init__(self, builder: Callable[[], CategoryBaselineIndex], path: Optional[str] = None):
+        """
+        Args:
+            builder: Builds a fresh index (e.g. a full pass over the catalog)
+            path: Optional JSON file so other processes and runs reuse the index
+        """
+        self.builder = builder
+        self.path = path
+        self._index: Optional[CategoryBaselineIndex] = None
+
+    def get(self) -> CategoryBaselineIndex:
+        """Current index, rebuilt when missing or expired"""
+        if self._index is not None and not self._index.is_expired():
+            return self._index
+
+        if self.path and os.path.exists(self.path):
+            index = CategoryBaselineIndex.load(self.path)
+            if not index.is_expired():
+                self._index = index
+                return index
+
+        self._index = self.builder()
+        if self.path:
+            self._index.save(self.path)
+        return self._index
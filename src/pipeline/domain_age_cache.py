@@ -0,0 +1,180 @@
+"""
+AXP Domain Age Cache
+Persistent per-source domain age evidence in SQLite, with short-lived entries for failed lookups
+"""
+
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+# First-seen dates practically never change
+EVIDENCE_TTL_DAYS = 90
+
+# Empty answers and hard failures are retried after this long (callers do
+# not cache timeouts at all)
+NEGATIVE_TTL_SECONDS = 3600
+
+# Public suffixes with two labels, so 'shop.example.co.uk' -> 'example.co.uk'
+MULTI_PART_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'ltd.uk', 'plc.uk',
+    'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+    'co.nz', 'org.nz', 'co.jp', 'ne.jp', 'or.jp', 'co.kr', 'or.kr',
+    'com.br', 'com.cn', 'com.mx', 'com.tr', 'com.sg', 'com.hk', 'co.in',
+    'co.za', 'co.il', 'com.ar', 'com.tw', 'co.at', 'or.at'
+}
+
+
+def registrable_domain(domain: str) -> str:
+    """
+    Registrable domain (eTLD+1) of a host name or URL
+
+    Lowercases, strips scheme, port, path, trailing dot and subdomains;
+    two-label public suffixes come from MULTI_PART_SUFFIXES.
+    """
+    host = domain.strip().lower()
+    if '//' in host:
+        host = urlparse(host).hostname or ''
+    host = host.split('/', 1)[0].split(':', 1)[0].rstrip('.')
+    labels = host.split('.')
+    if len(labels) <= 2:
+        return host
+    keep = 3 if '.'.join(labels[-2:]) in MULTI_PART_SUFFIXES else 2
+    return '.'.join(labels[-keep:])
+
+
+@dataclass
+class DomainEvidence:
+    """One source's answer for a domain"""
+    source: str
+    first_seen: Optional[datetime]  # None if the lookup failed or found nothing
+    error: Optional[str]
+    checked_at: float  # unix time
+    expires_at: float
+
+
+class DomainAgeCache:
+    """
+    Domain age evidence per registrable domain and source
+
+    Dates are kept for evidence_ttl_days, failures and empty answers for
+    negative_ttl_seconds. Entries live in a SQLite table and, once read, in
+    an in-memory LRU, so repeat lookups of a domain never touch the disk.
+    """
+
+    SCHEMA = """CREATE TABLE IF NOT EXISTS domain_age_evidence (
+        domain TEXT NOT NULL,
+        source TEXT NOT NULL,
+        first_seen TEXT,
+        error TEXT,
+        checked_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        PRIMARY KEY (domain, source)
+    ) WITHOUT ROWID"""
+
+    def __init__(self,
+                 path: str = ':memory:',
+                 evidence_ttl_days: float = EVIDENCE_TTL_DAYS,
+                 negative_ttl_seconds: float = NEGATIVE_TTL_SECONDS,
+                 max_memory_domains: int = 100000):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            evidence_ttl_days: Lifetime of a found first-seen date
+            negative_ttl_seconds: Lifetime of a failed or empty lookup
+            max_memory_domains: Domains kept in memory (least recently used evicted)
+        """
+        self.evidence_ttl = evidence_ttl_days * 86400
+        self.negative_ttl = negative_ttl_seconds
+        self.max_memory_domains = max_memory_domains
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(self.SCHEMA)
+        self._memory: 'OrderedDict[str, Dict[str, DomainEvidence]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, domain: str) -> Dict[str, DomainEvidence]:
+        """Unexpired evidence of a registrable domain, by source"""
+        entries = self._memory.get(domain)
+        if entries is None:
+            entries = self._read(domain)
+            self._remember(domain, entries)
+        else:
+            self._memory.move_to_end(domain)
+
+        now = time.time()
+        fresh = {source: entry for source, entry in entries.items() if entry.expires_at > now}
+        self.hits += len(fresh)
+        self.misses += len(entries) - len(fresh)
+        return fresh
+
+    def put(self, domain: str, source: str, first_seen: Optional[datetime] = None,
+            error: Optional[str] = None) -> DomainEvidence:
+        """Store one source's answer; without a first_seen date it expires after the negative TTL"""
+        now = time.time()
+        entry = DomainEvidence(
+            source=source,
+            first_seen=first_seen,
+            error=error,
+            checked_at=now,
+            expires_at=now + (self.evidence_ttl if first_seen else self.negative_ttl)
+        )
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO domain_age_evidence VALUES (?, ?, ?, ?, ?, ?)",
+                (domain, source, first_seen.isoformat() if first_seen else None, error, now, entry.expires_at)
+            )
+        entries = self._memory.get(domain)
+        if entries is None:
+            entries = self._read(domain)
+            self._remember(domain, entries)
+        entries[source] = entry
+        return entry
+
+    def invalidate(self, domain: str):
+        """Drop all evidence of a domain"""
+        with self.conn:
+            self.conn.execute("DELETE FROM domain_age_evidence WHERE domain = ?", (domain,))
+        self._memory.pop(domain, None)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries from disk; returns the number deleted"""
+        with self.conn:
+            deleted = self.conn.execute(
+                "DELETE FROM domain_age_evidence WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+        self._memory.clear()
+        return deleted
+
+    def close(self):
+        """Close the database"""
+        self.conn.close()
+
+    def _read(self, domain: str) -> Dict[str, DomainEvidence]:
+        """Stored entries of one domain, expired ones included"""
+        return {
+            source: DomainEvidence(
+                source=source,
+                first_seen=datetime.fromisoformat(first_seen) if first_seen else None,
+                error=error,
+                checked_at=checked_at,
+                expires_at=expires_at
+            )
+            for source, first_seen, error, checked_at, expires_at in self.conn.execute(
+                "SELECT source, first_seen, error, checked_at, expires_at "
+                "FROM domain_age_evidence WHERE domain = ?",
+                (domain,)
+            )
+        }
+
+    def _remember(self, domain: str, entries: Dict[str, DomainEvidence]):
+        self._memory[domain] = entries
+        while len(self._memory) > self.max_memory_domains:
+            self._memory.popitem(last=False)
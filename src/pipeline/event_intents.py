@@ -0,0 +1,97 @@
+"""
+AXP Event Intent Table
+Onsite behavior events compiled into intent weight vectors indexed by intent ordinal
+"""
+
+from typing import Dict, List, Optional, Any
+
+import numpy as np
+
+
+# Event key -> intent weights. 'read_guide:<topic>' keys match read_guide events
+# whose guide_type contains the topic (first listed topic wins).
+DEFAULT_EVENT_TO_INTENT: Dict[str, Dict[str, float]] = {
+    'view_size_guide': {'fashion': 0.3, 'sport': 0.2},
+    'view_3d': {'fashion': 0.2, 'luxury': 0.1},
+    'use_configurator': {'professional_use': 0.3, 'hobby': 0.2},
+    'compare_products': {'value': 0.2},
+    'read_guide:running': {'running': 0.5},
+    'read_guide:basketball': {'basketball': 0.5}
+}
+
+
+class EventIntentTable:
+    """
+    Precompiled EVENT_TO_INTENT dispatch table
+
+    Every event key owns one row of an (event keys + 1, intents) weight
+    matrix; the extra last row is all zeros for events without intent. An
+    event is resolved to its row with one dict lookup (plus one lowercase and
+    substring scan for guide events), so a product's behavior scores are the
+    row counts times the matrix: a bincount and a matrix product, no
+    per-event branching.
+    """
+
+    def __init__(self, event_to_intent: Dict[str, Dict[str, float]], intents: List[str]):
+        """
+        Args:
+            event_to_intent: Event key -> intent weights (see DEFAULT_EVENT_TO_INTENT)
+            intents: Intent names in ordinal order; vectors are indexed by it
+        """
+        self.event_to_intent = {key: dict(weights) for key, weights in event_to_intent.items()}
+        self.intents = list(intents)
+        ordinals = {intent: i for i, intent in enumerate(self.intents)}
+
+        self.rows: Dict[str, int] = {key: i for i, key in enumerate(self.event_to_intent)}
+        self.none_row = len(self.rows)
+        self.matrix = np.zeros((len(self.rows) + 1, len(self.intents)))
+        for key, weights in self.event_to_intent.items():
+            for intent, weight in weights.items():
+                if intent not in ordinals:
+                    raise ValueError(f"Unknown intent '{intent}' for event '{key}'")
+                self.matrix[self.rows[key], ordinals[intent]] = weight
+
+        # Sparse per-row view for single-record callers
+        self.row_intents: List[Dict[str, float]] = [
+            {self.intents[i]: float(row[i]) for i in np.flatnonzero(row)} for row in self.matrix
+        ]
+        self._guide_topics = [
+            (key.split(':', 1)[1].lower(), self.rows[key])
+            for key in self.event_to_intent if key.startswith('read_guide:')
+        ]
+
+    def row(self, event: Dict[str, Any]) -> int:
+        """Matrix row of one event (none_row if it carries no intent)"""
+        event_type = event.get('type')
+        if event_type == 'read_guide':
+            guide = event.get('guide_type')
+            if guide:
+                guide = guide.lower()
+                for topic, row in self._guide_topics:
+                    if topic in guide:
+                        return row
+        return self.rows.get(event_type, self.none_row)
+
+    def intent_weights(self, event: Dict[str, Any]) -> Dict[str, float]:
+        """Intent weights of one event (shared dict; do not modify)"""
+        return self.row_intents[self.row(event)]
+
+    def score_rows(self, rows: Any, weights: Optional[Any] = None) -> np.ndarray:
+        """Intent vector summed over events given by row, optionally weighted (e.g. by recency)"""
+        counts = np.bincount(np.asarray(rows, dtype=np.int64), weights=weights, minlength=len(self.matrix))
+        return counts @ self.matrix
+
+    def score_batch(self, products: Any, rows: Any, n_products: int, weights: Optional[Any] = None) -> np.ndarray:
+        """
+        (n_products, intents) behavior scores for events of many products at once
+
+        Args:
+            products: Product index (0..n_products-1) per event
+            rows: Matrix row per event, from row()
+            n_products: Number of products
+            weights: Optional weight per event
+        """
+        width = len(self.matrix)
+        cells = np.asarray(products, dtype=np.int64) * width + np.asarray(rows, dtype=np.int64)
+        counts = np.bincount(cells, weights=weights, minlength=n_products * width)
+        return counts.reshape(n_products, width) @ self.matrix
@@ -0,0 +1,157 @@
+"""
+AXP Holiday Calendar
+Per-locale gift-season day bitmaps and a cached ISO-8601 timestamp parser
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Tuple, Callable, Union
+
+
+def easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th given weekday (0=Monday) of a month; n=-1 is the last one"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+SUNDAY = 6
+
+
+def _french_mothers_day(year: int) -> date:
+    """Last Sunday of May, moved to the first Sunday of June when it falls on Pentecost"""
+    day = nth_weekday(year, 5, SUNDAY, -1)
+    return nth_weekday(year, 6, SUNDAY, 1) if day == easter(year) + timedelta(days=49) else day
+
+
+# Gift holidays per locale (ISO country code): name -> day in a given year
+GIFT_HOLIDAYS: Dict[str, Dict[str, Callable[[int], date]]] = {
+    'US': {
+        'mothers_day': lambda y: nth_weekday(y, 5, SUNDAY, 2),
+        'fathers_day': lambda y: nth_weekday(y, 6, SUNDAY, 3)
+    },
+    'DE': {
+        'mothers_day': lambda y: nth_weekday(y, 5, SUNDAY, 2),
+        'fathers_day': lambda y: easter(y) + timedelta(days=39)  # Ascension Day
+    },
+    'GB': {
+        'mothers_day': lambda y: easter(y) - timedelta(days=21),  # Mothering Sunday
+        'fathers_day': lambda y: nth_weekday(y, 6, SUNDAY, 3)
+    },
+    'FR': {
+        'mothers_day': _french_mothers_day,
+        'fathers_day': lambda y: nth_weekday(y, 6, SUNDAY, 3)
+    },
+    'AU': {
+        'mothers_day': lambda y: nth_weekday(y, 5, SUNDAY, 2),
+        'fathers_day': lambda y: nth_weekday(y, 9, SUNDAY, 1)
+    }
+}
+GIFT_HOLIDAYS['CA'] = GIFT_HOLIDAYS['US']
+GIFT_HOLIDAYS['AT'] = {**GIFT_HOLIDAYS['DE'], 'fathers_day': lambda y: nth_weekday(y, 6, SUNDAY, 2)}
+GIFT_HOLIDAYS['CH'] = {**GIFT_HOLIDAYS['DE'], 'fathers_day': lambda y: nth_weekday(y, 6, SUNDAY, 1)}
+
+# Fixed seasons in every locale: (start month, day), (end month, day), inclusive
+FIXED_GIFT_SEASONS: List[Tuple[Tuple[int, int], Tuple[int, int]]] = [
+    ((11, 15), (12, 31)),  # Christmas season
+    ((2, 1), (2, 14))      # Valentine's
+]
+
+# Locale-independent approximation of Mother's/Father's Day, used for unknown locales
+DEFAULT_PARENT_SEASONS: List[Tuple[Tuple[int, int], Tuple[int, int]]] = [
+    ((5, 1), (5, 31)),
+    ((6, 1), (6, 20))
+]
+
+# Days of gift buying up to and including a computed holiday
+LEAD_DAYS = 21
+
+DEFAULT_LOCALE = 'default'
+
+
+class GiftSeasonCalendar:
+    """
+    Gift-season lookups from precomputed per-locale, per-year day bitmaps
+
+    A bitmap has one byte per day of the year; checking a date is one dict
+    lookup and one index. Bitmaps are built on first use of a (locale, year).
+    """
+
+    def __init__(self, lead_days: int = LEAD_DAYS):
+        self.lead_days = lead_days
+        self._bitmaps: Dict[Tuple[str, int], Tuple[int, bytearray]] = {}  # -> (ordinal of Jan 1st, bitmap)
+
+    def is_gift_season(self, day: Union[date, datetime], locale: str = DEFAULT_LOCALE) -> bool:
+        """Whether a day falls in a gift-giving season of the locale (unknown locales use the default)"""
+        entry = self._bitmaps.get((locale, day.year))
+        if entry is None:
+            self.bitmap(locale, day.year)
+            entry = self._bitmaps[(locale, day.year)]
+        start, bitmap = entry
+        return bitmap[day.toordinal() - start] == 1
+
+    def bitmap(self, locale: str, year: int) -> bytearray:
+        """Day-of-year flags (index 0 = January 1st) of a locale's gift seasons"""
+        key = (locale, year)
+        if key not in self._bitmaps:
+            start = date(year, 1, 1).toordinal()
+            bitmap = bytearray(date(year, 12, 31).toordinal() - start + 1)
+
+            holidays = GIFT_HOLIDAYS.get(locale.upper())
+            ranges = [
+                (date(year, *first), date(year, *last))
+                for first, last in FIXED_GIFT_SEASONS + ([] if holidays else DEFAULT_PARENT_SEASONS)
+            ]
+            for holiday in (holidays or {}).values():
+                day = holiday(year)
+                ranges.append((day - timedelta(days=self.lead_days - 1), day))
+
+            for first, last in ranges:
+                first_index = max(0, first.toordinal() - start)
+                last_index = min(len(bitmap) - 1, last.toordinal() - start)
+                bitmap[first_index:last_index + 1] = b'\x01' * (last_index - first_index + 1)
+            self._bitmaps[key] = (start, bitmap)
+        return self._bitmaps[key][1]
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Naive UTC datetime of an ISO-8601 string
+
+    Accepts a trailing 'Z' on every Python version (fromisoformat only does
+    from 3.11); offsets are converted to UTC. Date-only strings, which repeat
+    heavily in order exports, are parsed once each.
+    """
+    if len(value) == 10:
+        return _parse_date(value)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        if not value.endswith(('Z', 'z')):
+            raise
+        parsed = datetime.fromisoformat(value[:-1] + '+00:00')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+@lru_cache(maxsize=65536)
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
@@ -3,15 +3,24 @@ AXP Intent Signal Extraction Pipeline
 Robust extraction and calculation of intent signals from shop data
 """
 
+import asyncio
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple, Optional, Any, Iterable, Iterator, AsyncIterator, Union
 from enum import Enum
 import hashlib
 import math
 from dataclasses import dataclass
 from collections import defaultdict
 
+import numpy as np
+
+from .keyword_matcher import KeywordMatcher
+from .text_classifier import TextClassifier, BatchTextClassifier, HashedNGramClassifier
+from .bundle_rules import BundleRuleTable, default_bundle_rules
+from .event_intents import EventIntentTable, DEFAULT_EVENT_TO_INTENT
+from .holiday_calendar import GiftSeasonCalendar, DEFAULT_LOCALE, parse_timestamp
+
 
 class IntentType(Enum):
     """Canonical intent taxonomy"""
@@ -29,6 +38,17 @@ class IntentType(Enum):
     VALUE = "value"
 
 
+# Keyword taxonomy for text-based intent classification (add a text_classifier for model-based intent_probs)
+DEFAULT_INTENT_KEYWORDS = {
+    IntentType.GIFT.value: ['gift', 'present', 'birthday', 'christmas', 'anniversary'],
+    IntentType.SPORT.value: ['running', 'training', 'workout', 'gym', 'athletic'],
+    IntentType.PROFESSIONAL_USE.value: ['work', 'professional', 'office', 'business', 'daily'],
+    IntentType.TRAVEL.value: ['travel', 'trip', 'vacation', 'flight', 'luggage'],
+    IntentType.FASHION.value: ['style', 'look', 'outfit', 'trendy', 'fashion'],
+    IntentType.DAILY_COMMUTE.value: ['commute', 'daily', 'everyday', 'walking', 'comfortable']
+}
+
+
 @dataclass
 class IntentSignal:
     intent: str
@@ -39,6 +59,179 @@ class IntentSignal:
     last_updated: datetime
 
 
+# Intent names by IntentType ordinal; intent vectors are indexed by it
+INTENT_NAMES = [t.value for t in IntentType]
+INTENT_INDEX = {intent: i for i, intent in enumerate(INTENT_NAMES)}
+
+# Sources shown in IntentSignal evidence, with their labels
+EVIDENCE_SOURCES = [('orders', 'orders'), ('texts', 'text'), ('events', 'behavior')]
+
+
+def intent_vector(scores: Dict[str, float]) -> np.ndarray:
+    """Fixed-width vector (by IntentType ordinal) of an intent -> score dict; other labels raise ValueError"""
+    vector = np.zeros(len(INTENT_NAMES))
+    for intent, score in scores.items():
+        index = INTENT_INDEX.get(intent)
+        if index is None:
+            raise ValueError(f"Unknown intent '{intent}' (not an IntentType value)")
+        vector[index] += score
+    return vector
+
+
+def check_intents(labels: Iterable[str], origin: str):
+    """Raise ValueError if any label is not an IntentType value (intent vectors have no slot for it)"""
+    unknown = sorted(set(labels) - set(INTENT_INDEX))
+    if unknown:
+        raise ValueError(f"Unknown intents in {origin}: {', '.join(unknown)} (not IntentType values)")
+
+
+def intent_dict(vector: np.ndarray) -> Dict[str, float]:
+    """Nonzero entries of an intent vector as intent -> score"""
+    return {INTENT_NAMES[i]: float(vector[i]) for i in np.flatnonzero(vector)}
+
+
+@dataclass
+class IntentVector:
+    """
+    Fused intents of one product as vectors indexed by IntentType ordinal
+
+    The compact form of compute_intent_signals' result: evidence strings and
+    IntentSignal objects are only built by signals() or to_dict().
+    """
+    shares: np.ndarray
+    confidence: float
+    sources: Dict[str, np.ndarray]  # normalized per-source scores
+    method: str
+    last_updated: datetime
+
+    def share(self, intent: str) -> float:
+        return float(self.shares[INTENT_INDEX[intent]])
+
+    def evidence(self, index: int) -> List[str]:
+        """Human-readable per-source evidence for one intent ordinal"""
+        return [
+            f"{label}:{self.sources[source][index]:.2f}"
+            for source, label in EVIDENCE_SOURCES
+            if source in self.sources and self.sources[source][index] != 0
+        ]
+
+    def signals(self) -> List[IntentSignal]:
+        """IntentSignal per intent, by share descending"""
+        return [
+            IntentSignal(
+                intent=INTENT_NAMES[i],
+                share=float(self.shares[i]),
+                confidence=self.confidence,
+                method=self.method,
+                evidence=self.evidence(i),
+                last_updated=self.last_updated
+            )
+            for i in np.argsort(-self.shares, kind='stable')
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form with formatted evidence"""
+        return {
+            'signals': [
+                {'intent': s.intent, 'share': s.share, 'evidence': s.evidence} for s in self.signals()
+            ],
+            'confidence': self.confidence,
+            'method': self.method,
+            'last_updated': self.last_updated.isoformat()
+        }
+
+
+# (intent, search phrase) pairs matched against utm_term, e.g. 'daily commute'
+_INTENT_PHRASES = [(t.value, t.value.replace('_', ' ')) for t in IntentType]
+
+# data_sources keys consumed by compute_intent_signals
+INTENT_SOURCES = ['orders', 'returns', 'events', 'texts', 'acquisitions']
+
+# How summed record contributions become source scores:
+# 'mean' divides by the summed record weights, 'sqrt' by their square root, 'sum' keeps the sum
+SOURCE_NORMALIZATION = {
+    'orders': 'mean',
+    'returns': 'sum',
+    'events': 'sqrt',
+    'texts': 'mean',
+    'acquisitions': 'mean'
+}
+
+
+class AsyncSourceBridge:
+    """
+    Synchronous view of an async iterator, for use from a worker thread
+
+    Records are pulled from the event loop in chunks, so at most chunk_size
+    records are buffered at a time.
+    """
+
+    def __init__(self, source: AsyncIterator[Dict], loop: asyncio.AbstractEventLoop, chunk_size: int = 1000):
+        self._source = source.__aiter__()
+        self._loop = loop
+        self._chunk_size = chunk_size
+        self._buffer: List[Dict] = []
+        self._position = 0
+        self._exhausted = False
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self
+
+    def __next__(self) -> Dict:
+        if self._position == len(self._buffer):
+            if self._exhausted:
+                raise StopIteration
+            self._buffer = asyncio.run_coroutine_threadsafe(self._take(), self._loop).result()
+            self._position = 0
+            if not self._buffer:
+                raise StopIteration
+        record = self._buffer[self._position]
+        self._position += 1
+        return record
+
+    async def _take(self) -> List[Dict]:
+        chunk = []
+        try:
+            while len(chunk) < self._chunk_size:
+                chunk.append(await self._source.__anext__())
+        except StopAsyncIteration:
+            self._exhausted = True
+        return chunk
+
+
+class ProductGroupedSource:
+    """
+    One product_id-sorted record stream, read as consecutive per-product groups
+
+    Only the current record is held; group() yields a product's records
+    straight from the underlying stream.
+    """
+
+    _DONE = object()
+
+    def __init__(self, name: str, source: Iterable[Dict]):
+        self.name = name
+        self._iterator = iter(source)
+        self._head = next(self._iterator, self._DONE)
+        self._last_product = None
+
+    def peek(self) -> Any:
+        """product_id of the next group, or None when the stream is exhausted"""
+        return None if self._head is self._DONE else self._head['product_id']
+
+    def group(self, product_id: Any) -> Iterator[Dict]:
+        """Yield the records of product_id (must equal peek())"""
+        if self._last_product is not None and product_id < self._last_product:
+            raise ValueError(f"Source '{self.name}' is not sorted by product_id at {product_id}")
+        self._last_product = product_id
+        while self._head is not self._DONE and self._head['product_id'] == product_id:
+            record = self._head
+            self._head = next(self._iterator, self._DONE)
+            yield record
+        if self._head is not self._DONE and self._head['product_id'] < product_id:
+            raise ValueError(f"Source '{self.name}' is not sorted by product_id at {self._head['product_id']}")
+
+
 class IntentExtractor:
     """Extract intent signals from multiple data sources"""
     
@@ -47,7 +240,12 @@ class IntentExtractor:
                  behavior_weight: float = 0.25,
                  cart_weight: float = 0.25,
                  channel_weight: float = 0.1,
-                 recency_half_life_days: int = 90):
+                 recency_half_life_days: int = 90,
+                 intent_keywords: Optional[Dict[str, List[str]]] = None,
+                 text_classifier: Optional[Union[TextClassifier, BatchTextClassifier]] = None,
+                 bundle_rules: Optional[BundleRuleTable] = None,
+                 event_to_intent: Optional[Dict[str, Dict[str, float]]] = None,
+                 locale: str = DEFAULT_LOCALE):
         
         self.weights = {
             'text': text_weight,
@@ -57,145 +255,126 @@ class IntentExtractor:
         }
         self.recency_half_life_days = recency_half_life_days
         self.dirichlet_alpha = 0.5
+        intent_keywords = intent_keywords or DEFAULT_INTENT_KEYWORDS
+        check_intents(intent_keywords, 'intent_keywords')
+        self.keyword_matcher = KeywordMatcher(intent_keywords)
+        # Fills intent_probs for texts that arrive without them
+        if isinstance(text_classifier, TextClassifier):
+            text_classifier = BatchTextClassifier(text_classifier)
+        model = getattr(text_classifier, 'classifier', None)
+        if isinstance(model, HashedNGramClassifier):
+            check_intents([label for label in model.labels if label != model.background_label], 'text_classifier labels')
+        self.text_classifier = text_classifier
+        # Co-purchase rules, e.g. mined with bundle_rules.CoPurchaseCounter
+        self.bundle_rules = bundle_rules or default_bundle_rules()
+        self.event_intents = EventIntentTable(event_to_intent or DEFAULT_EVENT_TO_INTENT, INTENT_NAMES)
+        # Gift seasons of orders without a 'country' (ISO code) follow this locale
+        self.locale = locale
+        self.gift_calendar = GiftSeasonCalendar()
+        
+    def set_intent_keywords(self, intent_keywords: Dict[str, List[str]]):
+        """
+        Hot-swap the text keyword taxonomy
+        
+        The new matcher is compiled before it replaces the old one, so calls
+        already running finish with the previous taxonomy.
+        """
+        check_intents(intent_keywords, 'intent_keywords')
+        self.keyword_matcher = KeywordMatcher(intent_keywords)
+        
+    def extract_from_orders(self, product_id: str, orders: Iterable[Dict],
+                            as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Extract intent signals from order context (single pass, orders may be a stream)"""
+        return intent_dict(self._fold_source('orders', orders, as_of)[0])
+    
+    def extract_from_returns(self, product_id: str, returns: Iterable[Dict],
+                             as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Extract negative signals from return data"""
+        return intent_dict(self._fold_source('returns', returns, as_of)[0])
+    
+    def extract_from_behavior(self, product_id: str, events: Iterable[Dict],
+                              as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Extract intent from onsite behavior"""
+        return intent_dict(self._fold_source('events', events, as_of)[0])
+    
+    def extract_from_text(self, product_id: str, texts: Iterable[Dict],
+                          as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Extract intent from reviews, Q&A, support tickets"""
+        return intent_dict(self._fold_source('texts', texts, as_of)[0])
+    
+    def extract_from_channel(self, product_id: str, acquisitions: Iterable[Dict],
+                             as_of: Optional[datetime] = None) -> Dict[str, float]:
+        """Extract intent from acquisition channels"""
+        return intent_dict(self._fold_source('acquisitions', acquisitions, as_of)[0])
+    
+    def record_intents(self, source: str, record: Dict,
+                       timestamp: Optional[datetime] = None) -> Tuple[Dict[str, float], float]:
+        """
+        Intent contributions of one record and its weight in the source normalization
         
-    def extract_from_orders(self, product_id: str, orders: List[Dict]) -> Dict[str, float]:
-        """Extract intent signals from order context"""
+        A source's scores are the (decayed) sums of its records' contributions,
+        divided according to SOURCE_NORMALIZATION by the (decayed) sum of weights.
+        
+        Args:
+            source: Source name (see INTENT_SOURCES)
+            record: One record of that source
+            timestamp: The record's parsed time, if already known
+        """
         intent_scores = defaultdict(float)
-        total_orders = len(orders)
+        weight = 1.0
         
-        if total_orders == 0:
-            return {}
-            
-        for order in orders:
+        if source == 'orders':
             # Gift indicators
-            if order.get('gift_wrap') or order.get('gift_message'):
+            if record.get('gift_wrap') or record.get('gift_message'):
                 intent_scores[IntentType.GIFT.value] += 1
                 
             # Time of order (holiday seasons)
-            order_date = datetime.fromisoformat(order['created_at'])
-            if self._is_holiday_season(order_date):
+            order_date = timestamp or self._record_time(record)
+            if order_date is not None and self._is_holiday_season(order_date, record.get('country')):
                 intent_scores[IntentType.GIFT.value] += 0.3
                 
             # Bundle analysis - what was bought together
-            if 'items' in order:
-                bundle_intent = self._analyze_bundle(order['items'])
-                for intent, score in bundle_intent.items():
+            if record.get('items'):
+                for intent, score in self._analyze_bundle(record['items']).items():
                     intent_scores[intent] += score
                     
-        # Normalize
-        for intent in intent_scores:
-            intent_scores[intent] /= total_orders
-            
-        return dict(intent_scores)
-    
-    def extract_from_returns(self, product_id: str, returns: List[Dict]) -> Dict[str, float]:
-        """Extract negative signals from return data"""
-        intent_adjustments = defaultdict(float)
-        
-        for return_item in returns:
-            reason = return_item.get('reason', '')
+        elif source == 'returns':
+            reason = record.get('reason', '')
             
             # Size issues suggest fashion/sport intent (fit matters)
             if reason == 'size_issue':
-                intent_adjustments[IntentType.FASHION.value] += 0.1
-                intent_adjustments[IntentType.SPORT.value] += 0.1
+                intent_scores[IntentType.FASHION.value] += 0.1
+                intent_scores[IntentType.SPORT.value] += 0.1
                 
             # Quality expectations suggest professional use
             elif reason == 'quality_expectation':
-                intent_adjustments[IntentType.PROFESSIONAL_USE.value] += 0.2
+                intent_scores[IntentType.PROFESSIONAL_USE.value] += 0.2
                 
             # Changed mind often correlates with impulse/fashion
             elif reason == 'changed_mind':
-                intent_adjustments[IntentType.FASHION.value] += 0.15
+                intent_scores[IntentType.FASHION.value] += 0.15
                 
-        return dict(intent_adjustments)
-    
-    def extract_from_behavior(self, product_id: str, events: List[Dict]) -> Dict[str, float]:
-        """Extract intent from onsite behavior"""
-        intent_scores = defaultdict(float)
-        event_count = defaultdict(int)
-        
-        for event in events:
-            event_type = event['type']
-            event_count[event_type] += 1
+        elif source == 'events':
+            # Specific tool usage indicates intent (see event_intents.DEFAULT_EVENT_TO_INTENT)
+            intent_scores.update(self.event_intents.intent_weights(record))
             
-            # Specific tool usage indicates intent
-            if event_type == 'view_size_guide':
-                intent_scores[IntentType.FASHION.value] += 0.3
-                intent_scores[IntentType.SPORT.value] += 0.2
-                
-            elif event_type == 'view_3d':
-                intent_scores[IntentType.FASHION.value] += 0.2
-                intent_scores[IntentType.LUXURY.value] += 0.1
-                
-            elif event_type == 'use_configurator':
-                intent_scores[IntentType.PROFESSIONAL_USE.value] += 0.3
-                intent_scores[IntentType.HOBBY.value] += 0.2
-                
-            elif event_type == 'compare_products':
-                intent_scores[IntentType.VALUE.value] += 0.2
-                
-            elif event_type == 'read_guide' and 'guide_type' in event:
-                guide = event['guide_type']
-                if 'running' in guide.lower():
-                    intent_scores[IntentType.RUNNING.value] += 0.5
-                elif 'basketball' in guide.lower():
-                    intent_scores[IntentType.BASKETBALL.value] += 0.5
-                    
-        # Normalize by event frequency
-        total_events = sum(event_count.values())
-        if total_events > 0:
-            for intent in intent_scores:
-                intent_scores[intent] /= math.sqrt(total_events)
-                
-        return dict(intent_scores)
-    
-    def extract_from_text(self, product_id: str, texts: List[Dict]) -> Dict[str, float]:
-        """Extract intent from reviews, Q&A, support tickets"""
-        intent_scores = defaultdict(float)
-        
-        # Simplified keyword-based classification (in production: use proper NLP model)
-        intent_keywords = {
-            IntentType.GIFT.value: ['gift', 'present', 'birthday', 'christmas', 'anniversary'],
-            IntentType.SPORT.value: ['running', 'training', 'workout', 'gym', 'athletic'],
-            IntentType.PROFESSIONAL_USE.value: ['work', 'professional', 'office', 'business', 'daily'],
-            IntentType.TRAVEL.value: ['travel', 'trip', 'vacation', 'flight', 'luggage'],
-            IntentType.FASHION.value: ['style', 'look', 'outfit', 'trendy', 'fashion'],
-            IntentType.DAILY_COMMUTE.value: ['commute', 'daily', 'everyday', 'walking', 'comfortable']
-        }
-        
-        for text_item in texts:
-            content = text_item.get('text', '').lower()
-            weight = self._get_text_weight(text_item)
+        elif source == 'texts':
+            weight = self._get_text_weight(record)
             
-            for intent, keywords in intent_keywords.items():
-                matches = sum(1 for kw in keywords if kw in content)
-                if matches > 0:
-                    intent_scores[intent] += matches * weight
-                    
-        # Apply zero-shot classification scores if available
-        if texts and 'intent_probs' in texts[0]:
-            for text_item in texts:
-                for intent, prob in text_item['intent_probs'].items():
-                    intent_scores[intent] += prob * self._get_text_weight(text_item)
-                    
-        # Normalize
-        total_weight = sum(self._get_text_weight(t) for t in texts)
-        if total_weight > 0:
-            for intent in intent_scores:
-                intent_scores[intent] /= total_weight
+            # Keyword matches, all keywords in one scan
+            for intent, matches in self.keyword_matcher.label_counts(record.get('text', '')).items():
+                intent_scores[intent] += matches * weight
                 
-        return dict(intent_scores)
-    
-    def extract_from_channel(self, product_id: str, acquisitions: List[Dict]) -> Dict[str, float]:
-        """Extract intent from acquisition channels"""
-        intent_scores = defaultdict(float)
-        
-        for acq in acquisitions:
-            campaign = acq.get('utm_campaign', '').lower()
-            source = acq.get('utm_source', '').lower()
-            term = acq.get('utm_term', '').lower()
-            landing = acq.get('landing_page', '').lower()
+            # Apply classifier scores if available
+            intent_probs = record.get('intent_probs')
+            if intent_probs is None and self.text_classifier is not None:
+                intent_probs = self.text_classifier.classify([record.get('text', '')])[0]
+            for intent, prob in (intent_probs or {}).items():
+                intent_scores[intent] += prob * weight
+                
+        elif source == 'acquisitions':
+            campaign = (record.get('utm_campaign') or '').lower()
+            term = (record.get('utm_term') or '').lower()
             
             # Campaign-based intent
             if 'gift' in campaign or 'holiday' in campaign:
@@ -207,122 +386,254 @@ class IntentExtractor:
                 
             # Search terms
             if term:
-                for intent_type in IntentType:
-                    if intent_type.value.replace('_', ' ') in term:
-                        intent_scores[intent_type.value] += 0.5
+                for intent, phrase in _INTENT_PHRASES:
+                    if phrase in term:
+                        intent_scores[intent] += 0.5
                         
-        # Normalize
-        total_acquisitions = len(acquisitions)
-        if total_acquisitions > 0:
-            for intent in intent_scores:
-                intent_scores[intent] /= total_acquisitions
-                
-        return dict(intent_scores)
+        else:
+            raise ValueError(f"Unknown intent source: {source}")
+            
+        return intent_scores, weight
+    
+    def normalize_source(self, source: str, scores: np.ndarray, total_weight: float) -> np.ndarray:
+        """Turn summed record contributions (an intent vector) into source scores (see SOURCE_NORMALIZATION)"""
+        normalization = SOURCE_NORMALIZATION[source]
+        if normalization == 'sum':
+            return scores
+        if total_weight <= 0:
+            return np.zeros(len(INTENT_NAMES)) if normalization == 'mean' else scores
+        return scores / (total_weight if normalization == 'mean' else math.sqrt(total_weight))
+    
+    def _fold_source(self,
+                     source: str,
+                     records: Iterable[Dict],
+                     as_of: Optional[datetime] = None,
+                     since_days: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """
+        Intent vector of one source in a single streaming pass
+        
+        With as_of, each record is weighted by its own recency decay and records
+        older than since_days are skipped; without, all records count fully.
+        
+        Returns:
+            (scores, number of records used)
+        """
+        if source == 'events':
+            return self._fold_events(records, as_of, since_days)
+        if source == 'texts' and self.text_classifier is not None:
+            records = self._classified(records)
+            
+        scores = [0.0] * len(INTENT_NAMES)
+        total_weight = 0.0
+        count = 0
+        for record, timestamp, decay in self._decayed(records, as_of, since_days):
+            count += 1
+            intents, weight = self.record_intents(source, record, timestamp)
+            total_weight += weight * decay
+            for intent, score in intents.items():
+                index = INTENT_INDEX.get(intent)
+                if index is None:
+                    raise ValueError(f"Unknown intent '{intent}' from {source} (not an IntentType value)")
+                scores[index] += score * decay
+                    
+        return self.normalize_source(source, np.array(scores), total_weight), count
+    
+    def _fold_events(self,
+                     events: Iterable[Dict],
+                     as_of: Optional[datetime] = None,
+                     since_days: Optional[int] = None) -> Tuple[np.ndarray, int]:
+        """_fold_source for behavior events: table rows are counted, then scored with one matrix product"""
+        rows = []
+        decays = []
+        for event, _, decay in self._decayed(events, as_of, since_days):
+            rows.append(self.event_intents.row(event))
+            decays.append(decay)
+        if not rows:
+            return np.zeros(len(INTENT_NAMES)), 0
+            
+        return self.normalize_source('events', self.event_intents.score_rows(rows, decays), sum(decays)), len(rows)
+    
+    def _decayed(self,
+                 records: Iterable[Dict],
+                 as_of: Optional[datetime],
+                 since_days: Optional[int]) -> Iterator[Tuple[Dict, Optional[datetime], float]]:
+        """(record, timestamp, recency weight) for the records inside the since_days window"""
+        for record in records:
+            decay = 1.0
+            timestamp = None
+            if as_of is not None:
+                timestamp = self._record_time(record)
+                if timestamp is not None:
+                    days_ago = max(0.0, (as_of - timestamp).total_seconds() / 86400)
+                    if since_days is not None and days_ago > since_days:
+                        continue
+                    decay = self._compute_time_weight(days_ago)
+            yield record, timestamp, decay
+    
+    def _classified(self, texts: Iterable[Dict]) -> Iterator[Dict]:
+        """Stream texts with intent_probs filled in, classifying one micro-batch per worker at a time"""
+        classifier = self.text_classifier
+        iterator = iter(texts)
+        while True:
+            chunk = [text_item for _, text_item in zip(range(classifier.window_size), iterator)]
+            if not chunk:
+                return
+            pending = [i for i, text_item in enumerate(chunk) if 'intent_probs' not in text_item]
+            if pending:
+                probs = classifier.classify([chunk[i].get('text', '') for i in pending])
+                for i, intent_probs in zip(pending, probs):
+                    chunk[i] = {**chunk[i], 'intent_probs': intent_probs}
+            yield from chunk
     
     def compute_intent_signals(self, 
                               product_id: str,
                               data_sources: Dict[str, Any],
-                              since_days: int = 365) -> List[IntentSignal]:
+                              since_days: int = 365,
+                              as_of: Optional[datetime] = None) -> List[IntentSignal]:
         """
         Compute final intent signals by mixing all sources
         
         Args:
             product_id: Product identifier
-            data_sources: Dict with keys 'orders', 'returns', 'events', 'texts', 'acquisitions'
+            data_sources: Dict with keys 'orders', 'returns', 'events', 'texts', 'acquisitions';
+                values may be lists or any iterator (e.g. a DB cursor generator)
             since_days: Time window for data consideration
+            as_of: Reference time for recency decay (defaults to now); every
+                record is weighted by exp(-age_days / recency_half_life_days)
             
         Returns:
             List of IntentSignal objects with shares summing to 1.0
         """
+        return self.compute_intent_vector(product_id, data_sources, since_days, as_of).signals()
+    
+    def compute_intent_vector(self,
+                              product_id: str,
+                              data_sources: Dict[str, Any],
+                              since_days: int = 365,
+                              as_of: Optional[datetime] = None) -> IntentVector:
+        """compute_intent_signals without building IntentSignal objects or evidence strings"""
+        as_of = self._reference_time(as_of)
         
-        # Extract from each source
-        order_intents = self.extract_from_orders(product_id, data_sources.get('orders', []))
-        return_intents = self.extract_from_returns(product_id, data_sources.get('returns', []))
-        behavior_intents = self.extract_from_behavior(product_id, data_sources.get('events', []))
-        text_intents = self.extract_from_text(product_id, data_sources.get('texts', []))
-        channel_intents = self.extract_from_channel(product_id, data_sources.get('acquisitions', []))
-        
-        # Mix sources with time decay
-        all_intents = set()
-        all_intents.update(order_intents.keys())
-        all_intents.update(return_intents.keys())
-        all_intents.update(behavior_intents.keys())
-        all_intents.update(text_intents.keys())
-        all_intents.update(channel_intents.keys())
+        # Each source is consumed exactly once as a stream
+        source_scores = {}
+        source_counts = {}
+        for name in INTENT_SOURCES:
+            if name in data_sources:
+                source_scores[name], source_counts[name] = self._fold_source(
+                    name, data_sources[name], as_of, since_days
+                )
+                
+        return self.mix_sources(source_scores, source_counts)
+    
+    def mix_sources(self, source_scores: Dict[str, np.ndarray], source_counts: Dict[str, int]) -> IntentVector:
+        """
+        Mix per-source intent vectors into smoothed intent shares
         
-        mixed_scores = {}
-        for intent in all_intents:
-            score = 0
-            score += self.weights['cart'] * order_intents.get(intent, 0)
-            score += self.weights['cart'] * return_intents.get(intent, 0) * 0.5  # Returns are negative signal
-            score += self.weights['behavior'] * behavior_intents.get(intent, 0)
-            score += self.weights['text'] * text_intents.get(intent, 0)
-            score += self.weights['channel'] * channel_intents.get(intent, 0)
-            
-            # Apply time decay
-            score *= self._compute_time_weight(since_days)
-            mixed_scores[intent] = score
+        Args:
+            source_scores: Source name -> intent vector (already recency weighted and normalized)
+            source_counts: Source name -> number of records behind the scores
+        """
+        mixed = np.zeros(len(INTENT_NAMES))
+        for source, scores in source_scores.items():
+            mixed += self._source_weights[source] * scores
             
-        # Dirichlet smoothing
-        smoothed_scores = self._dirichlet_smooth(mixed_scores, len(IntentType))
+        return IntentVector(
+            shares=self._dirichlet_smooth(mixed),
+            confidence=self._compute_confidence(source_counts),
+            sources=source_scores,
+            method=f"mixed_weights:{self.weights}",
+            last_updated=datetime.now()
+        )
+    
+    @property
+    def _source_weights(self) -> Dict[str, float]:
+        """Mixing weight of each source (returns are a negative signal at half weight)"""
+        return {
+            'orders': self.weights['cart'],
+            'returns': self.weights['cart'] * 0.5,
+            'events': self.weights['behavior'],
+            'texts': self.weights['text'],
+            'acquisitions': self.weights['channel']
+        }
+    
+    def compute_intent_signals_batch(self,
+                                     data_sources: Dict[str, Iterable[Dict]],
+                                     since_days: int = 365,
+                                     presorted: bool = True,
+                                     as_of: Optional[datetime] = None,
+                                     as_vectors: bool = False) -> Iterator[Tuple[Any, Union[List[IntentSignal], IntentVector]]]:
+        """
+        Compute intent signals for every product in one pass over each source
         
-        # Create IntentSignal objects
-        signals = []
-        for intent, share in smoothed_scores.items():
-            evidence = []
-            if intent in order_intents:
-                evidence.append(f"orders:{order_intents[intent]:.2f}")
-            if intent in text_intents:
-                evidence.append(f"text:{text_intents[intent]:.2f}")
-            if intent in behavior_intents:
-                evidence.append(f"behavior:{behavior_intents[intent]:.2f}")
-                
-            signal = IntentSignal(
-                intent=intent,
-                share=share,
-                confidence=self._compute_confidence(data_sources),
-                method=f"mixed_weights:{self.weights}",
-                evidence=evidence,
-                last_updated=datetime.now()
-            )
-            signals.append(signal)
+        Args:
+            data_sources: Source name ('orders', 'returns', 'events', 'texts',
+                'acquisitions') -> one catalog-wide stream of records tagged
+                with product_id, e.g. the SQL_BATCH_QUERIES scans
+            since_days: Time window for data consideration
+            presorted: Streams are ordered by product_id (ORDER BY product_id),
+                so each product is scored as soon as its records are read, in
+                constant memory. With False, records are grouped in memory first.
+            as_of: Reference time for recency decay (defaults to now, fixed for the whole run)
+            as_vectors: Yield IntentVector results, skipping IntentSignal and
+                evidence formatting until the caller asks for them
             
-        # Sort by share descending
-        signals.sort(key=lambda s: s.share, reverse=True)
+        Yields:
+            (product_id, signals or vector) for every product present in any
+            source, in product_id order
+        """
+        streams = {name: source for name, source in data_sources.items() if name in INTENT_SOURCES}
+        if not presorted:
+            streams = {name: self._sorted_by_product(source) for name, source in streams.items()}
+        groups = [ProductGroupedSource(name, source) for name, source in streams.items()]
+        as_of = self._reference_time(as_of)
         
-        return signals
+        while True:
+            pending = [g.peek() for g in groups if g.peek() is not None]
+            if not pending:
+                return
+            product_id = min(pending)
+            sources = {g.name: g.group(product_id) for g in groups if g.peek() == product_id}
+            vector = self.compute_intent_vector(product_id, sources, since_days, as_of)
+            # Extractors read their groups to the end; drain defensively to stay aligned
+            for group in sources.values():
+                for _ in group:
+                    pass
+            yield product_id, vector if as_vectors else vector.signals()
     
-    def _analyze_bundle(self, items: List[Dict]) -> Dict[str, float]:
-        """Analyze product bundles for intent patterns"""
-        bundle_intents = defaultdict(float)
-        
-        # Simple heuristics - in production use association rules
-        categories = [item.get('category', '') for item in items]
-        
-        if 'running_shoes' in categories and 'running_socks' in categories:
-            bundle_intents[IntentType.RUNNING.value] += 0.8
-            bundle_intents[IntentType.SPORT.value] += 0.5
-            
-        if 'dress_shoes' in categories and 'dress_shirt' in categories:
-            bundle_intents[IntentType.PROFESSIONAL_USE.value] += 0.7
-            
-        return dict(bundle_intents)
+    def _sorted_by_product(self, records: Iterable[Dict]) -> List[Dict]:
+        """Group an unordered stream by product_id (stable within each product)"""
+        by_product = defaultdict(list)
+        for record in records:
+            by_product[record['product_id']].append(record)
+        return [record for product_id in sorted(by_product) for record in by_product[product_id]]
     
-    def _is_holiday_season(self, date: datetime) -> bool:
-        """Check if date falls in typical gift-giving season"""
-        month_day = (date.month, date.day)
+    async def compute_intent_signals_async(self,
+                                           product_id: str,
+                                           data_sources: Dict[str, Any],
+                                           since_days: int = 365,
+                                           chunk_size: int = 1000,
+                                           as_of: Optional[datetime] = None) -> List[IntentSignal]:
+        """
+        compute_intent_signals for sources that are async iterators
         
-        # Christmas season
-        if (11, 15) <= month_day <= (12, 31):
-            return True
-        # Valentine's
-        if (2, 1) <= month_day <= (2, 14):
-            return True
-        # Mother's/Father's day (approximate)
-        if (5, 1) <= month_day <= (5, 31) or (6, 1) <= month_day <= (6, 20):
-            return True
-            
-        return False
+        The extraction runs in a worker thread and pulls async sources from
+        this event loop in chunks of chunk_size records, so memory stays
+        bounded. Lists and sync iterators may be mixed in.
+        """
+        loop = asyncio.get_running_loop()
+        bridged = {
+            name: AsyncSourceBridge(source, loop, chunk_size) if hasattr(source, '__aiter__') else source
+            for name, source in data_sources.items()
+        }
+        return await loop.run_in_executor(None, self.compute_intent_signals, product_id, bridged, since_days, as_of)
+    
+    def _analyze_bundle(self, items: List[Dict]) -> Dict[str, float]:
+        """Analyze product bundles for intent patterns (see bundle_rules.BundleRuleTable)"""
+        return self.bundle_rules.match([item.get('category', '') for item in items])
+    
+    def _is_holiday_season(self, date: datetime, locale: Optional[str] = None) -> bool:
+        """Check if date falls in a gift-giving season (Christmas, Valentine's, Mother's/Father's Day of the locale)"""
+        return self.gift_calendar.is_gift_season(date, locale or self.locale)
     
     def _get_text_weight(self, text_item: Dict) -> float:
         """Weight text by source and verification status"""
@@ -339,40 +650,43 @@ class IntentExtractor:
             
         return base_weight
     
-    def _compute_time_weight(self, days_ago: int) -> float:
+    def _record_time(self, record: Dict) -> Optional[datetime]:
+        """Naive UTC timestamp of a record (created_at or timestamp), or None"""
+        value = record.get('created_at') or record.get('timestamp')
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return parse_timestamp(value)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    
+    def _reference_time(self, as_of: Optional[datetime]) -> datetime:
+        """Naive UTC decay reference time, like _record_time (defaults to now)"""
+        if as_of is None:
+            return datetime.now(timezone.utc).replace(tzinfo=None)
+        if as_of.tzinfo is not None:
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        return as_of
+    
+    def _compute_time_weight(self, days_ago: float) -> float:
         """Exponential decay weight based on recency"""
         return math.exp(-days_ago / self.recency_half_life_days)
     
-    def _dirichlet_smooth(self, scores: Dict[str, float], num_classes: int) -> Dict[str, float]:
-        """Apply Dirichlet smoothing for small sample sizes"""
-        total = sum(scores.values())
-        smoothed = {}
-        
-        for intent in scores:
-            count = scores[intent] * 100  # Scale to pseudo-counts
-            smoothed[intent] = (count + self.dirichlet_alpha) / (total * 100 + num_classes * self.dirichlet_alpha)
-            
-        # Add small probability for unseen intents
-        for intent_type in IntentType:
-            if intent_type.value not in smoothed:
-                smoothed[intent_type.value] = self.dirichlet_alpha / (total * 100 + num_classes * self.dirichlet_alpha)
-                
-        # Normalize to sum to 1
-        total_smoothed = sum(smoothed.values())
-        for intent in smoothed:
-            smoothed[intent] /= total_smoothed
-            
-        return smoothed
+    def _dirichlet_smooth(self, scores: np.ndarray) -> np.ndarray:
+        """Apply Dirichlet smoothing for small sample sizes (unseen intents are the zero entries)"""
+        smoothed = scores * 100 + self.dirichlet_alpha
+        return smoothed / smoothed.sum()
     
-    def _compute_confidence(self, data_sources: Dict) -> float:
-        """Compute confidence score based on data availability"""
+    def _compute_confidence(self, source_counts: Dict[str, int]) -> float:
+        """Compute confidence score based on data availability (records per source)"""
         confidence = 0.0
         weights = {'orders': 0.3, 'events': 0.2, 'texts': 0.3, 'returns': 0.1, 'acquisitions': 0.1}
         
         for source, weight in weights.items():
-            if source in data_sources and len(data_sources[source]) > 0:
+            if source_counts.get(source, 0) > 0:
                 # More data = higher confidence (with diminishing returns)
-                n = len(data_sources[source])
+                n = source_counts[source]
                 confidence += weight * min(1.0, math.log(n + 1) / math.log(100))
                 
         return min(1.0, confidence)
@@ -433,6 +747,104 @@ SQL_QUERIES = {
 }
 
 
+# Catalog-wide raw record scans for IntentExtractor.compute_intent_signals_batch.
+# One row per record in the shape the extract_from_* methods read. Product ids are
+# text ordered with COLLATE "C" (code point order), which is the order Python's < gives
+# strings, so the batch API can merge the scans and score each product as soon as its
+# rows have streamed past. Tables and columns are those of SQL_QUERIES and
+# kpi_calculator.SQL_KPI_QUERIES; events carry no guide topic there, so
+# 'read_guide:<topic>' rules only apply to records that include guide_type.
+SQL_BATCH_QUERIES = {
+    'orders': """
+        WITH recent_lines AS (
+            SELECT DISTINCT
+                oi.order_id,
+                oi.product_id::text AS product_id,
+                c.slug AS category,
+                o.created_at,
+                o.gift_wrap,
+                o.gift_message
+            FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            LEFT JOIN products p ON p.id = oi.product_id
+            LEFT JOIN categories c ON c.id = p.category_id
+            WHERE o.created_at >= CURRENT_DATE - INTERVAL '365 days'
+        ),
+        order_categories AS (
+            SELECT
+                order_id,
+                json_agg(json_build_object('category', category)) AS items
+            FROM recent_lines
+            GROUP BY order_id
+        )
+        SELECT
+            l.product_id,
+            to_char(l.created_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS created_at,
+            l.gift_wrap,
+            l.gift_message,
+            oc.items
+        FROM recent_lines l
+        JOIN order_categories oc ON oc.order_id = l.order_id
+        ORDER BY l.product_id COLLATE "C"
+    """,
+    
+    'returns': """
+        SELECT
+            product_id::text AS product_id,
+            return_reason AS reason,
+            to_char(return_date, 'YYYY-MM-DD"T"HH24:MI:SS') AS created_at
+        FROM returns
+        WHERE return_date >= CURRENT_DATE - INTERVAL '180 days'
+        ORDER BY product_id::text COLLATE "C"
+    """,
+    
+    'behavior_events': """
+        SELECT
+            product_id::text AS product_id,
+            event_type AS type,
+            to_char(timestamp, 'YYYY-MM-DD"T"HH24:MI:SS') AS timestamp
+        FROM user_events
+        WHERE timestamp >= CURRENT_DATE - INTERVAL '90 days'
+        ORDER BY product_id::text COLLATE "C"
+    """,
+    
+    'reviews': """
+        SELECT
+            product_id::text AS product_id,
+            COALESCE(text, '') AS text,
+            COALESCE(verified_purchase, FALSE) AS verified_purchase,
+            'review' AS source,
+            to_char(created_at, 'YYYY-MM-DD"T"HH24:MI:SS') AS created_at
+        FROM reviews
+        WHERE created_at >= CURRENT_DATE - INTERVAL '365 days'
+        ORDER BY product_id::text COLLATE "C"
+    """,
+    
+    'channel_attribution': """
+        SELECT
+            oi.product_id::text AS product_id,
+            COALESCE(s.utm_campaign, '') AS utm_campaign,
+            COALESCE(s.utm_source, '') AS utm_source,
+            COALESCE(s.utm_term, '') AS utm_term,
+            COALESCE(s.landing_page, '') AS landing_page
+        FROM sessions s
+        JOIN orders o ON o.session_id = s.id
+        JOIN order_items oi ON oi.order_id = o.id
+        WHERE s.created_at >= CURRENT_DATE - INTERVAL '180 days'
+        ORDER BY oi.product_id::text COLLATE "C"
+    """
+}
+
+# compute_intent_signals_batch source name for each SQL_BATCH_QUERIES scan
+SQL_BATCH_SOURCES = {
+    'orders': 'orders',
+    'returns': 'returns',
+    'behavior_events': 'events',
+    'reviews': 'texts',
+    'channel_attribution': 'acquisitions'
+}
+
+
 def example_usage():
     """Example of intent extraction pipeline"""
     
@@ -465,7 +877,7 @@ def example_usage():
         ]
     }
     
-    signals = extractor.compute_intent_signals('sku_123', data_sources)
+    signals = extractor.compute_intent_signals('sku_123', data_sources, as_of=datetime(2025, 12, 31))
     
     for signal in signals:
         print(f"{signal.intent}: {signal.share:.2%} (confidence: {signal.confidence:.2f})")
@@ -0,0 +1,305 @@
+"""
+AXP Incremental Intent State
+Exponentially decayed per-product intent sums maintained from new records
+"""
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Any, Callable, Iterable, Tuple
+from dataclasses import dataclass, field
+from collections import defaultdict
+
+from .intent_extractor import IntentExtractor, IntentSignal, INTENT_SOURCES, intent_vector, check_intents
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass
+class DecayedSum:
+    """
+    Recency-decayed contributions of one source, anchored at ref_day
+
+    Every sum holds sum_i c_i * exp(-(ref_day - day_i) / half_life); moving
+    the anchor forward rescales all of them by one factor.
+    """
+    ref_day: Optional[float] = None  # days since epoch
+    weight: float = 0.0
+    scores: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    count: int = 0
+
+    def add(self, day: Optional[float], intents: Dict[str, float], weight: float,
+            decay: Callable[[float], float]):
+        """
+        Fold one record's contributions
+        
+        Args:
+            day: Record time in days since epoch (None: undated, counted as
+                current when applied, or at the anchor if that is later)
+            intents: Contributions from IntentExtractor.record_intents
+            weight: Record weight in the source normalization
+            decay: Decay factor for an age in days
+        """
+        if day is None:
+            day = epoch_day(datetime.now(timezone.utc))
+            if self.ref_day is not None:
+                day = max(day, self.ref_day)
+        if self.ref_day is None:
+            self.ref_day = day
+
+        if day > self.ref_day:
+            # Newer record: age everything accumulated so far, then anchor here
+            factor = decay(day - self.ref_day)
+            self.weight *= factor
+            for intent in self.scores:
+                self.scores[intent] *= factor
+            self.ref_day = day
+            factor = 1.0
+        else:
+            factor = decay(self.ref_day - day)
+
+        self.weight += weight * factor
+        for intent, score in intents.items():
+            self.scores[intent] += score * factor
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state"""
+        return {'ref_day': self.ref_day, 'weight': self.weight, 'scores': dict(self.scores), 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DecayedSum':
+        """Restore a sum written by to_dict()"""
+        return cls(data['ref_day'], data['weight'], defaultdict(float, data['scores']), data['count'])
+
+
+def mix_decayed(extractor: IntentExtractor, sums: Dict[str, DecayedSum], day: float) -> List[IntentSignal]:
+    """Decay every source sum to day, normalize it and mix the sources into signals"""
+    source_scores = {}
+    source_counts = {}
+    for source, state in sums.items():
+        factor = extractor._compute_time_weight(max(0.0, day - state.ref_day))
+        scores = intent_vector(state.scores) * factor
+        source_scores[source] = extractor.normalize_source(source, scores, state.weight * factor)
+        source_counts[source] = state.count
+    return extractor.mix_sources(source_scores, source_counts).signals()
+
+
+def epoch_day(value: datetime) -> float:
+    """Fractional days since epoch of a (naive UTC or aware) datetime"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds() / 86400
+
+
+class IntentDecayState:
+    """
+    Maintain intent scores incrementally as orders, events, texts, returns and acquisitions arrive
+
+    Each apply() folds one record into per-product, per-source decayed sums in
+    O(1), so scores never require rescanning history. signals() decays the sums
+    to as_of and mixes them exactly like IntentExtractor.compute_intent_signals
+    does for the same records (without a since_days cut-off: old records fade
+    out through the decay instead).
+    """
+
+    def __init__(self, extractor: Optional[IntentExtractor] = None):
+        self.extractor = extractor or IntentExtractor()
+        self.products: Dict[str, Dict[str, DecayedSum]] = {}
+        self.dirty: Set[str] = set()
+
+    def apply(self, source: str, record: Dict):
+        """
+        Fold one record tagged with product_id
+
+        Args:
+            source: Source name (see INTENT_SOURCES)
+            record: Record in the shape compute_intent_signals reads, with
+                created_at or timestamp; undated records count as current
+        """
+        if source not in INTENT_SOURCES:
+            raise ValueError(f"Unknown intent source: {source}")
+
+        product_id = str(record['product_id'])
+        timestamp = self.extractor._record_time(record)
+        intents, weight = self.extractor.record_intents(source, record, timestamp)
+        # Reject a bad record before it reaches the sums, where it would break every read
+        check_intents(intents, source)
+        state = self.products.setdefault(product_id, {}).setdefault(source, DecayedSum())
+        state.add(epoch_day(timestamp) if timestamp is not None else None,
+                  intents, weight, self.extractor._compute_time_weight)
+        self.dirty.add(product_id)
+
+    def signals(self, product_id: str, as_of: Optional[datetime] = None) -> List[IntentSignal]:
+        """Intent signals of one product with all sums decayed to as_of (defaults to now)"""
+        return mix_decayed(self.extractor, self.products.get(str(product_id), {}), epoch_day(as_of or datetime.now(timezone.utc)))
+
+    def emit(self, as_of: Optional[datetime] = None) -> Dict[str, List[IntentSignal]]:
+        """Signals for products that received records since the previous emit"""
+        results = {product_id: self.signals(product_id, as_of) for product_id in self.dirty}
+        self.dirty = set()
+        return results
+
+    def save(self, path: str):
+        """Write all decayed sums as JSON"""
+        payload = {
+            'half_life_days': self.extractor.recency_half_life_days,
+            'products': {
+                product_id: {source: state.to_dict() for source, state in sources.items()}
+                for product_id, sources in self.products.items()
+            }
+        }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str, extractor: Optional[IntentExtractor] = None) -> 'IntentDecayState':
+        """Read state written by save(); the extractor must use the same half-life"""
+        with open(path) as f:
+            payload = json.load(f)
+        state = cls(extractor)
+        if payload['half_life_days'] != state.extractor.recency_half_life_days:
+            raise ValueError(
+                f"State was decayed with a half-life of {payload['half_life_days']} days, "
+                f"extractor uses {state.extractor.recency_half_life_days}"
+            )
+        state.products = {
+            product_id: {source: DecayedSum.from_dict(raw) for source, raw in sources.items()}
+            for product_id, sources in payload['products'].items()
+        }
+        return state
+
+
+class IntentStateStore:
+    """
+    On-disk IntentDecayState in SQLite, for minutes-fresh intent shares at catalog scale
+
+    Decayed sums are kept per product, source and intent in two WITHOUT ROWID
+    tables keyed by product_id, so signals() for one product is a constant
+    number of primary-key reads however long its history. apply() folds a
+    record with the same rules as the extract_from_* methods into a
+    write-back cache of touched products; flush() writes them in one
+    transaction (automatically every flush_every products, and on close()).
+    """
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        """CREATE TABLE IF NOT EXISTS intent_sources (
+            product_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            ref_day REAL NOT NULL,
+            weight REAL NOT NULL,
+            record_count INTEGER NOT NULL,
+            PRIMARY KEY (product_id, source)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS intent_sums (
+            product_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            intent TEXT NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (product_id, source, intent)
+        ) WITHOUT ROWID"""
+    ]
+
+    def __init__(self, path: str, extractor: Optional[IntentExtractor] = None, flush_every: int = 10000):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            extractor: Extractor whose rules and half-life are applied
+            flush_every: Touched products buffered in memory before a flush
+        """
+        self.extractor = extractor or IntentExtractor()
+        self.flush_every = flush_every
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            for statement in self.SCHEMA:
+                self.conn.execute(statement)
+            half_life = str(self.extractor.recency_half_life_days)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'half_life_days'").fetchone()
+            if row is None:
+                self.conn.execute("INSERT INTO meta VALUES ('half_life_days', ?)", (half_life,))
+            elif row[0] != half_life:
+                raise ValueError(f"Store was decayed with a half-life of {row[0]} days, extractor uses {half_life}")
+        self._pending: Dict[str, Dict[str, DecayedSum]] = {}
+
+    def apply(self, source: str, record: Dict):
+        """Fold one record tagged with product_id (see IntentDecayState.apply)"""
+        if source not in INTENT_SOURCES:
+            raise ValueError(f"Unknown intent source: {source}")
+
+        product_id = str(record['product_id'])
+        timestamp = self.extractor._record_time(record)
+        intents, weight = self.extractor.record_intents(source, record, timestamp)
+        # Reject a bad record before it is buffered and flushed
+        check_intents(intents, source)
+
+        sums = self._pending.get(product_id)
+        if sums is None:
+            if len(self._pending) >= self.flush_every:
+                self.flush()
+            sums = self._pending[product_id] = self._read(product_id)
+        sums.setdefault(source, DecayedSum()).add(
+            epoch_day(timestamp) if timestamp is not None else None,
+            intents, weight, self.extractor._compute_time_weight
+        )
+
+    def apply_many(self, records: Iterable[Tuple[str, Dict]]):
+        """Fold a stream of (source, record) pairs and flush"""
+        for source, record in records:
+            self.apply(source, record)
+        self.flush()
+
+    def signals(self, product_id: str, as_of: Optional[datetime] = None) -> List[IntentSignal]:
+        """Intent signals of one product decayed to as_of (defaults to now), including unflushed records"""
+        product_id = str(product_id)
+        sums = self._pending.get(product_id)
+        if sums is None:
+            sums = self._read(product_id)
+        return mix_decayed(self.extractor, sums, epoch_day(as_of or datetime.now(timezone.utc)))
+
+    def flush(self):
+        """Write all buffered products in one transaction"""
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO intent_sources VALUES (?, ?, ?, ?, ?)",
+                [
+                    (product_id, source, state.ref_day, state.weight, state.count)
+                    for product_id, sums in self._pending.items()
+                    for source, state in sums.items()
+                ]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO intent_sums VALUES (?, ?, ?, ?)",
+                [
+                    (product_id, source, intent, value)
+                    for product_id, sums in self._pending.items()
+                    for source, state in sums.items()
+                    for intent, value in state.scores.items()
+                ]
+            )
+        self._pending = {}
+
+    def close(self):
+        """Flush and close the database"""
+        self.flush()
+        self.conn.close()
+
+    def _read(self, product_id: str) -> Dict[str, DecayedSum]:
+        """Stored sums of one product"""
+        sums = {
+            source: DecayedSum(ref_day, weight, defaultdict(float), count)
+            for source, ref_day, weight, count in self.conn.execute(
+                "SELECT source, ref_day, weight, record_count FROM intent_sources WHERE product_id = ?",
+                (product_id,)
+            )
+        }
+        for source, intent, value in self.conn.execute(
+            "SELECT source, intent, value FROM intent_sums WHERE product_id = ?", (product_id,)
+        ):
+            sums[source].scores[intent] = value
+        return sums
@@ -0,0 +1,103 @@
+"""
+AXP Keyword Matcher
+Compiled multi-pattern keyword matching with word boundaries
+"""
+
+import string
+from typing import Dict, List, Tuple, Iterable, Set
+
+# Punctuation treated as whitespace; keywords and texts are split the same way,
+# so matches fall on word boundaries (str.translate + split is ~2x faster than re)
+_SEPARATORS = str.maketrans({
+    c: ' ' for c in string.punctuation.replace('_', '') + '\u2018\u2019\u201c\u201d\u2013\u2014\u2026'
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text"""
+    return text.lower().translate(_SEPARATORS).split()
+
+
+# Trie node key marking "a keyword ends here"
+_END = ''
+
+
+class KeywordMatcher:
+    """
+    Keyword taxonomy compiled into a token trie
+
+    A text is tokenized once (in C, via str.translate). Single-word keywords are found
+    with one set intersection against the text's distinct tokens; the trie is
+    only walked from positions where a multi-word keyword starts. This is the
+    word-level equivalent of an Aho-Corasick automaton: cost is linear in the
+    text and independent of the number of keywords. Keywords only match whole
+    words ('work' does not match 'workout').
+
+    Instances are immutable; swap in a new matcher to change the taxonomy.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        """
+        Args:
+            taxonomy: Label (e.g. intent) -> keywords or multi-word phrases.
+                A keyword listed under several labels counts for each.
+        """
+        self.taxonomy = {label: list(keywords) for label, keywords in taxonomy.items()}
+        self.keywords: List[str] = []
+        self._labels: List[Tuple[str, ...]] = []
+        self._trie: Dict[str, dict] = {}
+        self._single: Dict[str, int] = {}  # one-word keyword -> id
+        self._phrase_starts: Set[str] = set()  # first tokens of multi-word keywords
+
+        ids: Dict[Tuple[str, ...], int] = {}
+        for label, keywords in self.taxonomy.items():
+            for keyword in keywords:
+                tokens = tuple(tokenize(keyword))
+                if not tokens:
+                    continue
+                keyword_id = ids.get(tokens)
+                if keyword_id is None:
+                    keyword_id = ids[tokens] = len(self.keywords)
+                    self.keywords.append(' '.join(tokens))
+                    self._labels.append(())
+                    node = self._trie
+                    for token in tokens:
+                        node = node.setdefault(token, {})
+                    node[_END] = keyword_id
+                    if len(tokens) == 1:
+                        self._single[tokens[0]] = keyword_id
+                    else:
+                        self._phrase_starts.add(tokens[0])
+                if label not in self._labels[keyword_id]:
+                    self._labels[keyword_id] += (label,)
+
+    def find(self, text: str) -> Set[int]:
+        """IDs (indexes into self.keywords) of the distinct keywords occurring in text"""
+        tokens = tokenize(text)
+        present = set(tokens)
+        single = self._single
+        found = {single[token] for token in single.keys() & present}
+
+        if self._phrase_starts.isdisjoint(present):
+            return found
+
+        trie = self._trie
+        for i, token in enumerate(tokens):
+            if token not in self._phrase_starts:
+                continue
+            node = trie[token]
+            for j in range(i + 1, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    found.add(node[_END])
+        return found
+
+    def label_counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each label occurring in text"""
+        counts: Dict[str, int] = {}
+        for keyword_id in self.find(text):
+            for label in self._labels[keyword_id]:
+                counts[label] = counts.get(label, 0) + 1
+        return counts
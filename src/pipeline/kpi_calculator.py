@@ -3,12 +3,22 @@ AXP Soft KPI Calculator
 Precise calculation of soft signals from measurable sub-factors
 """
 
+import hashlib
+import json
 import math
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
-from enum import Enum
-import statistics
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterator, Sequence, Union
+from dataclasses import dataclass
+from array import array
+
+import numpy as np
+
+from .category_baselines import CategoryBaselineIndex, CategoryBaselineCache
+from .quantile_sketch import CategorySketchIndex
+from .kpi_formulas import (
+    SCORE_NAMES, CompiledFormula, FormulaColumns, FormulaRegistry, default_formula_registry
+)
 
 
 @dataclass
@@ -21,6 +31,84 @@ class KPIEvidence:
     timestamp: datetime
 
 
+# Interned evidence factor and source names (code -> name and name -> code)
+_EVIDENCE_NAMES: List[str] = []
+_EVIDENCE_CODES: Dict[str, int] = {}
+
+
+def _intern_evidence_name(name: str) -> int:
+    """Small-int code for a factor or source name, assigned on first use"""
+    code = _EVIDENCE_CODES.get(name)
+    if code is None:
+        code = len(_EVIDENCE_NAMES)
+        _EVIDENCE_NAMES.append(name)
+        _EVIDENCE_CODES[name] = code
+    return code
+
+
+class EvidenceStore:
+    """
+    Array-backed evidence for one calculation
+
+    Factors and sources are stored as interned small-int codes, values and
+    confidences as packed doubles, and all records share one timestamp.
+    KPIEvidence objects are only built when the store is iterated or indexed;
+    to_list() returns the full list-of-KPIEvidence view.
+    """
+    __slots__ = ('timestamp', '_factors', '_sources', '_values', '_confidences')
+
+    def __init__(self, timestamp: Optional[datetime] = None):
+        self.timestamp = timestamp or datetime.now()
+        self._factors = array('H')
+        self._sources = array('H')
+        self._values = array('d')
+        self._confidences = array('d')
+
+    def add(self, factor: str, value: float, source: str, confidence: float):
+        """Record one evidence entry"""
+        self._factors.append(_intern_evidence_name(factor))
+        self._sources.append(_intern_evidence_name(source))
+        self._values.append(value)
+        self._confidences.append(confidence)
+
+    def extend(self, other: 'EvidenceStore'):
+        """Append all entries of another store (its timestamp is not kept)"""
+        self._factors.extend(other._factors)
+        self._sources.extend(other._sources)
+        self._values.extend(other._values)
+        self._confidences.extend(other._confidences)
+
+    def to_list(self) -> List[KPIEvidence]:
+        """Materialize the list-of-KPIEvidence view"""
+        return [self[i] for i in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[KPIEvidence, List[KPIEvidence]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return KPIEvidence(
+            factor=_EVIDENCE_NAMES[self._factors[index]],
+            value=self._values[index],
+            source=_EVIDENCE_NAMES[self._sources[index]],
+            confidence=self._confidences[index],
+            timestamp=self.timestamp
+        )
+
+    def __iter__(self) -> Iterator[KPIEvidence]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, EvidenceStore):
+            other = other.to_list()
+        return isinstance(other, list) and self.to_list() == other
+
+    def __repr__(self) -> str:
+        return f"EvidenceStore({self.to_list()!r})"
+
+
 @dataclass
 class SoftSignals:
     """Complete soft signals with evidence"""
@@ -32,45 +120,112 @@ class SoftSignals:
     craftsmanship_score: float
     sustainability_score: float
     innovation_score: float
-    evidence: List[KPIEvidence]
+    evidence: EvidenceStore  # list-like; evidence.to_list() for List[KPIEvidence]
     calculation_method: str
     last_updated: datetime
+    input_hash: Optional[str] = None  # set when memoized, see KPICalculator.input_hash
+
+
+class KPIMemoCache:
+    """
+    Content-addressed SoftSignals cache keyed by KPICalculator.input_hash
+
+    A hit returns the stored SoftSignals unchanged (including last_updated and
+    evidence timestamps), so unchanged products produce identical output.
+    Least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, SoftSignals]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[SoftSignals]:
+        """Cached signals for an input hash, or None"""
+        signals = self._entries.get(key)
+        if signals is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return signals
+
+    def put(self, key: str, signals: SoftSignals):
+        """Store signals under their input hash"""
+        self._entries[key] = signals
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def save(self, path: str):
+        """Write all entries as JSON (evidence as [factor, value, source, confidence] rows)"""
+        payload = {}
+        for key, signals in self._entries.items():
+            payload[key] = {
+                'scores': {name: getattr(signals, f"{name}_score") for name in SCORE_NAMES},
+                'evidence': [[e.factor, e.value, e.source, e.confidence] for e in signals.evidence],
+                'calculation_method': signals.calculation_method,
+                'last_updated': signals.last_updated.isoformat()
+            }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str, max_entries: int = 100000) -> 'KPIMemoCache':
+        """Read a cache written by save()"""
+        with open(path) as f:
+            payload = json.load(f)
+
+        cache = cls(max_entries)
+        for key, raw in payload.items():
+            evidence = EvidenceStore(datetime.fromisoformat(raw['last_updated']))
+            for factor, value, source, confidence in raw['evidence']:
+                evidence.add(factor, value, source, confidence)
+            cache.put(key, SoftSignals(
+                **{f"{name}_score": score for name, score in raw['scores'].items()},
+                evidence=evidence,
+                calculation_method=raw['calculation_method'],
+                last_updated=evidence.timestamp,
+                input_hash=key
+            ))
+        return cache
 
 
 class KPICalculator:
     """Calculate all soft KPIs with proper normalization and evidence tracking"""
     
-    def __init__(self):
-        # Weights for different factors (calibrated from data)
-        self.weights = {
-            'fit_hint': {
-                'return_size': -0.4,  # negative correlation
-                'exchange_size': -0.2,
-                'advisor_usage': 0.2,
-                'aspect_fit_positive': 0.2
-            },
-            'reliability': {
-                'rma_rate': -0.3,
-                'claim_rate': -0.3,
-                'mtbf': 0.2,
-                'warranty_claims': -0.1,
-                'aspect_durability': 0.1
-            },
-            'performance': {
-                'benchmark_scores': 0.4,
-                'energy_return': 0.2,
-                'weight_factor': 0.1,
-                'lab_tests': 0.3
-            },
-            'owner_satisfaction': {
-                'rating_verified': 0.4,
-                'csat_product': 0.3,
-                'recent_sentiment': 0.2,
-                'repeat_purchase': 0.1
-            }
-        }
-        
-    def calculate_fit_hint_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def __init__(self,
+                 baselines: Optional[Union[CategoryBaselineIndex, CategoryBaselineCache]] = None,
+                 formulas: Optional[FormulaRegistry] = None,
+                 clock: Optional[Callable[[], datetime]] = None,
+                 memo: Optional[KPIMemoCache] = None,
+                 sketches: Optional[CategorySketchIndex] = None):
+        """
+        Args:
+            baselines: Optional category baseline index (or TTL cache of one); when set,
+                missing category_* normalization fields are injected automatically
+            formulas: Scoring formula specs (calibrated weights per score and category);
+                defaults to default_formula_registry()
+            clock: Timestamp source for evidence and last_updated (defaults to datetime.now);
+                pass a fixed clock for reproducible runs
+            memo: Optional cache so calculate_all_soft_signals skips products whose
+                consumed inputs and formulas are unchanged
+            sketches: Optional per-category quantile sketches; when set, missing
+                price_percentile_category and benchmark_percentile are derived
+                from raw price and benchmark_score
+        """
+        self.baselines = baselines
+        self.formulas = formulas or default_formula_registry()
+        self.clock = clock or datetime.now
+        self.memo = memo
+        self.sketches = sketches
+        self._consumed_fields: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        
+    def calculate_fit_hint_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """
         Calculate fit hint score from return and sizing data
         
@@ -80,62 +235,9 @@ class KPICalculator:
         - Size advisor usage before purchase
         - Positive fit mentions in reviews
         """
-        evidence = []
-        
-        # Extract factors
-        returns_total = product_data.get('returns_total', 0)
-        returns_size = product_data.get('returns_size', 0)
-        exchanges_size = product_data.get('exchanges_size', 0)
-        purchases_with_advisor = product_data.get('purchases_with_advisor', 0)
-        purchases_total = max(product_data.get('purchases_total', 1), 1)
-        reviews_fit_positive = product_data.get('reviews_fit_positive', 0)
-        reviews_with_fit = max(product_data.get('reviews_with_fit', 1), 1)
-        
-        # Calculate rates
-        return_size_rate = returns_size / max(returns_total, 1)
-        exchange_size_rate = exchanges_size / purchases_total
-        advisor_usage_rate = purchases_with_advisor / purchases_total
-        fit_positive_rate = reviews_fit_positive / reviews_with_fit
-        
-        # Store evidence
-        evidence.append(KPIEvidence(
-            factor='return_size_rate',
-            value=return_size_rate,
-            source='returns_data',
-            confidence=min(1.0, returns_total / 10),  # Confidence grows with sample size
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='advisor_usage_rate',
-            value=advisor_usage_rate,
-            source='purchase_behavior',
-            confidence=min(1.0, purchases_total / 50),
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='fit_positive_rate',
-            value=fit_positive_rate,
-            source='review_analysis',
-            confidence=min(1.0, reviews_with_fit / 20),
-            timestamp=datetime.now()
-        ))
-        
-        # Calculate weighted score
-        raw_score = (
-            self.weights['fit_hint']['return_size'] * return_size_rate +
-            self.weights['fit_hint']['exchange_size'] * exchange_size_rate +
-            self.weights['fit_hint']['advisor_usage'] * advisor_usage_rate +
-            self.weights['fit_hint']['aspect_fit_positive'] * fit_positive_rate
-        )
-        
-        # Normalize with sigmoid
-        score = self._sigmoid(raw_score + 0.5)  # Shift to center around 0.5
-        
-        return score, evidence
+        return self._evaluate('fit_hint', product_data, None, evidence)
     
-    def calculate_reliability_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_reliability_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """
         Calculate reliability score from defect and warranty data
         
@@ -146,60 +248,9 @@ class KPICalculator:
         - Warranty claim rate
         - Durability aspect in reviews
         """
-        evidence = []
-        
-        # Extract factors
-        rma_count = product_data.get('rma_count', 0)
-        claim_count = product_data.get('claim_count', 0)
-        units_sold = max(product_data.get('units_sold', 1000), 1)
-        avg_days_to_claim = product_data.get('avg_days_to_claim', 365)
-        warranty_claims = product_data.get('warranty_claims', 0)
-        reviews_durability_avg = product_data.get('reviews_durability_avg', 0.5)
-        
-        # Calculate rates (per 1000 units)
-        rma_rate = (rma_count / units_sold) * 1000
-        claim_rate = (claim_count / units_sold) * 1000
-        warranty_rate = (warranty_claims / units_sold) * 1000
-        
-        # MTBF proxy from average days to claim
-        mtbf_normalized = min(1.0, avg_days_to_claim / 730)  # Normalize to 2 years
-        
-        # Store evidence
-        evidence.append(KPIEvidence(
-            factor='rma_per_1000',
-            value=rma_rate,
-            source='warranty_system',
-            confidence=min(1.0, units_sold / 1000),
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='mtbf_days',
-            value=avg_days_to_claim,
-            source='warranty_system',
-            confidence=min(1.0, claim_count / 10) if claim_count > 0 else 0.1,
-            timestamp=datetime.now()
-        ))
-        
-        # Category normalization (compare to category average)
-        category_rma_avg = product_data.get('category_rma_avg', 5.0)
-        rma_rate_normalized = 1.0 - min(1.0, rma_rate / category_rma_avg)
-        claim_rate_normalized = 1.0 - min(1.0, claim_rate / (category_rma_avg * 2))
-        
-        # Calculate weighted score
-        raw_score = (
-            self.weights['reliability']['rma_rate'] * rma_rate_normalized +
-            self.weights['reliability']['claim_rate'] * claim_rate_normalized +
-            self.weights['reliability']['mtbf'] * mtbf_normalized +
-            self.weights['reliability']['warranty_claims'] * (1 - min(1.0, warranty_rate / 10)) +
-            self.weights['reliability']['aspect_durability'] * reviews_durability_avg
-        )
-        
-        score = self._sigmoid(raw_score)
-        
-        return score, evidence
+        return self._evaluate('reliability', product_data, None, evidence)
     
-    def calculate_performance_score(self, product_data: Dict, category: str) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_performance_score(self, product_data: Dict, category: str, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """
         Calculate domain-specific performance score
         
@@ -208,79 +259,9 @@ class KPICalculator:
         - Electronics: benchmarks, efficiency, latency
         - Apparel: color fastness, fabric weight, abrasion
         """
-        evidence = []
-        
-        if category == 'footwear':
-            # Footwear-specific metrics
-            energy_return = product_data.get('energy_return_percent', 50) / 100
-            weight_grams = product_data.get('weight_grams', 300)
-            cushioning_index = product_data.get('cushioning_index', 5) / 10
-            stack_height = product_data.get('stack_height_mm', 25)
-            
-            # Normalize weight (lighter is better, up to a point)
-            weight_score = 1.0 - min(1.0, max(0, weight_grams - 200) / 300)
-            
-            # Stack height preference depends on use case
-            stack_score = min(1.0, stack_height / 40) if category == 'running' else 0.5
-            
-            evidence.append(KPIEvidence(
-                factor='energy_return',
-                value=energy_return,
-                source='lab_test',
-                confidence=0.95,
-                timestamp=datetime.now()
-            ))
-            
-            evidence.append(KPIEvidence(
-                factor='weight_score',
-                value=weight_score,
-                source='product_specs',
-                confidence=1.0,
-                timestamp=datetime.now()
-            ))
-            
-            raw_score = (
-                0.4 * energy_return +
-                0.2 * weight_score +
-                0.2 * cushioning_index +
-                0.2 * stack_score
-            )
-            
-        elif category == 'electronics':
-            # Electronics-specific metrics
-            benchmark_score = product_data.get('benchmark_percentile', 50) / 100
-            efficiency_rating = product_data.get('efficiency_rating', 3) / 5
-            latency_ms = product_data.get('latency_ms', 100)
-            
-            latency_score = 1.0 - min(1.0, latency_ms / 200)
-            
-            evidence.append(KPIEvidence(
-                factor='benchmark_percentile',
-                value=benchmark_score,
-                source='benchmark_suite',
-                confidence=0.9,
-                timestamp=datetime.now()
-            ))
-            
-            raw_score = (
-                0.5 * benchmark_score +
-                0.3 * efficiency_rating +
-                0.2 * latency_score
-            )
-            
-        else:
-            # Generic performance based on reviews
-            performance_mentions = product_data.get('reviews_performance_avg', 0.5)
-            category_avg = product_data.get('category_performance_avg', 0.5)
-            
-            raw_score = performance_mentions / max(category_avg, 0.1)
-            
-        # Normalize against category
-        score = min(1.0, self._sigmoid(raw_score))
-        
-        return score, evidence
+        return self._evaluate('performance', product_data, category, evidence)
     
-    def calculate_owner_satisfaction_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_owner_satisfaction_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """
         Calculate owner satisfaction from multiple sources
         
@@ -290,280 +271,201 @@ class KPICalculator:
         - Recent sentiment trend
         - Repeat purchase rate
         """
-        evidence = []
-        
-        # Review data
-        avg_rating_all = product_data.get('avg_rating', 3.0)
-        avg_rating_verified = product_data.get('avg_rating_verified', avg_rating_all)
-        review_count_verified = product_data.get('review_count_verified', 0)
-        review_count_total = max(product_data.get('review_count_total', 1), 1)
-        
-        # CSAT data
-        csat_score = product_data.get('csat_product', 0.7)
-        csat_responses = product_data.get('csat_responses', 0)
-        
-        # Sentiment trend (last 90 days vs previous)
-        sentiment_recent = product_data.get('sentiment_90d', 0.5)
-        sentiment_previous = product_data.get('sentiment_prev_90d', 0.5)
-        sentiment_trend = sentiment_recent - sentiment_previous
-        
-        # Repeat purchase
-        repeat_purchase_rate = product_data.get('repeat_purchase_rate', 0.1)
-        
-        # Calculate verification ratio
-        verification_ratio = review_count_verified / review_count_total
-        
-        # Weighted rating (verified reviews count more)
-        weighted_rating = (
-            (avg_rating_verified * review_count_verified * 1.5 + 
-             avg_rating_all * (review_count_total - review_count_verified)) /
-            (review_count_verified * 1.5 + (review_count_total - review_count_verified))
-        )
-        
-        # Normalize rating to 0-1
-        rating_normalized = (weighted_rating - 1) / 4  # 1-5 scale to 0-1
-        
-        evidence.append(KPIEvidence(
-            factor='weighted_rating',
-            value=weighted_rating,
-            source='review_system',
-            confidence=min(1.0, review_count_total / 100),
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='csat_score',
-            value=csat_score,
-            source='survey_system',
-            confidence=min(1.0, csat_responses / 50),
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='sentiment_trend',
-            value=sentiment_trend,
-            source='sentiment_analysis',
-            confidence=0.8,
-            timestamp=datetime.now()
-        ))
-        
-        # Calculate weighted score
-        raw_score = (
-            self.weights['owner_satisfaction']['rating_verified'] * rating_normalized +
-            self.weights['owner_satisfaction']['csat_product'] * csat_score +
-            self.weights['owner_satisfaction']['recent_sentiment'] * (sentiment_recent + sentiment_trend) +
-            self.weights['owner_satisfaction']['repeat_purchase'] * repeat_purchase_rate
-        )
-        
-        score = min(1.0, self._sigmoid(raw_score))
-        
-        return score, evidence
+        return self._evaluate('owner_satisfaction', product_data, None, evidence)
     
-    def calculate_uniqueness_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_uniqueness_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """Calculate uniqueness relative to market"""
-        evidence = []
-        
-        # Feature rarity
-        rare_features = product_data.get('rare_feature_count', 0)
-        total_features = max(product_data.get('total_feature_count', 10), 1)
-        feature_rarity = rare_features / total_features
-        
-        # Limited edition / exclusive
-        is_limited = product_data.get('is_limited_edition', False)
-        stock_scarcity = product_data.get('stock_scarcity_score', 0.0)
-        
-        # Price positioning
-        price_percentile = product_data.get('price_percentile_category', 50) / 100
-        
-        evidence.append(KPIEvidence(
-            factor='feature_rarity',
-            value=feature_rarity,
-            source='market_analysis',
-            confidence=0.7,
-            timestamp=datetime.now()
-        ))
-        
-        score = self._sigmoid(
-            feature_rarity * 0.4 +
-            (1.0 if is_limited else 0.0) * 0.2 +
-            stock_scarcity * 0.2 +
-            price_percentile * 0.2
-        )
-        
-        return score, evidence
+        return self._evaluate('uniqueness', product_data, None, evidence)
     
-    def calculate_craftsmanship_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_craftsmanship_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """Calculate craftsmanship from materials and reviews"""
-        evidence = []
-        
-        # Material quality indicators
-        material_grade = product_data.get('material_grade', 'standard')
-        material_scores = {'premium': 0.9, 'high': 0.7, 'standard': 0.5, 'basic': 0.3}
-        material_score = material_scores.get(material_grade, 0.5)
-        
-        # Manufacturing origin
-        origin_score = product_data.get('origin_reputation_score', 0.5)
-        
-        # Warranty as quality signal
-        warranty_days = product_data.get('warranty_days', 90)
-        warranty_score = min(1.0, warranty_days / 730)  # 2 years = 1.0
-        
-        # Review aspects
-        review_quality_aspect = product_data.get('review_aspect_quality', 0.5)
-        review_craftsmanship_mentions = product_data.get('craftsmanship_mention_rate', 0.0)
-        
-        evidence.append(KPIEvidence(
-            factor='material_grade',
-            value=material_score,
-            source='product_specs',
-            confidence=0.9,
-            timestamp=datetime.now()
-        ))
-        
-        score = self._sigmoid(
-            material_score * 0.3 +
-            origin_score * 0.2 +
-            warranty_score * 0.2 +
-            review_quality_aspect * 0.2 +
-            review_craftsmanship_mentions * 0.1
-        )
-        
-        return score, evidence
+        return self._evaluate('craftsmanship', product_data, None, evidence)
     
-    def calculate_sustainability_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_sustainability_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """Calculate sustainability from certifications and materials"""
-        evidence = []
-        
-        # Certifications
-        cert_count = len(product_data.get('sustainability_certifications', []))
-        cert_score = min(1.0, cert_count / 3)
-        
-        # Recycled content
-        recycled_percentage = product_data.get('recycled_content_percent', 0) / 100
-        
-        # Carbon footprint
-        carbon_kg = product_data.get('carbon_footprint_kg', 10)
-        category_avg_carbon = product_data.get('category_avg_carbon_kg', 10)
-        carbon_score = max(0, 1 - (carbon_kg / category_avg_carbon))
-        
-        # Packaging
-        sustainable_packaging = product_data.get('sustainable_packaging', False)
-        
-        # Supply chain transparency
-        supply_chain_score = product_data.get('supply_chain_transparency', 0.0)
-        
-        evidence.append(KPIEvidence(
-            factor='recycled_content',
-            value=recycled_percentage,
-            source='product_specs',
-            confidence=0.95,
-            timestamp=datetime.now()
-        ))
-        
-        evidence.append(KPIEvidence(
-            factor='carbon_footprint_relative',
-            value=carbon_score,
-            source='lca_analysis',
-            confidence=0.8,
-            timestamp=datetime.now()
-        ))
-        
-        score = min(1.0, 
-            cert_score * 0.3 +
-            recycled_percentage * 0.25 +
-            carbon_score * 0.2 +
-            (1.0 if sustainable_packaging else 0.0) * 0.1 +
-            supply_chain_score * 0.15
-        )
-        
-        return score, evidence
+        return self._evaluate('sustainability', product_data, None, evidence)
     
-    def calculate_innovation_score(self, product_data: Dict) -> Tuple[float, List[KPIEvidence]]:
+    def calculate_innovation_score(self, product_data: Dict, evidence: Optional[EvidenceStore] = None) -> Tuple[float, EvidenceStore]:
         """Calculate innovation from features and recognition"""
-        evidence = []
-        
-        # New/unique features
-        new_features = product_data.get('new_feature_count', 0)
-        patent_count = product_data.get('patent_count', 0)
-        
-        # Awards and recognition
-        awards = product_data.get('award_count', 0)
-        press_mentions = product_data.get('press_mention_count', 0)
-        
-        # Technology adoption
-        uses_new_tech = product_data.get('uses_cutting_edge_tech', False)
-        tech_generation = product_data.get('tech_generation', 1)  # 1 = current, 2 = next-gen
-        
-        # First to market
-        is_first_mover = product_data.get('is_first_in_category', False)
-        
-        evidence.append(KPIEvidence(
-            factor='patent_count',
-            value=patent_count,
-            source='patent_database',
-            confidence=1.0,
-            timestamp=datetime.now()
-        ))
-        
-        score = self._sigmoid(
-            min(1.0, new_features / 3) * 0.25 +
-            min(1.0, patent_count / 2) * 0.2 +
-            min(1.0, awards / 2) * 0.15 +
-            min(1.0, press_mentions / 10) * 0.1 +
-            (1.0 if uses_new_tech else 0.0) * 0.15 +
-            (tech_generation - 1) * 0.1 +
-            (1.0 if is_first_mover else 0.0) * 0.05
-        )
-        
-        return score, evidence
+        return self._evaluate('innovation', product_data, None, evidence)
     
     def calculate_all_soft_signals(self, product_data: Dict, category: str = 'general') -> SoftSignals:
         """Calculate all soft signals for a product"""
         
-        evidence_all = []
-        
-        # Calculate each score
-        fit_score, fit_evidence = self.calculate_fit_hint_score(product_data)
-        evidence_all.extend(fit_evidence)
-        
-        reliability_score, reliability_evidence = self.calculate_reliability_score(product_data)
-        evidence_all.extend(reliability_evidence)
-        
-        performance_score, performance_evidence = self.calculate_performance_score(product_data, category)
-        evidence_all.extend(performance_evidence)
-        
-        satisfaction_score, satisfaction_evidence = self.calculate_owner_satisfaction_score(product_data)
-        evidence_all.extend(satisfaction_evidence)
-        
-        uniqueness_score, uniqueness_evidence = self.calculate_uniqueness_score(product_data)
-        evidence_all.extend(uniqueness_evidence)
-        
-        craftsmanship_score, craftsmanship_evidence = self.calculate_craftsmanship_score(product_data)
-        evidence_all.extend(craftsmanship_evidence)
-        
-        sustainability_score, sustainability_evidence = self.calculate_sustainability_score(product_data)
-        evidence_all.extend(sustainability_evidence)
-        
-        innovation_score, innovation_evidence = self.calculate_innovation_score(product_data)
-        evidence_all.extend(innovation_evidence)
+        baselines = self._baseline_index()
+        if baselines is not None:
+            product_data = baselines.inject(product_data, category)
+        if self.sketches is not None:
+            product_data = self.sketches.inject(product_data, category)
+        
+        input_hash = None
+        if self.memo is not None:
+            input_hash = self.input_hash(product_data, category)
+            cached = self.memo.get(input_hash)
+            if cached is not None:
+                return cached
+        
+        # One evidence store and timestamp shared by all eight calculations
+        evidence_all = EvidenceStore(self.clock())
+        
+        # Calculate each score in SoftSignals order
+        scores = {
+            name: self.formulas.resolve(name, category).scalar(product_data, evidence_all)
+            for name in SCORE_NAMES
+        }
         
-        return SoftSignals(
-            fit_hint_score=round(fit_score, 3),
-            reliability_score=round(reliability_score, 3),
-            performance_score=round(performance_score, 3),
-            owner_satisfaction_score=round(satisfaction_score, 3),
-            uniqueness_score=round(uniqueness_score, 3),
-            craftsmanship_score=round(craftsmanship_score, 3),
-            sustainability_score=round(sustainability_score, 3),
-            innovation_score=round(innovation_score, 3),
+        # Position against the real category distribution when baselines are known
+        if 'rma_count' in product_data:
+            units_sold = max(product_data.get('units_sold', 1000), 1)
+            rma_relative = self.category_z_score(
+                (product_data['rma_count'] / units_sold) * 1000, category, 'rma_per_1000'
+            )
+            if rma_relative is not None:
+                evidence_all.add(
+                    factor='rma_vs_category',
+                    value=rma_relative,
+                    source='category_baseline',
+                    confidence=min(1.0, baselines.get(category, 'rma_per_1000').count / 30)
+                )
+        
+        signals = SoftSignals(
+            fit_hint_score=round(scores['fit_hint'], 3),
+            reliability_score=round(scores['reliability'], 3),
+            performance_score=round(scores['performance'], 3),
+            owner_satisfaction_score=round(scores['owner_satisfaction'], 3),
+            uniqueness_score=round(scores['uniqueness'], 3),
+            craftsmanship_score=round(scores['craftsmanship'], 3),
+            sustainability_score=round(scores['sustainability'], 3),
+            innovation_score=round(scores['innovation'], 3),
             evidence=evidence_all,
             calculation_method='weighted_factors_sigmoid_normalized',
-            last_updated=datetime.now()
+            last_updated=evidence_all.timestamp,
+            input_hash=input_hash
         )
+        if self.memo is not None:
+            self.memo.put(input_hash, signals)
+        
+        return signals
     
+    def input_hash(self, product_data: Dict, category: str = 'general') -> str:
+        """
+        Content hash of everything calculate_all_soft_signals reads for a product
+        
+        Covers the category, the formula registry version, the baseline index
+        build time and the product_data fields consumed by the category's
+        formulas. Fields the formulas never read do not change the hash.
+        """
+        key = (category, self.formulas.version)
+        fields = self._consumed_fields.get(key)
+        if fields is None:
+            consumed = {'rma_count', 'units_sold'}  # rma_vs_category evidence
+            for name in SCORE_NAMES:
+                consumed.update(item.field for item in self.formulas.resolve(name, category).spec.inputs)
+            fields = tuple(sorted(consumed))
+            self._consumed_fields[key] = fields
+        
+        baselines = self._baseline_index()
+        payload = [
+            category,
+            self.formulas.version,
+            baselines.built_at if baselines is not None else None,
+            [[name, product_data[name]] for name in fields if name in product_data]
+        ]
+        encoded = json.dumps(payload, default=str, separators=(',', ':')).encode()
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def calculate_batch(self, columns: Any, category: Any = 'general') -> Dict[str, np.ndarray]:
+        """
+        Calculate all eight soft signal scores for N products in one vectorized pass
+
+        Args:
+            columns: Dict of equal-length arrays keyed by the same fields that
+                product_data.get(...) reads, or a NumPy structured array with those
+                field names. Missing columns and NaN cells fall back to the scalar defaults.
+            category: Single category for all rows, or an array of N categories
+
+        Returns:
+            Dict mapping each SoftSignals score field to an array of N scores,
+            rounded exactly like calculate_all_soft_signals
+        """
+        if isinstance(columns, np.ndarray):
+            n = len(columns)
+        else:
+            n = len(next(iter(columns.values()))) if columns else 0
+        baselines = self._baseline_index()
+        if (baselines is not None or self.sketches is not None) and isinstance(columns, np.ndarray):
+            columns = {name: columns[name] for name in columns.dtype.names}
+        if baselines is not None:
+            columns = baselines.inject_columns(columns, category)
+        if self.sketches is not None:
+            columns = self.sketches.inject_columns(columns, category)
+        batch = FormulaColumns(columns, n)
+
+        categories = np.broadcast_to(np.asarray(category, dtype=object), (n,))
+        unique_categories, row_index = np.unique(categories.astype(str), return_inverse=True)
+
+        results = {}
+        for name in SCORE_NAMES:
+            # Categories resolving to the same formula are evaluated together
+            groups: Dict[int, Tuple[CompiledFormula, List[int]]] = {}
+            for i, row_category in enumerate(unique_categories):
+                formula = self.formulas.resolve(name, row_category)
+                groups.setdefault(id(formula), (formula, []))[1].append(i)
+
+            scores = np.empty(n)
+            for formula, indices in groups.values():
+                if len(indices) == len(unique_categories):
+                    scores[:] = formula.batch(batch)
+                else:
+                    rows = np.isin(row_index, indices)
+                    scores[rows] = formula.batch(batch.subset(rows))
+            results[f"{name}_score"] = self._round_array(scores, 3)
+
+        return results
+
+    def _evaluate(self, score: str, product_data: Dict, category: Optional[str],
+                  evidence: Optional[EvidenceStore]) -> Tuple[float, EvidenceStore]:
+        """Run the compiled formula for a score, recording its evidence"""
+        if evidence is None:
+            evidence = EvidenceStore(self.clock())
+        return self.formulas.resolve(score, category).scalar(product_data, evidence), evidence
+
     def _sigmoid(self, x: float, steepness: float = 1.0) -> float:
         """Sigmoid function for normalization to [0,1]"""
         return 1 / (1 + math.exp(-steepness * x))
+
+    def _round_array(self, values: np.ndarray, ndigits: int) -> np.ndarray:
+        """
+        Vectorized round() with Python's semantics
+
+        np.round scales before rounding, which can disagree with round() on values
+        sitting next to a decimal tie; those few cells are rounded one by one.
+        """
+        scaled = values * 10 ** ndigits
+        rounded = np.round(scaled) / 10 ** ndigits
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+        for i in np.flatnonzero(near_tie):
+            rounded[i] = round(float(values[i]), ndigits)
+        return rounded
+    
+    def category_z_score(self, value: float, category: str, metric: str) -> Optional[float]:
+        """
+        Sigmoid of the z-score of value within its category distribution
+        
+        Returns None when no baseline index is configured or the category
+        has no samples for the metric.
+        """
+        baselines = self._baseline_index()
+        baseline = baselines.get(category, metric) if baselines is not None else None
+        if baseline is None:
+            return None
+        return self._z_score_normalize(value, baseline.mean, baseline.std)
+    
+    def _baseline_index(self) -> Optional[CategoryBaselineIndex]:
+        """Resolve the configured baselines, refreshing a cache past its TTL"""
+        if isinstance(self.baselines, CategoryBaselineCache):
+            return self.baselines.get()
+        return self.baselines
     
     def _z_score_normalize(self, value: float, mean: float, std: float) -> float:
         """Z-score normalization followed by sigmoid"""
@@ -740,3 +642,276 @@ SQL_KPI_QUERIES = {
         WHERE p.id = %s
     """
 }
+
+
+# Set-based variants of SQL_KPI_QUERIES: one scan computes every product.
+# Parameters: all_products (bool) and product_ids (array, ignored when all_products).
+# Rows are ordered by product id so the three result sets line up row for row.
+SQL_KPI_BATCH_QUERIES = {
+    'fit_metrics': """
+        WITH return_analysis AS (
+            SELECT 
+                product_id,
+                COUNT(*) AS returns_total,
+                SUM(CASE WHEN reason = 'size_issue' THEN 1 ELSE 0 END) AS returns_size,
+                SUM(CASE WHEN reason = 'size_issue' AND exchange_sku IS NOT NULL THEN 1 ELSE 0 END) AS exchanges_size
+            FROM returns
+            WHERE created_at >= CURRENT_DATE - INTERVAL '180 days'
+                AND (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        ),
+        purchase_behavior AS (
+            SELECT
+                oi.product_id,
+                COUNT(DISTINCT o.id) AS purchases_total,
+                SUM(CASE WHEN e.event_type = 'view_size_guide' THEN 1 ELSE 0 END) AS purchases_with_advisor
+            FROM order_items oi
+            JOIN orders o ON o.id = oi.order_id
+            LEFT JOIN events e ON e.session_id = o.session_id 
+                AND e.product_id = oi.product_id
+                AND e.timestamp < o.created_at
+            WHERE o.created_at >= CURRENT_DATE - INTERVAL '365 days'
+                AND (%(all_products)s OR oi.product_id = ANY(%(product_ids)s))
+            GROUP BY oi.product_id
+        ),
+        review_fit AS (
+            SELECT
+                product_id,
+                COUNT(CASE WHEN aspects->>'fit' IS NOT NULL THEN 1 END) AS reviews_with_fit,
+                COUNT(CASE WHEN (aspects->>'fit')::float >= 0.7 THEN 1 END) AS reviews_fit_positive
+            FROM reviews
+            WHERE created_at >= CURRENT_DATE - INTERVAL '365 days'
+                AND (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        )
+        SELECT 
+            p.id AS product_id,
+            COALESCE(r.returns_total, 0) AS returns_total,
+            COALESCE(r.returns_size, 0) AS returns_size,
+            COALESCE(r.exchanges_size, 0) AS exchanges_size,
+            COALESCE(pb.purchases_total, 0) AS purchases_total,
+            COALESCE(pb.purchases_with_advisor, 0) AS purchases_with_advisor,
+            COALESCE(rf.reviews_with_fit, 0) AS reviews_with_fit,
+            COALESCE(rf.reviews_fit_positive, 0) AS reviews_fit_positive
+        FROM products p
+        LEFT JOIN return_analysis r ON r.product_id = p.id
+        LEFT JOIN purchase_behavior pb ON pb.product_id = p.id
+        LEFT JOIN review_fit rf ON rf.product_id = p.id
+        WHERE (%(all_products)s OR p.id = ANY(%(product_ids)s))
+        ORDER BY p.id
+    """,
+    
+    # Claims and sales stay unfiltered: the category baseline needs every product
+    'reliability_metrics': """
+        WITH claim_stats AS (
+            SELECT
+                product_id,
+                COUNT(*) AS claim_count,
+                COUNT(CASE WHEN claim_type = 'RMA' THEN 1 END) AS rma_count,
+                AVG(EXTRACT(DAY FROM claim_date - purchase_date)) AS avg_days_to_claim
+            FROM warranty_claims
+            WHERE claim_date >= CURRENT_DATE - INTERVAL '2 years'
+            GROUP BY product_id
+        ),
+        sales_data AS (
+            SELECT
+                product_id,
+                SUM(quantity) AS units_sold
+            FROM order_items
+            WHERE created_at >= CURRENT_DATE - INTERVAL '2 years'
+            GROUP BY product_id
+        ),
+        category_baseline AS (
+            SELECT
+                p.category_id,
+                AVG(wc.claim_count::float / NULLIF(sd.units_sold, 0) * 1000) AS category_rma_avg
+            FROM products p
+            LEFT JOIN claim_stats wc ON wc.product_id = p.id
+            LEFT JOIN sales_data sd ON sd.product_id = p.id
+            GROUP BY p.category_id
+        ),
+        review_durability AS (
+            SELECT
+                product_id,
+                AVG((aspects->>'durability')::float) AS reviews_durability_avg
+            FROM reviews
+            WHERE (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        )
+        SELECT
+            p.id AS product_id,
+            COALESCE(wc.claim_count, 0) AS claim_count,
+            COALESCE(wc.rma_count, 0) AS rma_count,
+            COALESCE(wc.avg_days_to_claim, 730) AS avg_days_to_claim,
+            COALESCE(sd.units_sold, 0) AS units_sold,
+            COALESCE(cb.category_rma_avg, 5.0) AS category_rma_avg,
+            rd.reviews_durability_avg
+        FROM products p
+        LEFT JOIN claim_stats wc ON wc.product_id = p.id
+        LEFT JOIN sales_data sd ON sd.product_id = p.id
+        LEFT JOIN category_baseline cb ON cb.category_id = p.category_id
+        LEFT JOIN review_durability rd ON rd.product_id = p.id
+        WHERE (%(all_products)s OR p.id = ANY(%(product_ids)s))
+        ORDER BY p.id
+    """,
+    
+    'satisfaction_metrics': """
+        WITH review_stats AS (
+            SELECT
+                product_id,
+                AVG(rating) AS avg_rating,
+                AVG(CASE WHEN verified_purchase THEN rating END) AS avg_rating_verified,
+                COUNT(*) AS review_count_total,
+                COUNT(CASE WHEN verified_purchase THEN 1 END) AS review_count_verified
+            FROM reviews
+            WHERE created_at >= CURRENT_DATE - INTERVAL '2 years'
+                AND (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        ),
+        csat_data AS (
+            SELECT
+                product_id,
+                AVG(score) AS csat_product,
+                COUNT(*) AS csat_responses
+            FROM customer_satisfaction
+            WHERE survey_type = 'product'
+                AND created_at >= CURRENT_DATE - INTERVAL '1 year'
+                AND (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        ),
+        sentiment_trends AS (
+            SELECT
+                product_id,
+                AVG(CASE WHEN created_at >= CURRENT_DATE - INTERVAL '90 days' 
+                    THEN sentiment_score END) AS sentiment_90d,
+                AVG(CASE WHEN created_at < CURRENT_DATE - INTERVAL '90 days' 
+                    AND created_at >= CURRENT_DATE - INTERVAL '180 days'
+                    THEN sentiment_score END) AS sentiment_prev_90d
+            FROM reviews
+            WHERE created_at >= CURRENT_DATE - INTERVAL '180 days'
+                AND (%(all_products)s OR product_id = ANY(%(product_ids)s))
+            GROUP BY product_id
+        ),
+        repeat_purchases AS (
+            SELECT
+                oi.product_id,
+                COUNT(DISTINCT CASE WHEN purchase_number > 1 THEN customer_id END)::float 
+                    / NULLIF(COUNT(DISTINCT customer_id), 0) AS repeat_purchase_rate
+            FROM (
+                SELECT 
+                    oi.product_id,
+                    o.customer_id,
+                    ROW_NUMBER() OVER (PARTITION BY o.customer_id, oi.product_id ORDER BY o.created_at) AS purchase_number
+                FROM order_items oi
+                JOIN orders o ON o.id = oi.order_id
+                WHERE (%(all_products)s OR oi.product_id = ANY(%(product_ids)s))
+            ) oi
+            GROUP BY oi.product_id
+        )
+        SELECT
+            p.id AS product_id,
+            rs.avg_rating,
+            rs.avg_rating_verified,
+            rs.review_count_total,
+            rs.review_count_verified,
+            COALESCE(cs.csat_product, 0.7) AS csat_product,
+            COALESCE(cs.csat_responses, 0) AS csat_responses,
+            COALESCE(st.sentiment_90d, 0.5) AS sentiment_90d,
+            COALESCE(st.sentiment_prev_90d, 0.5) AS sentiment_prev_90d,
+            COALESCE(rp.repeat_purchase_rate, 0.1) AS repeat_purchase_rate
+        FROM products p
+        LEFT JOIN review_stats rs ON rs.product_id = p.id
+        LEFT JOIN csat_data cs ON cs.product_id = p.id
+        LEFT JOIN sentiment_trends st ON st.product_id = p.id
+        LEFT JOIN repeat_purchases rp ON rp.product_id = p.id
+        WHERE (%(all_products)s OR p.id = ANY(%(product_ids)s))
+        ORDER BY p.id
+    """
+}
+
+
+class KPIBatchLoader:
+    """Stream SQL_KPI_BATCH_QUERIES results into KPICalculator.calculate_batch in chunks"""
+    
+    def __init__(self, connection: Any, chunk_size: int = 10000, server_side: bool = True):
+        """
+        Args:
+            connection: DB-API connection using the pyformat paramstyle (e.g. psycopg)
+            chunk_size: Rows fetched from each query per chunk
+            server_side: Open named (server-side) cursors so rows are streamed
+                instead of buffered client-side
+        """
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.server_side = server_side
+        
+    def iter_chunks(self, product_ids: Optional[Sequence[Any]] = None) -> Iterator[Tuple[List[Any], Dict[str, np.ndarray]]]:
+        """
+        Run the three batch queries once and yield aligned column chunks
+        
+        Args:
+            product_ids: Products to load, or None for the whole catalog
+            
+        Yields:
+            (product_ids, columns) where columns is ready for calculate_batch.
+            NULL cells become NaN so the calculator applies its defaults.
+        """
+        params = {
+            'all_products': product_ids is None,
+            'product_ids': list(product_ids or [])
+        }
+        
+        cursors = []
+        try:
+            for name, query in SQL_KPI_BATCH_QUERIES.items():
+                cursor = self.connection.cursor(name=f'axp_kpi_{name}') if self.server_side else self.connection.cursor()
+                cursor.execute(query, params)
+                cursors.append(cursor)
+                
+            while True:
+                chunks = [cursor.fetchmany(self.chunk_size) for cursor in cursors]
+                if not any(chunks):
+                    break
+                yield self._merge_chunks(cursors, chunks)
+        finally:
+            for cursor in cursors:
+                cursor.close()
+                
+    def iter_scores(self, 
+                    calculator: KPICalculator,
+                    product_ids: Optional[Sequence[Any]] = None,
+                    category: Any = 'general') -> Iterator[Tuple[List[Any], Dict[str, np.ndarray]]]:
+        """
+        Score every loaded chunk with calculate_batch
+        
+        Args:
+            calculator: Calculator to score with
+            product_ids: Products to score, or None for the whole catalog
+            category: Category for the performance score, or a dict of product_id -> category
+            
+        Yields:
+            (product_ids, scores) per chunk
+        """
+        for ids, columns in self.iter_chunks(product_ids):
+            if isinstance(category, dict):
+                chunk_category = np.array([category.get(pid, 'general') for pid in ids], dtype=object)
+            else:
+                chunk_category = category
+            yield ids, calculator.calculate_batch(columns, chunk_category)
+            
+    def _merge_chunks(self, cursors: List[Any], chunks: List[List[Tuple]]) -> Tuple[List[Any], Dict[str, np.ndarray]]:
+        """Join one chunk from each query on product_id into a single column dict"""
+        ids = [row[0] for row in chunks[0]]
+        columns = {}
+        
+        for cursor, rows in zip(cursors, chunks):
+            if [row[0] for row in rows] != ids:
+                raise ValueError("KPI batch queries returned misaligned product rows")
+            names = [column[0] for column in cursor.description]
+            for i, name in enumerate(names[1:], start=1):
+                columns[name] = np.array(
+                    [np.nan if row[i] is None else float(row[i]) for row in rows],
+                    dtype=np.float64
+                )
+                
+        return ids, columns
@@ -0,0 +1,598 @@
+"""
+AXP Soft KPI Formulas
+Declarative scoring formula specs compiled into scalar and vectorized evaluators
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple, Any, Callable
+
+import numpy as np
+
+
+# Material grade lookup used by the craftsmanship formula
+MATERIAL_GRADE_SCORES = {'premium': 0.9, 'high': 0.7, 'standard': 0.5, 'basic': 0.3}
+
+# Score order of SoftSignals (each field is f"{score}_score")
+SCORE_NAMES = [
+    'fit_hint',
+    'reliability',
+    'performance',
+    'owner_satisfaction',
+    'uniqueness',
+    'craftsmanship',
+    'sustainability',
+    'innovation'
+]
+
+
+@dataclass
+class FormulaInput:
+    """
+    One product_data field read by a formula
+
+    kind:
+    - 'number': product_data.get(field, default)
+    - 'flag': 1.0 if the field is truthy (and not NaN) else 0.0
+    - 'count': len() of a list field (0 when missing)
+    - 'lookup': table[value], default for missing or unknown values
+    """
+    field: str
+    default: Any = 0
+    kind: str = 'number'
+    default_from: Optional[str] = None  # default to another input's value instead
+    table: Optional[Dict[str, float]] = None
+
+
+@dataclass
+class FormulaEvidence:
+    """Evidence recorded by the scalar path; value and confidence are expressions"""
+    factor: str
+    value: str
+    source: str
+    confidence: str
+
+
+@dataclass
+class FormulaSpec:
+    """
+    Declarative soft KPI formula
+
+    Inputs are extracted, factors are evaluated in order as expressions over
+    inputs and earlier factors (min, max and _where are available), then
+
+        raw = sum(weight * term)
+        score = normalize(raw + shift)
+
+    normalization is 'sigmoid', 'sigmoid_capped' (min(1, sigmoid)) or 'capped' (min(1, raw)).
+    """
+    score: str
+    inputs: List[FormulaInput]
+    factors: Dict[str, str]
+    weights: Dict[str, float]
+    normalization: str = 'sigmoid'
+    shift: float = 0.0
+    steepness: float = 1.0
+    evidence: List[FormulaEvidence] = field(default_factory=list)
+
+    def with_weights(self, **weights: float) -> 'FormulaSpec':
+        """Copy of the spec with some weights replaced (e.g. per-category calibration)"""
+        unknown = set(weights) - set(self.weights)
+        if unknown:
+            raise ValueError(f"Unknown weight terms for {self.score}: {sorted(unknown)}")
+        return replace(self, weights={**self.weights, **weights})
+
+
+@dataclass
+class CompiledFormula:
+    """A FormulaSpec compiled to a scalar and a vectorized evaluator"""
+    spec: FormulaSpec
+    scalar: Callable[[Dict, Any], float]  # (product_data, evidence or None) -> score
+    batch: Callable[['FormulaColumns'], np.ndarray]
+
+
+def _scalar_where(condition: Any, if_true: Any, if_false: Any) -> Any:
+    return if_true if condition else if_false
+
+
+_SCALAR_NAMESPACE = {'min': min, 'max': max, 'len': len, '_exp': math.exp, '_where': _scalar_where}
+_BATCH_NAMESPACE = {'min': np.minimum, 'max': np.maximum, '_exp': np.exp, '_where': np.where}
+
+
+def compile_formula(spec: FormulaSpec) -> CompiledFormula:
+    """
+    Generate and compile the scalar and batch evaluators for a spec
+
+    Both evaluators run the same generated expressions, so weights become
+    literals and no dict lookups happen per call. The scalar one binds min/max
+    and exp to the builtins and math.exp, the batch one to their NumPy ufuncs.
+    """
+    tables = {
+        f"_table_{item.field}": item.table
+        for item in spec.inputs if item.kind == 'lookup'
+    }
+
+    scalar_lines = [f"def _scalar(product_data, evidence):", "    _get = product_data.get"]
+    batch_lines = [f"def _batch(columns):"]
+
+    for item in spec.inputs:
+        default = item.default_from or repr(item.default)
+        if item.kind == 'number':
+            scalar_lines.append(f"    {item.field} = _get({item.field!r}, {default})")
+            batch_lines.append(f"    {item.field} = columns.number({item.field!r}, {default})")
+        elif item.kind == 'flag':
+            scalar_lines.append(f"    {item.field} = _get({item.field!r}, False)")
+            # NaN is truthy but marks a missing value, as in the batch columns
+            scalar_lines.append(f"    {item.field} = 1.0 if {item.field} and {item.field} == {item.field} else 0.0")
+            batch_lines.append(f"    {item.field} = columns.flag({item.field!r})")
+        elif item.kind == 'count':
+            scalar_lines.append(f"    {item.field} = len(_get({item.field!r}, []))")
+            batch_lines.append(f"    {item.field} = columns.count({item.field!r})")
+        elif item.kind == 'lookup':
+            scalar_lines.append(f"    {item.field} = _table_{item.field}.get(_get({item.field!r}), {default})")
+            batch_lines.append(f"    {item.field} = columns.lookup({item.field!r}, _table_{item.field}, {default})")
+        else:
+            raise ValueError(f"Unknown input kind for {spec.score}.{item.field}: {item.kind}")
+
+    for name, expression in spec.factors.items():
+        scalar_lines.append(f"    {name} = {expression}")
+        batch_lines.append(f"    {name} = {expression}")
+
+    if spec.evidence:
+        scalar_lines.append("    if evidence is not None:")
+        for item in spec.evidence:
+            scalar_lines.append(
+                f"        evidence.add({item.factor!r}, {item.value}, {item.source!r}, {item.confidence})"
+            )
+
+    raw = " + ".join(f"({weight!r}) * {term}" for term, weight in spec.weights.items())
+    shifted = f"raw + {spec.shift!r}" if spec.shift else "raw"
+    sigmoid = f"1 / (1 + _exp({-spec.steepness!r} * ({shifted})))"
+    normalized = {
+        'sigmoid': sigmoid,
+        'sigmoid_capped': f"min(1.0, {sigmoid})",
+        'capped': f"min(1.0, {shifted})"
+    }.get(spec.normalization)
+    if normalized is None:
+        raise ValueError(f"Unknown normalization for {spec.score}: {spec.normalization}")
+
+    for lines in (scalar_lines, batch_lines):
+        lines.append(f"    raw = {raw}")
+        lines.append(f"    return {normalized}")
+
+    scalar_namespace = {**_SCALAR_NAMESPACE, **tables}
+    batch_namespace = {**_BATCH_NAMESPACE, **tables}
+    exec(compile("\n".join(scalar_lines), f"<formula {spec.score}>", "exec"), scalar_namespace)
+    exec(compile("\n".join(batch_lines), f"<formula {spec.score} batch>", "exec"), batch_namespace)
+
+    return CompiledFormula(spec=spec, scalar=scalar_namespace['_scalar'], batch=batch_namespace['_batch'])
+
+
+def _column(values: Any) -> np.ndarray:
+    """A column as an array; list cells (ragged or not) stay one object per row"""
+    if isinstance(values, np.ndarray):
+        return values
+    if isinstance(values, (list, tuple)) and any(isinstance(v, (list, tuple, set)) for v in values):
+        column = np.empty(len(values), dtype=object)
+        for i, value in enumerate(values):
+            column[i] = value
+        return column
+    return np.asarray(values)
+
+
+class FormulaColumns:
+    """Column accessors for batch evaluation, optionally restricted to a row subset"""
+
+    def __init__(self, columns: Any, n: int, rows: Optional[np.ndarray] = None):
+        """
+        Args:
+            columns: Dict of arrays or a NumPy structured array
+            n: Row count of columns
+            rows: Optional boolean mask selecting the rows to evaluate
+        """
+        if not isinstance(columns, np.ndarray):
+            columns = {name: _column(values) for name, values in columns.items()}
+        self.columns = columns
+        self.n = n
+        self.rows = rows
+        self.size = n if rows is None else int(np.count_nonzero(rows))
+
+    def subset(self, rows: np.ndarray) -> 'FormulaColumns':
+        """Accessors for a subset of rows"""
+        return FormulaColumns(self.columns, self.n, rows)
+
+    def raw(self, name: str) -> Optional[np.ndarray]:
+        """Raw column restricted to the selected rows, or None when absent"""
+        if isinstance(self.columns, np.ndarray):
+            if not self.columns.dtype.names or name not in self.columns.dtype.names:
+                return None
+            values = self.columns[name]
+        elif name in self.columns:
+            values = self.columns[name]
+        else:
+            return None
+        return values if self.rows is None else values[self.rows]
+
+    def number(self, name: str, default: Any) -> np.ndarray:
+        """Float column; missing columns and NaN cells take the default"""
+        raw = self.raw(name)
+        if raw is None:
+            return np.broadcast_to(np.asarray(default, dtype=np.float64), (self.size,)).copy()
+        values = np.asarray(raw, dtype=np.float64)
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.where(missing, default, values)
+        return values
+
+    def flag(self, name: str) -> np.ndarray:
+        """Boolean column as 1.0/0.0, missing columns and NaN/None cells are False"""
+        raw = self.raw(name)
+        if raw is None:
+            return np.zeros(self.size)
+        values = np.asarray(raw, dtype=np.float64)
+        return np.where(np.isnan(values) | (values == 0), 0.0, 1.0)
+
+    def count(self, name: str) -> np.ndarray:
+        """Lengths of a column of lists (numeric columns are taken as counts)"""
+        raw = self.raw(name)
+        if raw is None:
+            return np.zeros(self.size)
+        if raw.dtype == object:
+            return np.fromiter((len(c) if c is not None else 0 for c in raw), dtype=np.float64, count=self.size)
+        return raw.astype(np.float64)
+
+    def lookup(self, name: str, table: Dict[str, float], default: float) -> np.ndarray:
+        """Map a categorical column through a table"""
+        values = np.full(self.size, default, dtype=np.float64)
+        raw = self.raw(name)
+        if raw is None:
+            return values
+        for key, score in table.items():
+            values[raw == key] = score
+        return values
+
+
+class FormulaRegistry:
+    """Formula specs per score, optionally overridden per category, compiled on first use"""
+
+    def __init__(self):
+        self._specs: Dict[Tuple[str, Optional[str]], FormulaSpec] = {}
+        self._compiled: Dict[Tuple[str, Optional[str]], CompiledFormula] = {}
+        self._version: Optional[str] = None
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of all registered specs; changes whenever a formula or weight does"""
+        if self._version is None:
+            specs = sorted(self._specs.items(), key=lambda item: (item[0][0], item[0][1] or ''))
+            self._version = hashlib.blake2b(repr(specs).encode(), digest_size=8).hexdigest()
+        return self._version
+
+    def register(self, spec: FormulaSpec, category: Optional[str] = None):
+        """Use spec for its score, for one category or (None) as the default"""
+        self._specs[(spec.score, category)] = spec
+        self._compiled.clear()
+        self._version = None
+
+    def resolve(self, score: str, category: Optional[str] = None) -> CompiledFormula:
+        """Compiled formula for a score in a category, falling back to the default"""
+        try:
+            return self._compiled[(score, category)]
+        except KeyError:
+            pass
+
+        key = (score, category) if (score, category) in self._specs else (score, None)
+        if key not in self._specs:
+            raise KeyError(f"No formula registered for {score}")
+        # Categories sharing the default share one compiled formula
+        compiled = self._compiled.get(key) or compile_formula(self._specs[key])
+        self._compiled[key] = compiled
+        self._compiled[(score, category)] = compiled
+        return compiled
+
+    def specs(self) -> Dict[Tuple[str, Optional[str]], FormulaSpec]:
+        """All registered specs keyed by (score, category)"""
+        return dict(self._specs)
+
+
+FIT_HINT_FORMULA = FormulaSpec(
+    score='fit_hint',
+    inputs=[
+        FormulaInput('returns_total', 0),
+        FormulaInput('returns_size', 0),
+        FormulaInput('exchanges_size', 0),
+        FormulaInput('purchases_with_advisor', 0),
+        FormulaInput('purchases_total', 1),
+        FormulaInput('reviews_fit_positive', 0),
+        FormulaInput('reviews_with_fit', 1)
+    ],
+    factors={
+        'purchases': 'max(purchases_total, 1)',
+        'reviews_fit': 'max(reviews_with_fit, 1)',
+        'return_size_rate': 'returns_size / max(returns_total, 1)',
+        'exchange_size_rate': 'exchanges_size / purchases',
+        'advisor_usage_rate': 'purchases_with_advisor / purchases',
+        'fit_positive_rate': 'reviews_fit_positive / reviews_fit'
+    },
+    weights={
+        'return_size_rate': -0.4,  # negative correlation
+        'exchange_size_rate': -0.2,
+        'advisor_usage_rate': 0.2,
+        'fit_positive_rate': 0.2
+    },
+    shift=0.5,  # Shift to center around 0.5
+    evidence=[
+        # Confidence grows with sample size
+        FormulaEvidence('return_size_rate', 'return_size_rate', 'returns_data', 'min(1.0, returns_total / 10)'),
+        FormulaEvidence('advisor_usage_rate', 'advisor_usage_rate', 'purchase_behavior', 'min(1.0, purchases / 50)'),
+        FormulaEvidence('fit_positive_rate', 'fit_positive_rate', 'review_analysis', 'min(1.0, reviews_fit / 20)')
+    ]
+)
+
+RELIABILITY_FORMULA = FormulaSpec(
+    score='reliability',
+    inputs=[
+        FormulaInput('rma_count', 0),
+        FormulaInput('claim_count', 0),
+        FormulaInput('units_sold', 1000),
+        FormulaInput('avg_days_to_claim', 365),
+        FormulaInput('warranty_claims', 0),
+        FormulaInput('reviews_durability_avg', 0.5),
+        FormulaInput('category_rma_avg', 5.0)
+    ],
+    factors={
+        'units': 'max(units_sold, 1)',
+        # Rates per 1000 units
+        'rma_rate': '(rma_count / units) * 1000',
+        'claim_rate': '(claim_count / units) * 1000',
+        'warranty_rate': '(warranty_claims / units) * 1000',
+        # MTBF proxy from average days to claim, normalized to 2 years
+        'mtbf_normalized': 'min(1.0, avg_days_to_claim / 730)',
+        # Category normalization (compare to category average)
+        'rma_rate_normalized': '1.0 - min(1.0, rma_rate / category_rma_avg)',
+        'claim_rate_normalized': '1.0 - min(1.0, claim_rate / (category_rma_avg * 2))',
+        'warranty_normalized': '1 - min(1.0, warranty_rate / 10)'
+    },
+    weights={
+        'rma_rate_normalized': -0.3,
+        'claim_rate_normalized': -0.3,
+        'mtbf_normalized': 0.2,
+        'warranty_normalized': -0.1,
+        'reviews_durability_avg': 0.1
+    },
+    evidence=[
+        FormulaEvidence('rma_per_1000', 'rma_rate', 'warranty_system', 'min(1.0, units / 1000)'),
+        FormulaEvidence('mtbf_days', 'avg_days_to_claim', 'warranty_system',
+                        '_where(claim_count > 0, min(1.0, claim_count / 10), 0.1)')
+    ]
+)
+
+FOOTWEAR_PERFORMANCE_FORMULA = FormulaSpec(
+    score='performance',
+    inputs=[
+        FormulaInput('energy_return_percent', 50),
+        FormulaInput('weight_grams', 300),
+        FormulaInput('cushioning_index', 5)
+    ],
+    factors={
+        'energy_return': 'energy_return_percent / 100',
+        # Lighter is better, up to a point
+        'weight_score': '1.0 - min(1.0, max(0, weight_grams - 200) / 300)',
+        'cushioning': 'cushioning_index / 10',
+        # Stack height preference depends on use case; neutral for footwear
+        'stack_score': '0.5'
+    },
+    weights={
+        'energy_return': 0.4,
+        'weight_score': 0.2,
+        'cushioning': 0.2,
+        'stack_score': 0.2
+    },
+    normalization='sigmoid_capped',
+    evidence=[
+        FormulaEvidence('energy_return', 'energy_return', 'lab_test', '0.95'),
+        FormulaEvidence('weight_score', 'weight_score', 'product_specs', '1.0')
+    ]
+)
+
+ELECTRONICS_PERFORMANCE_FORMULA = FormulaSpec(
+    score='performance',
+    inputs=[
+        FormulaInput('benchmark_percentile', 50),
+        FormulaInput('efficiency_rating', 3),
+        FormulaInput('latency_ms', 100)
+    ],
+    factors={
+        'benchmark_score': 'benchmark_percentile / 100',
+        'efficiency': 'efficiency_rating / 5',
+        'latency_score': '1.0 - min(1.0, latency_ms / 200)'
+    },
+    weights={
+        'benchmark_score': 0.5,
+        'efficiency': 0.3,
+        'latency_score': 0.2
+    },
+    normalization='sigmoid_capped',
+    evidence=[
+        FormulaEvidence('benchmark_percentile', 'benchmark_score', 'benchmark_suite', '0.9')
+    ]
+)
+
+# Generic performance based on reviews, relative to the category average
+PERFORMANCE_FORMULA = FormulaSpec(
+    score='performance',
+    inputs=[
+        FormulaInput('reviews_performance_avg', 0.5),
+        FormulaInput('category_performance_avg', 0.5)
+    ],
+    factors={
+        'relative_performance': 'reviews_performance_avg / max(category_performance_avg, 0.1)'
+    },
+    weights={
+        'relative_performance': 1.0
+    },
+    normalization='sigmoid_capped'
+)
+
+OWNER_SATISFACTION_FORMULA = FormulaSpec(
+    score='owner_satisfaction',
+    inputs=[
+        FormulaInput('avg_rating', 3.0),
+        FormulaInput('avg_rating_verified', default_from='avg_rating'),
+        FormulaInput('review_count_verified', 0),
+        FormulaInput('review_count_total', 1),
+        FormulaInput('csat_product', 0.7),
+        FormulaInput('csat_responses', 0),
+        FormulaInput('sentiment_90d', 0.5),
+        FormulaInput('sentiment_prev_90d', 0.5),
+        FormulaInput('repeat_purchase_rate', 0.1)
+    ],
+    factors={
+        'reviews_total': 'max(review_count_total, 1)',
+        # Sentiment trend (last 90 days vs previous)
+        'sentiment_trend': 'sentiment_90d - sentiment_prev_90d',
+        # Weighted rating (verified reviews count more)
+        'weighted_rating': (
+            '(avg_rating_verified * review_count_verified * 1.5 + '
+            'avg_rating * (reviews_total - review_count_verified)) / '
+            '(review_count_verified * 1.5 + (reviews_total - review_count_verified))'
+        ),
+        # Normalize rating to 0-1 (1-5 scale)
+        'rating_normalized': '(weighted_rating - 1) / 4',
+        'recent_sentiment': 'sentiment_90d + sentiment_trend'
+    },
+    weights={
+        'rating_normalized': 0.4,
+        'csat_product': 0.3,
+        'recent_sentiment': 0.2,
+        'repeat_purchase_rate': 0.1
+    },
+    normalization='sigmoid_capped',
+    evidence=[
+        FormulaEvidence('weighted_rating', 'weighted_rating', 'review_system', 'min(1.0, reviews_total / 100)'),
+        FormulaEvidence('csat_score', 'csat_product', 'survey_system', 'min(1.0, csat_responses / 50)'),
+        FormulaEvidence('sentiment_trend', 'sentiment_trend', 'sentiment_analysis', '0.8')
+    ]
+)
+
+UNIQUENESS_FORMULA = FormulaSpec(
+    score='uniqueness',
+    inputs=[
+        FormulaInput('rare_feature_count', 0),
+        FormulaInput('total_feature_count', 10),
+        FormulaInput('is_limited_edition', kind='flag'),
+        FormulaInput('stock_scarcity_score', 0.0),
+        FormulaInput('price_percentile_category', 50)
+    ],
+    factors={
+        'feature_rarity': 'rare_feature_count / max(total_feature_count, 1)',
+        'price_percentile': 'price_percentile_category / 100'
+    },
+    weights={
+        'feature_rarity': 0.4,
+        'is_limited_edition': 0.2,
+        'stock_scarcity_score': 0.2,
+        'price_percentile': 0.2
+    },
+    evidence=[
+        FormulaEvidence('feature_rarity', 'feature_rarity', 'market_analysis', '0.7')
+    ]
+)
+
+CRAFTSMANSHIP_FORMULA = FormulaSpec(
+    score='craftsmanship',
+    inputs=[
+        FormulaInput('material_grade', 0.5, kind='lookup', table=MATERIAL_GRADE_SCORES),
+        FormulaInput('origin_reputation_score', 0.5),
+        FormulaInput('warranty_days', 90),
+        FormulaInput('review_aspect_quality', 0.5),
+        FormulaInput('craftsmanship_mention_rate', 0.0)
+    ],
+    factors={
+        # Warranty as quality signal, 2 years = 1.0
+        'warranty_score': 'min(1.0, warranty_days / 730)'
+    },
+    weights={
+        'material_grade': 0.3,
+        'origin_reputation_score': 0.2,
+        'warranty_score': 0.2,
+        'review_aspect_quality': 0.2,
+        'craftsmanship_mention_rate': 0.1
+    },
+    evidence=[
+        FormulaEvidence('material_grade', 'material_grade', 'product_specs', '0.9')
+    ]
+)
+
+SUSTAINABILITY_FORMULA = FormulaSpec(
+    score='sustainability',
+    inputs=[
+        FormulaInput('sustainability_certifications', kind='count'),
+        FormulaInput('recycled_content_percent', 0),
+        FormulaInput('carbon_footprint_kg', 10),
+        FormulaInput('category_avg_carbon_kg', 10),
+        FormulaInput('sustainable_packaging', kind='flag'),
+        FormulaInput('supply_chain_transparency', 0.0)
+    ],
+    factors={
+        'cert_score': 'min(1.0, sustainability_certifications / 3)',
+        'recycled_percentage': 'recycled_content_percent / 100',
+        'carbon_score': 'max(0, 1 - (carbon_footprint_kg / category_avg_carbon_kg))'
+    },
+    weights={
+        'cert_score': 0.3,
+        'recycled_percentage': 0.25,
+        'carbon_score': 0.2,
+        'sustainable_packaging': 0.1,
+        'supply_chain_transparency': 0.15
+    },
+    normalization='capped',
+    evidence=[
+        FormulaEvidence('recycled_content', 'recycled_percentage', 'product_specs', '0.95'),
+        FormulaEvidence('carbon_footprint_relative', 'carbon_score', 'lca_analysis', '0.8')
+    ]
+)
+
+INNOVATION_FORMULA = FormulaSpec(
+    score='innovation',
+    inputs=[
+        FormulaInput('new_feature_count', 0),
+        FormulaInput('patent_count', 0),
+        FormulaInput('award_count', 0),
+        FormulaInput('press_mention_count', 0),
+        FormulaInput('uses_cutting_edge_tech', kind='flag'),
+        FormulaInput('tech_generation', 1),  # 1 = current, 2 = next-gen
+        FormulaInput('is_first_in_category', kind='flag')
+    ],
+    factors={
+        'new_features': 'min(1.0, new_feature_count / 3)',
+        'patents': 'min(1.0, patent_count / 2)',
+        'awards': 'min(1.0, award_count / 2)',
+        'press': 'min(1.0, press_mention_count / 10)',
+        'tech_generation_step': 'tech_generation - 1'
+    },
+    weights={
+        'new_features': 0.25,
+        'patents': 0.2,
+        'awards': 0.15,
+        'press': 0.1,
+        'uses_cutting_edge_tech': 0.15,
+        'tech_generation_step': 0.1,
+        'is_first_in_category': 0.05
+    },
+    evidence=[
+        FormulaEvidence('patent_count', 'patent_count', 'patent_database', '1.0')
+    ]
+)
+
+
+def default_formula_registry() -> FormulaRegistry:
+    """Registry with the built-in formulas (a fresh copy per call)"""
+    registry = FormulaRegistry()
+    for spec in [FIT_HINT_FORMULA, RELIABILITY_FORMULA, PERFORMANCE_FORMULA, OWNER_SATISFACTION_FORMULA,
+                 UNIQUENESS_FORMULA, CRAFTSMANSHIP_FORMULA, SUSTAINABILITY_FORMULA, INNOVATION_FORMULA]:
+        registry.register(spec)
+    registry.register(FOOTWEAR_PERFORMANCE_FORMULA, category='footwear')
+    registry.register(ELECTRONICS_PERFORMANCE_FORMULA, category='electronics')
+    return registry
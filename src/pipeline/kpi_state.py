@@ -0,0 +1,415 @@
+"""
+AXP Incremental KPI State
+Per-product accumulators maintained from event deltas instead of full recomputes
+"""
+
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Any, Union
+from dataclasses import dataclass, field
+from collections import defaultdict
+
+from .kpi_calculator import KPICalculator, SoftSignals
+
+
+# Look-back windows used by SQL_KPI_QUERIES, in days (an event aged W days is still inside)
+WINDOW_DAYS = {
+    '90d': 90,
+    '180d': 180,
+    '365d': 365,
+    '2y': 730
+}
+
+# Buckets older than the widest window no longer contribute to any KPI input
+MAX_WINDOW_DAYS = max(WINDOW_DAYS.values())
+
+
+@dataclass
+class ProductKPIState:
+    """
+    Accumulated KPI inputs for one product
+
+    Besides the daily buckets it keeps running totals of every WINDOW_DAYS
+    window as of window_day, and the customers' orders inside the widest
+    one. Moving the reference day only touches the buckets that enter or
+    leave a window, so reading a window costs O(1) instead of a scan over
+    up to MAX_WINDOW_DAYS buckets. The running state is not saved; it is
+    rebuilt from the buckets on first use.
+    """
+    buckets: Dict[int, Dict[str, float]] = field(default_factory=dict)  # day ordinal -> counters
+    totals: Dict[str, float] = field(default_factory=lambda: defaultdict(float))  # all-time counters
+    customer_orders: Dict[int, Dict[str, Set[str]]] = field(default_factory=dict)  # day ordinal -> customer -> order ids
+    day_orders: Dict[int, Dict[str, bool]] = field(default_factory=dict)  # day ordinal -> order id -> used size guide
+    static: Dict[str, Any] = field(default_factory=dict)  # e.g. category_rma_avg, csat_product
+    category: str = 'general'
+    window_day: Optional[int] = None
+    window_totals: Dict[int, Dict[str, float]] = field(default_factory=dict)  # max age -> counter -> sum
+    window_customers: Dict[str, Dict[str, int]] = field(default_factory=dict)  # customer -> order id -> days, widest window
+    window_repeaters: int = 0  # customers in window_customers with two or more orders
+
+    def add(self, day: int, counter: str, value: float = 1.0):
+        """Add value to a counter in the daily bucket"""
+        bucket = self.buckets.setdefault(day, defaultdict(float))
+        bucket[counter] += value
+        if self.window_day is not None and day <= self.window_day:
+            for max_age, totals in self.window_totals.items():
+                if self.window_day - day <= max_age:
+                    totals[counter] += value
+
+    def add_order(self, day: int, order_id: str, used_size_guide: bool, customer_id: Optional[str]):
+        """Count an order once per product, however many of its lines arrive"""
+        orders = self.day_orders.setdefault(day, {})
+        if order_id not in orders:
+            orders[order_id] = used_size_guide
+            self.add(day, 'orders')
+            if used_size_guide:
+                self.add(day, 'orders_with_advisor')
+        elif used_size_guide and not orders[order_id]:
+            orders[order_id] = True
+            self.add(day, 'orders_with_advisor')
+
+        if customer_id is not None:
+            order_ids = self.customer_orders.setdefault(day, {}).setdefault(customer_id, set())
+            if order_id not in order_ids:
+                order_ids.add(order_id)
+                if self.window_day is not None and 0 <= self.window_day - day <= MAX_WINDOW_DAYS:
+                    self._track_order(customer_id, order_id, 1)
+
+    def window_sum(self, counter: str, as_of: int, max_age: int, min_age: int = 0) -> float:
+        """Sum a counter over buckets aged min_age..max_age days (inclusive)"""
+        self.advance(as_of)
+        if max_age not in self.window_totals or (min_age and min_age - 1 not in self.window_totals):
+            return sum(
+                bucket.get(counter, 0.0)
+                for day, bucket in self.buckets.items()
+                if min_age <= as_of - day <= max_age
+            )
+        total = self.window_totals[max_age].get(counter, 0.0)
+        if min_age:
+            total -= self.window_totals[min_age - 1].get(counter, 0.0)
+        return total
+
+    def repeat_rate(self, as_of: int) -> Optional[float]:
+        """Share of customers with two or more distinct orders in the widest window"""
+        self.advance(as_of)
+        if not self.window_customers:
+            return None
+        return self.window_repeaters / len(self.window_customers)
+
+    def advance(self, as_of: int):
+        """Move the running window state to as_of"""
+        previous = self.window_day
+        if previous == as_of:
+            return
+        if previous is None or as_of < previous or as_of - previous > len(self.buckets):
+            self._rebuild(as_of)
+            return
+
+        for max_age, totals in self.window_totals.items():
+            # Buckets aging past max_age leave; buckets dated after previous come in
+            for day in range(previous - max_age, min(as_of - max_age, previous + 1)):
+                self._shift(totals, day, -1)
+            for day in range(max(previous + 1, as_of - max_age), as_of + 1):
+                self._shift(totals, day, 1)
+        for day in range(previous - MAX_WINDOW_DAYS, min(as_of - MAX_WINDOW_DAYS, previous + 1)):
+            self._shift_customers(day, -1)
+        for day in range(max(previous + 1, as_of - MAX_WINDOW_DAYS), as_of + 1):
+            self._shift_customers(day, 1)
+        self.window_day = as_of
+
+    def _rebuild(self, as_of: int):
+        """Running window state from scratch, in one pass over the buckets"""
+        self.window_totals = {max_age: defaultdict(float) for max_age in WINDOW_DAYS.values()}
+        self.window_customers = {}
+        self.window_repeaters = 0
+        self.window_day = as_of
+        for day in self.buckets:
+            if day <= as_of:
+                for max_age, totals in self.window_totals.items():
+                    if as_of - day <= max_age:
+                        self._shift(totals, day, 1)
+        for day in self.customer_orders:
+            if 0 <= as_of - day <= MAX_WINDOW_DAYS:
+                self._shift_customers(day, 1)
+
+    def _shift(self, totals: Dict[str, float], day: int, sign: int):
+        for counter, value in self.buckets.get(day, {}).items():
+            totals[counter] += sign * value
+
+    def _shift_customers(self, day: int, sign: int):
+        for customer_id, order_ids in self.customer_orders.get(day, {}).items():
+            for order_id in order_ids:
+                self._track_order(customer_id, order_id, sign)
+
+    def _track_order(self, customer_id: str, order_id: str, sign: int):
+        orders = self.window_customers.setdefault(customer_id, {})
+        before = len(orders)
+        orders[order_id] = orders.get(order_id, 0) + sign
+        if not orders[order_id]:
+            del orders[order_id]
+        after = len(orders)
+        self.window_repeaters += (after > 1) - (before > 1)
+        if not orders:
+            del self.window_customers[customer_id]
+
+
+class KPIAccumulator:
+    """
+    Maintain KPI inputs incrementally from returns, orders, claims and reviews
+
+    Each apply_* call folds one record into daily buckets and marks the product
+    dirty. emit() rebuilds product_data only for dirty products, plus products
+    whose buckets slid across a window boundary since the previous emit, and
+    scores them with KPICalculator.
+    """
+
+    def __init__(self, calculator: Optional[KPICalculator] = None):
+        self.calculator = calculator or KPICalculator()
+        self.products: Dict[str, ProductKPIState] = {}
+        self.dirty: Set[str] = set()
+        self.last_emit_day: Optional[int] = None
+        self._products_by_day: Dict[int, Set[str]] = defaultdict(set)
+
+    def apply_return(self, record: Dict):
+        """Fold a returns row (product_id, created_at, reason, exchange_sku)"""
+        state, day = self._touch(record['product_id'], record['created_at'])
+        state.add(day, 'returns')
+        if record.get('reason') == 'size_issue':
+            state.add(day, 'returns_size')
+            if record.get('exchange_sku') is not None:
+                state.add(day, 'exchanges_size')
+
+    def apply_order(self, record: Dict):
+        """Fold an order line (product_id, created_at, quantity, customer_id, order_id, used_size_guide)"""
+        state, day = self._touch(record['product_id'], record['created_at'])
+        state.add(day, 'units', record.get('quantity', 1))
+
+        # Orders and repeat buyers count distinct orders; lines without order_id are told apart by time
+        order_id = record.get('order_id')
+        customer_id = record.get('customer_id')
+        state.add_order(
+            day,
+            str(order_id if order_id is not None else record['created_at']),
+            bool(record.get('used_size_guide')),
+            str(customer_id) if customer_id is not None else None
+        )
+
+    def apply_claim(self, record: Dict):
+        """Fold a warranty claim (product_id, claim_date, purchase_date, claim_type)"""
+        state, day = self._touch(record['product_id'], record['claim_date'])
+        state.add(day, 'claims')
+        if record.get('claim_type') == 'RMA':
+            state.add(day, 'rma')
+        if record.get('purchase_date') is not None:
+            state.add(day, 'days_to_claim', day - self._day(record['purchase_date']))
+            state.add(day, 'claims_dated')
+
+    def apply_review(self, record: Dict):
+        """Fold a review (product_id, created_at, rating, verified_purchase, aspects, sentiment_score)"""
+        state, day = self._touch(record['product_id'], record['created_at'])
+        aspects = record.get('aspects') or {}
+
+        if record.get('rating') is not None:
+            state.add(day, 'reviews')
+            state.add(day, 'rating_sum', record['rating'])
+            if record.get('verified_purchase'):
+                state.add(day, 'reviews_verified')
+                state.add(day, 'rating_verified_sum', record['rating'])
+
+        if aspects.get('fit') is not None:
+            state.add(day, 'reviews_with_fit')
+            if aspects['fit'] >= 0.7:
+                state.add(day, 'reviews_fit_positive')
+
+        if record.get('sentiment_score') is not None:
+            state.add(day, 'sentiment_sum', record['sentiment_score'])
+            state.add(day, 'sentiment_count')
+
+        # Durability is averaged over all reviews, not windowed
+        if aspects.get('durability') is not None:
+            state.totals['durability_sum'] += aspects['durability']
+            state.totals['durability_count'] += 1
+
+    def set_static(self, product_id: str, fields: Dict[str, Any], category: Optional[str] = None):
+        """Set inputs that do not come from event streams (baselines, specs, CSAT)"""
+        state = self._state(product_id)
+        state.static.update(fields)
+        if category is not None:
+            state.category = category
+        self.dirty.add(product_id)
+
+    def changed_products(self, as_of: Optional[date] = None) -> Set[str]:
+        """Products whose KPI inputs differ from the previous emit"""
+        today = self._day(as_of or date.today())
+        changed = set(self.dirty)
+
+        if self.last_emit_day is not None and today > self.last_emit_day:
+            # A bucket on day d leaves window W once the day moves past d + W
+            for window in WINDOW_DAYS.values():
+                for day in range(self.last_emit_day - window, today - window):
+                    changed.update(self._products_by_day.get(day, ()))
+
+        return changed
+
+    def build_product_data(self, product_id: str, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Rebuild the product_data dict KPICalculator expects from accumulated state"""
+        state = self.products[product_id]
+        today = self._day(as_of or date.today())
+        window = lambda counter, name: state.window_sum(counter, today, WINDOW_DAYS[name])
+
+        data = dict(state.static)
+
+        # Fit inputs
+        data['returns_total'] = window('returns', '180d')
+        data['returns_size'] = window('returns_size', '180d')
+        data['exchanges_size'] = window('exchanges_size', '180d')
+        data['purchases_total'] = window('orders', '365d')
+        data['purchases_with_advisor'] = window('orders_with_advisor', '365d')
+        data['reviews_with_fit'] = window('reviews_with_fit', '365d')
+        data['reviews_fit_positive'] = window('reviews_fit_positive', '365d')
+
+        # Reliability inputs
+        data['claim_count'] = window('claims', '2y')
+        data['rma_count'] = window('rma', '2y')
+        data['units_sold'] = window('units', '2y')
+        claims_dated = window('claims_dated', '2y')
+        data['avg_days_to_claim'] = window('days_to_claim', '2y') / claims_dated if claims_dated else 730
+        if state.totals.get('durability_count'):
+            data['reviews_durability_avg'] = state.totals['durability_sum'] / state.totals['durability_count']
+
+        # Satisfaction inputs
+        reviews = window('reviews', '2y')
+        reviews_verified = window('reviews_verified', '2y')
+        if reviews:
+            data['avg_rating'] = window('rating_sum', '2y') / reviews
+            data['review_count_total'] = reviews
+            data['review_count_verified'] = reviews_verified
+        if reviews_verified:
+            data['avg_rating_verified'] = window('rating_verified_sum', '2y') / reviews_verified
+
+        recent_count = window('sentiment_count', '90d')
+        if recent_count:
+            data['sentiment_90d'] = window('sentiment_sum', '90d') / recent_count
+        previous_count = state.window_sum('sentiment_count', today, WINDOW_DAYS['180d'], WINDOW_DAYS['90d'] + 1)
+        if previous_count:
+            data['sentiment_prev_90d'] = (
+                state.window_sum('sentiment_sum', today, WINDOW_DAYS['180d'], WINDOW_DAYS['90d'] + 1) / previous_count
+            )
+
+        repeat_rate = state.repeat_rate(today)
+        if repeat_rate is not None:
+            data['repeat_purchase_rate'] = repeat_rate
+
+        return data
+
+    def emit(self, as_of: Optional[date] = None) -> Dict[str, SoftSignals]:
+        """
+        Re-score only products whose inputs changed since the previous emit
+
+        Args:
+            as_of: Reference date for the windows (defaults to today)
+
+        Returns:
+            Dict of product_id -> SoftSignals for changed products
+        """
+        as_of = as_of or date.today()
+        changed = self.changed_products(as_of)
+
+        results = {}
+        for product_id in changed:
+            if product_id not in self.products:
+                continue
+            results[product_id] = self.calculator.calculate_all_soft_signals(
+                self.build_product_data(product_id, as_of),
+                self.products[product_id].category
+            )
+
+        self._prune(self._day(as_of))
+        self.dirty.clear()
+        self.last_emit_day = self._day(as_of)
+
+        return results
+
+    def save(self, path: str):
+        """Persist accumulator state as JSON"""
+        payload = {
+            'last_emit_day': self.last_emit_day,
+            'dirty': sorted(self.dirty),
+            'products': {
+                product_id: {
+                    'buckets': {str(day): dict(bucket) for day, bucket in state.buckets.items()},
+                    'totals': dict(state.totals),
+                    'customer_orders': {
+                        str(day): {customer_id: sorted(order_ids) for customer_id, order_ids in customers.items()}
+                        for day, customers in state.customer_orders.items()
+                    },
+                    'day_orders': {str(day): orders for day, orders in state.day_orders.items()},
+                    'static': state.static,
+                    'category': state.category
+                }
+                for product_id, state in self.products.items()
+            }
+        }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str, calculator: Optional[KPICalculator] = None) -> 'KPIAccumulator':
+        """Restore accumulator state saved with save()"""
+        with open(path) as f:
+            payload = json.load(f)
+
+        accumulator = cls(calculator)
+        accumulator.last_emit_day = payload['last_emit_day']
+        accumulator.dirty = set(payload['dirty'])
+
+        for product_id, raw in payload['products'].items():
+            state = ProductKPIState(
+                buckets={int(day): defaultdict(float, bucket) for day, bucket in raw['buckets'].items()},
+                totals=defaultdict(float, raw['totals']),
+                customer_orders={
+                    int(day): {customer_id: set(order_ids) for customer_id, order_ids in customers.items()}
+                    for day, customers in raw.get('customer_orders', {}).items()
+                },
+                day_orders={int(day): orders for day, orders in raw.get('day_orders', {}).items()},
+                static=raw['static'],
+                category=raw['category']
+            )
+            accumulator.products[product_id] = state
+            for day in state.buckets:
+                accumulator._products_by_day[day].add(product_id)
+
+        return accumulator
+
+    def _state(self, product_id: str) -> ProductKPIState:
+        """Get or create the state for a product"""
+        if product_id not in self.products:
+            self.products[product_id] = ProductKPIState()
+        return self.products[product_id]
+
+    def _touch(self, product_id: str, timestamp: Union[str, date, datetime]):
+        """Resolve state and bucket day for an incoming record and mark it dirty"""
+        state = self._state(product_id)
+        day = self._day(timestamp)
+        self._products_by_day[day].add(product_id)
+        self.dirty.add(product_id)
+        return state, day
+
+    def _prune(self, today: int):
+        """Drop buckets that fell out of every window"""
+        for day in [d for d in self._products_by_day if today - d > MAX_WINDOW_DAYS]:
+            for product_id in self._products_by_day.pop(day):
+                state = self.products[product_id]
+                # Settle the running totals first, so the dropped bucket is no longer in them
+                state.advance(today)
+                state.buckets.pop(day, None)
+                state.customer_orders.pop(day, None)
+                state.day_orders.pop(day, None)
+
+    def _day(self, value: Union[str, date, datetime]) -> int:
+        """Day ordinal for ISO strings, dates and datetimes"""
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.toordinal()
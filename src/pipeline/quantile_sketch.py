@@ -0,0 +1,293 @@
+"""
+AXP Quantile Sketches
+Mergeable KLL quantile sketches for relative KPI inputs (percentiles per category)
+"""
+
+import bisect
+import json
+import math
+import random
+from typing import Dict, List, Optional, Tuple, Any, Iterable
+
+import numpy as np
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016)
+
+    Keeps O(k log(n/k)) items in a hierarchy of compactors where an item at
+    level h stands for 2**h stream values. Rank error is about 1.7/k of n
+    (≈1% for the default k=200). Sketches built on different shards of a
+    stream can be merged into a sketch of the whole stream.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        """
+        Args:
+            k: Accuracy parameter; larger is more accurate and uses more memory
+            seed: Seed for the compaction coin flips, for reproducible sketches
+        """
+        self.k = k
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.compactors: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity(0)
+        self._size = 0
+        self._sorted: Optional[Tuple[List[float], List[int]]] = None
+
+    def update(self, value: float):
+        """Add one value to the sketch"""
+        value = float(value)
+        if value != value:  # NaN
+            return
+        self.compactors[0].append(value)
+        self.n += 1
+        self._size += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._sorted = None
+        if self._size >= self._max_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]):
+        """Add many values"""
+        for value in values:
+            self.update(value)
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Fold another sketch (e.g. from a parallel shard) into this one; returns self"""
+        if other.n == 0:
+            return self
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._size = sum(len(c) for c in self.compactors)
+        self._sorted = None
+        while self._size >= self._max_size:
+            self._compress()
+        return self
+
+    def rank(self, value: float) -> float:
+        """Estimated fraction of stream values <= value, in [0, 1]"""
+        if self.n == 0:
+            return 0.0
+        items, cumulative = self._weighted_items()
+        index = bisect.bisect_right(items, value)
+        return cumulative[index - 1] / self.n if index else 0.0
+
+    def ranks(self, values: np.ndarray) -> np.ndarray:
+        """Vectorized rank() for an array of values (NaN stays NaN)"""
+        values = np.asarray(values, dtype=np.float64)
+        if self.n == 0:
+            return np.where(np.isnan(values), np.nan, 0.0)
+        items, cumulative = self._weighted_items()
+        cumulative = np.concatenate([[0], cumulative]) / self.n
+        result = cumulative[np.searchsorted(np.asarray(items), values, side='right')]
+        return np.where(np.isnan(values), np.nan, result)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q in [0, 1], or None for an empty sketch"""
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        items, cumulative = self._weighted_items()
+        index = bisect.bisect_left(cumulative, q * self.n)
+        return items[min(index, len(items) - 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state"""
+        return {'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max, 'compactors': self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], seed: int = 0) -> 'KLLSketch':
+        """Restore a sketch written by to_dict()"""
+        sketch = cls(data['k'], seed)
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.compactors = [list(c) for c in data['compactors']]
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        """Compactor capacity; lower levels shrink geometrically by 2/3"""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _compress(self):
+        """Compact full levels upward until the sketch fits again"""
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items = sorted(self.compactors[level])
+                # An odd item out stays behind at this level
+                keep = [items.pop()] if len(items) % 2 else []
+                self.compactors[level + 1].extend(items[self._rng.randint(0, 1)::2])
+                self.compactors[level] = keep
+                self._size = sum(len(c) for c in self.compactors)
+                if self._size < self._max_size:
+                    break
+
+    def _weighted_items(self) -> Tuple[List[float], List[int]]:
+        """Sorted retained items with cumulative weights (cached until the next update)"""
+        if self._sorted is None:
+            weighted = sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self.compactors)
+                for value in items
+            )
+            items = [value for value, _ in weighted]
+            cumulative = []
+            total = 0
+            for _, weight in weighted:
+                total += weight
+                cumulative.append(total)
+            self._sorted = (items, cumulative)
+        return self._sorted
+
+
+# raw product_data field -> percentile field (0-100) derived from its category sketch
+PERCENTILE_METRICS: Dict[str, str] = {
+    'price': 'price_percentile_category',
+    'benchmark_score': 'benchmark_percentile'
+}
+
+
+class CategorySketchIndex:
+    """
+    One KLL sketch per category and raw metric, for percentile KPI inputs
+
+    Built in one streaming pass over the catalog (or per shard and merged),
+    then used by KPICalculator to fill price_percentile_category and
+    benchmark_percentile from raw price and benchmark_score values.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.seed = seed
+        self.sketches: Dict[str, Dict[str, KLLSketch]] = {}
+
+    @classmethod
+    def build(cls, products: Iterable[Tuple[str, Dict]], k: int = 200, seed: int = 0) -> 'CategorySketchIndex':
+        """
+        Build the index in one pass over (category, product_data) pairs
+
+        Args:
+            products: Iterable of (category, product_data)
+            k: Sketch accuracy parameter
+            seed: Seed for reproducible sketches
+        """
+        index = cls(k, seed)
+        for category, product_data in products:
+            index.add(category, product_data)
+        return index
+
+    def add(self, category: str, product_data: Dict):
+        """Feed one product's raw metric values into its category sketches"""
+        for metric in PERCENTILE_METRICS:
+            value = product_data.get(metric)
+            if value is not None:
+                self._sketch(category, metric).update(value)
+
+    def merge(self, other: 'CategorySketchIndex') -> 'CategorySketchIndex':
+        """Fold another index (e.g. one built by a parallel worker) into this one; returns self"""
+        for category, metrics in other.sketches.items():
+            for metric, sketch in metrics.items():
+                self._sketch(category, metric).merge(sketch)
+        return self
+
+    def get(self, category: str, metric: str) -> Optional[KLLSketch]:
+        """Sketch for a category metric, or None if the category had no samples"""
+        return self.sketches.get(category, {}).get(metric)
+
+    def percentile(self, value: float, category: str, metric: str) -> Optional[float]:
+        """Percentile (0-100) of value within its category, or None without samples"""
+        sketch = self.get(category, metric)
+        if sketch is None or sketch.n == 0:
+            return None
+        return 100 * sketch.rank(value)
+
+    def inject(self, product_data: Dict, category: str) -> Dict:
+        """Return product_data with missing percentile fields derived from raw values"""
+        missing = {}
+        for metric, field in PERCENTILE_METRICS.items():
+            if field in product_data or product_data.get(metric) is None:
+                continue
+            percentile = self.percentile(product_data[metric], category, metric)
+            if percentile is not None:
+                missing[field] = percentile
+        return {**product_data, **missing} if missing else product_data
+
+    def inject_columns(self, columns: Dict[str, Any], categories: Any) -> Dict[str, Any]:
+        """Columnar inject for calculate_batch: fill absent or NaN percentile cells per row category"""
+        n = len(next(iter(columns.values()))) if columns else 0
+        categories = np.broadcast_to(np.asarray(categories, dtype=object), (n,)).astype(str)
+        columns = dict(columns)
+
+        for metric, field in PERCENTILE_METRICS.items():
+            if metric not in columns:
+                continue
+            raw = np.asarray(columns[metric], dtype=np.float64)
+            percentiles = np.full(n, np.nan)
+            for category in np.unique(categories):
+                sketch = self.get(category, metric)
+                if sketch is None or sketch.n == 0:
+                    continue
+                rows = categories == category
+                percentiles[rows] = 100 * sketch.ranks(raw[rows])
+            if field in columns:
+                existing = np.asarray(columns[field], dtype=np.float64)
+                percentiles = np.where(np.isnan(existing), percentiles, existing)
+            columns[field] = percentiles
+
+        return columns
+
+    def save(self, path: str):
+        """Write all sketches as JSON"""
+        payload = {
+            'k': self.k,
+            'seed': self.seed,
+            'sketches': {
+                category: {metric: sketch.to_dict() for metric, sketch in metrics.items()}
+                for category, metrics in self.sketches.items()
+            }
+        }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'CategorySketchIndex':
+        """Read an index written by save()"""
+        with open(path) as f:
+            payload = json.load(f)
+        index = cls(payload['k'], payload['seed'])
+        index.sketches = {
+            category: {metric: KLLSketch.from_dict(raw, payload['seed']) for metric, raw in metrics.items()}
+            for category, metrics in payload['sketches'].items()
+        }
+        return index
+
+    def _sketch(self, category: str, metric: str) -> KLLSketch:
+        metrics = self.sketches.setdefault(category, {})
+        if metric not in metrics:
+            metrics[metric] = KLLSketch(self.k, self.seed)
+        return metrics[metric]
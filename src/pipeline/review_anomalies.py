@@ -0,0 +1,289 @@
+"""
+AXP Review Anomalies
+Review time-series anomaly detection: vectorized over many businesses, or online per daily count
+"""
+
+import json
+import math
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+
+# Spike: a day above mean + SPIKE_SIGMAS * std
+SPIKE_SIGMAS = 3
+
+# Cluster day: a day above CLUSTER_FACTOR * mean; flagged when more than
+# CLUSTER_SHARE of the days are cluster days
+CLUSTER_FACTOR = 3
+CLUSTER_SHARE = 0.1
+
+# Minimum days of history for any check
+MIN_DAYS = 3
+
+# Businesses processed per vectorized block (bounds temporary memory)
+ROW_CHUNK = 65536
+
+# Smoothing of the online detector (weight of the newest day, ~2/(span+1) for a 30-day span)
+EWMA_ALPHA = 0.065
+
+# Floor of the online standard deviation, so flat histories still flag jumps
+MIN_STD = 1.0
+
+# Days a spike keeps being reported by the online detector
+SPIKE_WINDOW_DAYS = 30
+
+
+def history_matrix(histories: List[List[Dict]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack review histories ([{'count': n}, ...] per business) into a matrix
+
+    Returns:
+        (businesses, max days) counts, zero-padded, and the days of history per business
+    """
+    lengths = np.array([len(history) for history in histories], dtype=np.int64)
+    counts = np.zeros((len(histories), int(lengths.max()) if len(lengths) else 0), dtype=np.int64)
+    for row, history in enumerate(histories):
+        counts[row, :len(history)] = [h['count'] for h in history]
+    return counts, lengths
+
+
+def time_anomaly_stats(counts: Any, lengths: Optional[Any] = None) -> Dict[str, np.ndarray]:
+    """
+    Spike and clustering statistics of every business in one pass
+
+    Args:
+        counts: (businesses, days) daily review counts
+        lengths: Days of history per business (the first lengths[i] columns
+            of row i are used); all columns if not given
+
+    Returns:
+        Dict of per-business 'mean', 'std' (sample), 'cluster_days' and
+        'clustered', and the (businesses, days) 'spikes' mask; businesses
+        with fewer than MIN_DAYS days have no spikes and are not clustered
+    """
+    counts = np.asarray(counts)
+    if counts.ndim != 2:
+        raise ValueError(f"Expected a (businesses, days) array, got shape {counts.shape}")
+    n_rows, n_days = counts.shape
+    lengths = np.full(n_rows, n_days, dtype=np.int64) if lengths is None else np.asarray(lengths, dtype=np.int64)
+    if lengths.shape != (n_rows,) or (lengths > n_days).any():
+        raise ValueError("lengths must give at most the number of columns for every row")
+
+    mean = np.zeros(n_rows)
+    std = np.zeros(n_rows)
+    cluster_days = np.zeros(n_rows, dtype=np.int64)
+    spikes = np.zeros((n_rows, n_days), dtype=bool)
+
+    for start in range(0, n_rows, ROW_CHUNK):
+        block = slice(start, start + ROW_CHUNK)
+        n = lengths[block]
+        valid = np.arange(n_days) < n[:, np.newaxis]
+        values = np.where(valid, counts[block], 0).astype(np.float64)
+        safe_n = np.maximum(n, 1)
+
+        block_mean = values.sum(axis=1) / safe_n
+        squares = np.where(valid, values - block_mean[:, np.newaxis], 0.0) ** 2
+        block_std = np.sqrt(squares.sum(axis=1) / np.maximum(n - 1, 1))
+
+        checked = valid & (n >= MIN_DAYS)[:, np.newaxis]
+        spikes[block] = checked & (block_std > 0)[:, np.newaxis] & (
+            values > (block_mean + SPIKE_SIGMAS * block_std)[:, np.newaxis]
+        )
+        cluster_days[block] = (checked & (values > (block_mean * CLUSTER_FACTOR)[:, np.newaxis])).sum(axis=1)
+        mean[block] = block_mean
+        std[block] = block_std
+
+    return {
+        'mean': mean,
+        'std': std,
+        'spikes': spikes,
+        'cluster_days': cluster_days,
+        'clustered': cluster_days > lengths * CLUSTER_SHARE
+    }
+
+
+def detect_time_anomalies_batch(counts: Any, lengths: Optional[Any] = None) -> List[List[str]]:
+    """
+    Anomaly messages per business, as TrustVerifier._detect_time_anomalies reports them
+
+    Args:
+        counts: (businesses, days) daily review counts; messages quote the
+            given values, so a list of lists mixing ints and floats reads
+            like the history it came from
+        lengths: Days of history per business (see time_anomaly_stats)
+    """
+    values = counts
+    counts = np.asarray(counts)
+    stats = time_anomaly_stats(counts, lengths)
+    anomalies: List[List[str]] = [[] for _ in range(len(counts))]
+
+    # Messages are only built for flagged businesses
+    for row in np.flatnonzero(stats['spikes'].any(axis=1) | stats['clustered']):
+        row_counts = list(values[row]) if isinstance(values, (list, tuple)) else counts[row].tolist()
+        mean = stats['mean'][row]
+        for day in np.flatnonzero(stats['spikes'][row]):
+            anomalies[row].append(f"Review spike on day {day}: {row_counts[day]} reviews (mean: {mean:.1f})")
+        if stats['clustered'][row]:
+            anomalies[row].append(f"Review clustering detected: {stats['cluster_days'][row]} high-activity days")
+
+    return anomalies
+
+
+@dataclass
+class RateState:
+    """Exponentially weighted statistics of one review source's daily counts"""
+    mean: float = 0.0
+    var: float = 0.0
+    days: int = 0
+    cluster_rate: float = 0.0  # weighted share of days above CLUSTER_FACTOR * mean
+    clustered: bool = False
+    clustered_since: Optional[str] = None
+    last_date: Optional[str] = None
+    spikes: List[List] = field(default_factory=list)  # [day index, day, count, expected] inside the window
+
+
+class ReviewRateMonitor:
+    """
+    Online review spike and clustering detection, O(1) per daily count
+
+    Keeps an exponentially weighted mean and variance per source key (e.g.
+    'trustpilot:<business_id>'). Until 1/alpha days are seen the weight of
+    the newest day is 1/days instead, so the early statistics are the plain
+    mean and variance rather than biased towards the first day. Each day is
+    tested against the statistics of the days before it, so a spike never
+    raises its own baseline; it then enters the statistics capped at the
+    spike threshold, so one burst does not mask the next. Clustering is the
+    weighted share of high days and holds while it exceeds CLUSTER_SHARE.
+    """
+
+    def __init__(self,
+                 alpha: float = EWMA_ALPHA,
+                 sigmas: float = SPIKE_SIGMAS,
+                 warmup_days: Optional[int] = None,
+                 min_std: float = MIN_STD,
+                 spike_window_days: int = SPIKE_WINDOW_DAYS):
+        """
+        Args:
+            alpha: Weight of the newest day in the moving statistics
+            sigmas: Standard deviations above the mean that count as a spike
+            warmup_days: Days observed before anything is flagged (default 1/alpha)
+            min_std: Lower bound of the standard deviation used in the test
+            spike_window_days: Days a spike stays in anomalies()
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.sigmas = sigmas
+        self.warmup_days = warmup_days if warmup_days is not None else math.ceil(1 / alpha)
+        self.min_std = min_std
+        self.spike_window_days = spike_window_days
+        self.states: Dict[str, RateState] = {}
+
+    def update(self, key: str, count: float, date: Optional[str] = None) -> List[str]:
+        """
+        Fold one day's review count and return anomalies it raises
+
+        Args:
+            key: Review source key
+            count: Reviews on that day
+            date: ISO date of the day, used in messages and to skip replayed days
+        """
+        state = self.states.setdefault(key, RateState())
+        anomalies = []
+        day = date or f"day {state.days}"
+
+        if state.days == 0:
+            state.mean = float(count)
+        else:
+            warm = state.days >= self.warmup_days
+            std = max(math.sqrt(state.var), self.min_std)
+            threshold = state.mean + self.sigmas * std
+            if warm and count > threshold:
+                anomalies.append(f"Review spike on {day}: {count} reviews (expected: {state.mean:.1f})")
+                state.spikes.append([state.days, day, count, round(state.mean, 1)])
+
+            # Nothing is a high day against a zero or still unsettled mean
+            if warm and state.mean > 0:
+                high = 1.0 if count > state.mean * CLUSTER_FACTOR else 0.0
+                state.cluster_rate += self.alpha * (high - state.cluster_rate)
+
+            alpha = max(self.alpha, 1 / (state.days + 1))
+            diff = min(count, threshold) - state.mean
+            increment = alpha * diff
+            state.mean += increment
+            state.var = (1 - alpha) * (state.var + diff * increment)
+
+        state.days += 1
+        if date is not None:
+            state.last_date = date
+        state.spikes = [spike for spike in state.spikes if spike[0] > state.days - self.spike_window_days]
+
+        clustered = state.cluster_rate > CLUSTER_SHARE
+        if clustered and not state.clustered:
+            state.clustered_since = day
+            anomalies.append(f"Review clustering detected from {day}: {state.cluster_rate:.0%} high-activity days")
+        elif not clustered:
+            state.clustered_since = None
+        state.clustered = clustered
+        return anomalies
+
+    def anomalies(self, key: str) -> List[str]:
+        """Spikes of the last spike_window_days days and ongoing clustering of a source"""
+        state = self.states.get(key)
+        if state is None:
+            return []
+        anomalies = [
+            f"Review spike on {day}: {count} reviews (expected: {expected:.1f})"
+            for _, day, count, expected in state.spikes
+        ]
+        if state.clustered:
+            anomalies.append(
+                f"Review clustering detected from {state.clustered_since}: "
+                f"{state.cluster_rate:.0%} high-activity days"
+            )
+        return anomalies
+
+    def update_history(self, key: str, history: List[Dict]) -> List[str]:
+        """
+        Fold the days of a dated history ([{'count': n, 'date': ...}, ...]) not seen before
+
+        Days are new if their ISO 'date' is later than the last one folded,
+        so rolling snapshots of the same source can be passed repeatedly.
+
+        Returns:
+            The source's current anomalies (see anomalies())
+        """
+        if not all('date' in h for h in history):
+            raise ValueError("update_history needs a 'date' on every day of the history")
+        state = self.states.get(key)
+        if state is not None and state.last_date is not None:
+            history = [h for h in history if h['date'] > state.last_date]
+
+        for h in sorted(history, key=lambda h: h['date']):
+            self.update(key, h['count'], h['date'])
+        return self.anomalies(key)
+
+    def save(self, path: str):
+        """Write the settings and all per-source states as JSON"""
+        payload = {
+            'alpha': self.alpha,
+            'sigmas': self.sigmas,
+            'warmup_days': self.warmup_days,
+            'min_std': self.min_std,
+            'spike_window_days': self.spike_window_days,
+            'states': {key: asdict(state) for key, state in self.states.items()}
+        }
+        with open(path, 'w') as f:
+            json.dump(payload, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReviewRateMonitor':
+        """Read a monitor written by save()"""
+        with open(path) as f:
+            payload = json.load(f)
+        monitor = cls(payload['alpha'], payload['sigmas'], payload['warmup_days'], payload['min_std'],
+                      payload.get('spike_window_days', SPIKE_WINDOW_DAYS))
+        monitor.states = {key: RateState(**raw) for key, raw in payload['states'].items()}
+        return monitor
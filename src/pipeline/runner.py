@@ -0,0 +1,275 @@
+"""
+AXP Sharded Scoring Runner
+Score a product catalog with the pipeline modules across a process pool
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from .kpi_calculator import KPICalculator
+from .intent_extractor import IntentExtractor
+from .trust_verifier import TrustVerifier
+
+
+def shard_of(product_id: str, num_shards: int) -> int:
+    """Stable shard index for a product ID (independent of PYTHONHASHSEED)"""
+    digest = hashlib.blake2b(str(product_id).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % num_shards
+
+
+# Leading product ID of a catalog line serialized as {"product": {"id": ...
+_LEADING_ID = re.compile(r'\{\s*"product"\s*:\s*\{\s*"id"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)\s*[,}]')
+
+
+def record_product_id(line: str) -> Any:
+    """
+    Product ID of a catalog line, without parsing the whole record when the ID comes first
+
+    Other lines (bare product records, IDs after other keys) are parsed in full.
+    """
+    match = _LEADING_ID.match(line)
+    if match:
+        return json.loads(match.group(1))
+    record = json.loads(line)
+    return record.get('product', record)['id']
+
+
+def product_category(product: Dict) -> str:
+    """KPICalculator category from the first breadcrumb, e.g. 'Footwear' -> 'footwear'"""
+    breadcrumbs = product.get('breadcrumbs') or []
+    return breadcrumbs[0].lower() if breadcrumbs else 'general'
+
+
+# Scorers are built once per worker process by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(as_of: Optional[str] = None):
+    """
+    Create the pipeline scorers for this worker process
+
+    Args:
+        as_of: ISO timestamp the whole run is scored at (defaults to now, UTC);
+            used for intent decay and as the KPI evidence clock
+    """
+    run_time = datetime.fromisoformat(as_of) if as_of else datetime.now(timezone.utc)
+    _worker_state['as_of'] = run_time
+    _worker_state['kpi'] = KPICalculator(clock=lambda: run_time)
+    _worker_state['intent'] = IntentExtractor()
+    _worker_state['trust'] = TrustVerifier()
+
+
+def score_record(record: Dict) -> Dict[str, Any]:
+    """
+    Score one catalog record with all three pipeline modules
+
+    A record is a catalog_products.jsonl line ({"product": {...}}) optionally
+    carrying 'kpi_inputs' (KPICalculator product_data), 'category' and
+    'intent_sources' (IntentExtractor data_sources).
+    """
+    if not _worker_state:
+        _init_worker()
+
+    product = record.get('product', record)
+    product_id = product['id']
+    category = record.get('category') or product_category(product)
+
+    soft = _worker_state['kpi'].calculate_all_soft_signals(record.get('kpi_inputs', {}), category)
+    result = {
+        'product_id': product_id,
+        'soft_signals': {
+            'fit_hint_score': soft.fit_hint_score,
+            'reliability_score': soft.reliability_score,
+            'performance_score': soft.performance_score,
+            'owner_satisfaction_score': soft.owner_satisfaction_score,
+            'uniqueness_score': soft.uniqueness_score,
+            'craftsmanship_score': soft.craftsmanship_score,
+            'sustainability_score': soft.sustainability_score,
+            'innovation_score': soft.innovation_score
+        }
+    }
+
+    if 'intent_sources' in record:
+        signals = _worker_state['intent'].compute_intent_signals(
+            product_id, record['intent_sources'], as_of=_worker_state['as_of']
+        )
+        # Break share ties by name: set iteration order differs between worker processes
+        result['intent_signals'] = [
+            {'intent': s.intent, 'share': round(s.share, 4), 'confidence': round(s.confidence, 3)}
+            for s in sorted(signals, key=lambda s: (-s.share, s.intent))
+        ]
+
+    review_summary = (product.get('trust_signals') or {}).get('review_summary')
+    if review_summary:
+        verification = _worker_state['trust'].verify_review_summary(review_summary)
+        result['trust'] = {
+            'confidence': round(verification.confidence, 3),
+            'anomalies': verification.anomalies
+        }
+
+    return result
+
+
+def _score_shard(input_path: str, output_path: str) -> int:
+    """
+    Score one shard file and checkpoint it
+
+    Output is written to a temp file and renamed into place, so an existing
+    output file always means the shard completed.
+    """
+    tmp_path = output_path + '.tmp'
+    count = 0
+
+    with open(input_path) as src, open(tmp_path, 'w') as dst:
+        for line in src:
+            line_no, _, payload = line.partition('\t')
+            result = score_record(json.loads(payload))
+            dst.write(f"{line_no}\t{json.dumps(result, sort_keys=True)}\n")
+            count += 1
+
+    os.replace(tmp_path, output_path)
+    return count
+
+
+class ShardedScoringRunner:
+    """Partition a catalog by product ID hash, score shards in parallel, merge in input order"""
+
+    def __init__(self,
+                 work_dir: str,
+                 workers: Optional[int] = None,
+                 num_shards: Optional[int] = None,
+                 as_of: Optional[datetime] = None):
+        """
+        Args:
+            work_dir: Directory for shard inputs, outputs and checkpoints
+            workers: Worker processes (defaults to the CPU count)
+            num_shards: Number of shards; more shards than workers keeps
+                the pool busy when shards finish unevenly
+            as_of: Time every record is scored at (defaults to the time the
+                work dir is first partitioned; a resumed run keeps it)
+        """
+        self.work_dir = work_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.num_shards = num_shards or self.workers * 4
+        self.as_of = as_of
+
+    def run(self, input_path: str, output_path: str) -> Dict[str, int]:
+        """
+        Score input_path into output_path, resuming from completed shards
+
+        Returns:
+            Stats with records scored in this run and shards skipped as already done
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        as_of = self._partition(input_path)
+
+        pending = [
+            shard for shard in range(self.num_shards)
+            if not os.path.exists(self._shard_path(shard, 'output'))
+        ]
+
+        scored = 0
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(as_of,)) as pool:
+                futures = [
+                    pool.submit(_score_shard, self._shard_path(shard, 'input'), self._shard_path(shard, 'output'))
+                    for shard in pending
+                ]
+                for future in as_completed(futures):
+                    scored += future.result()
+
+        self._merge(output_path)
+
+        return {
+            'records_scored': scored,
+            'shards_total': self.num_shards,
+            'shards_resumed': self.num_shards - len(pending)
+        }
+
+    def _partition(self, input_path: str) -> str:
+        """
+        Split the input into shard files tagged with their line number (once per work_dir)
+
+        Returns:
+            ISO timestamp of the run, recorded with the partition so resumed runs score at the same time
+        """
+        marker = os.path.join(self.work_dir, 'partition.json')
+        source = {'input': os.path.abspath(input_path), 'size': os.path.getsize(input_path), 'shards': self.num_shards}
+        as_of = self.as_of.isoformat() if self.as_of else None
+
+        if os.path.exists(marker):
+            with open(marker) as f:
+                recorded = json.load(f)
+            run_as_of = recorded.pop('as_of')
+            if recorded != source:
+                raise ValueError(f"Work dir {self.work_dir} was partitioned for a different input or shard count")
+            if as_of and as_of != run_as_of:
+                raise ValueError(f"Work dir {self.work_dir} is scored as of {run_as_of}, not {as_of}")
+            return run_as_of
+
+        shards = [open(self._shard_path(shard, 'input'), 'w') for shard in range(self.num_shards)]
+        try:
+            with open(input_path) as src:
+                for line_no, line in enumerate(src):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    shards[shard_of(record_product_id(line), self.num_shards)].write(f"{line_no}\t{line}\n")
+        finally:
+            for f in shards:
+                f.close()
+
+        as_of = as_of or datetime.now(timezone.utc).isoformat()
+        with open(marker, 'w') as f:
+            json.dump({**source, 'as_of': as_of}, f)
+        return as_of
+
+    def _merge(self, output_path: str):
+        """K-way merge of shard outputs (each sorted by line number) back into input order"""
+        files = [open(self._shard_path(shard, 'output')) for shard in range(self.num_shards)]
+        try:
+            streams = [self._numbered_lines(f) for f in files]
+            with open(output_path, 'w') as dst:
+                for _, payload in heapq.merge(*streams):
+                    dst.write(payload)
+        finally:
+            for f in files:
+                f.close()
+
+    def _numbered_lines(self, f) -> Iterator[Tuple[int, str]]:
+        """(line_no, payload) pairs from a shard output file"""
+        for line in f:
+            line_no, _, payload = line.partition('\t')
+            yield int(line_no), payload
+
+    def _shard_path(self, shard: int, kind: str) -> str:
+        """Path of a shard's input or output file"""
+        return os.path.join(self.work_dir, f"shard-{shard:04d}.{kind}.jsonl")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point: python -m pipeline.runner INPUT OUTPUT"""
+    parser = argparse.ArgumentParser(description="Score an AXP catalog JSONL across a process pool")
+    parser.add_argument('input', help="catalog_products.jsonl-style input")
+    parser.add_argument('output', help="JSONL output, one result per input line in input order")
+    parser.add_argument('--work-dir', default=None, help="Shard/checkpoint directory (default: OUTPUT.shards)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--shards', type=int, default=None)
+    parser.add_argument('--as-of', type=datetime.fromisoformat, default=None,
+                        help="ISO time to score at (default: when the work dir is first partitioned)")
+    args = parser.parse_args(argv)
+
+    runner = ShardedScoringRunner(args.work_dir or args.output + '.shards', args.workers, args.shards, args.as_of)
+    stats = runner.run(args.input, args.output)
+    print(json.dumps(stats))
+
+
+if __name__ == '__main__':
+    main()
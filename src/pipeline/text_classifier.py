@@ -0,0 +1,255 @@
+"""
+AXP Text Intent Classifier
+Pluggable local text classification for intent_probs, batched across a worker pool with a text-hash cache
+"""
+
+import hashlib
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Iterable
+
+import numpy as np
+
+from .keyword_matcher import tokenize
+
+
+class TextClassifier(ABC):
+    """Base class for text intent classifiers (local models, remote endpoints)"""
+
+    @abstractmethod
+    def predict_proba(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Intent -> probability for each text, in input order"""
+        pass
+
+
+class HashedNGramClassifier(TextClassifier):
+    """
+    Multinomial logistic regression over hashed word n-grams (CPU only)
+
+    Word 1..ngram-grams are hashed (crc32, stable across processes) into
+    n_features buckets; a text's logits are the summed weight rows of its
+    buckets. An optional background label absorbs texts without intent
+    evidence and is left out of predictions.
+    """
+
+    def __init__(self,
+                 labels: List[str],
+                 n_features: int = 2 ** 18,
+                 ngram: int = 2,
+                 background_label: Optional[str] = None,
+                 weights: Optional[np.ndarray] = None,
+                 bias: Optional[np.ndarray] = None):
+        """
+        Args:
+            labels: Output labels (intents), including background_label if set
+            n_features: Hash buckets
+            ngram: Longest word n-gram used as a feature
+            background_label: Label meaning "no intent", omitted from predict_proba
+            weights: (n_features, len(labels)) weights; zeros if not given
+            bias: (len(labels),) bias; zeros if not given
+        """
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.ngram = ngram
+        self.background_label = background_label
+        self.weights = weights if weights is not None else np.zeros((n_features, len(self.labels)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(self.labels), dtype=np.float32)
+        self._output = [(i, label) for i, label in enumerate(self.labels) if label != background_label]
+
+    @classmethod
+    def from_keywords(cls, taxonomy: Dict[str, Iterable[str]], background_label: str = 'other',
+                      strength: float = 3.0, **kwargs) -> 'HashedNGramClassifier':
+        """
+        Bootstrap a model from a keyword taxonomy (e.g. DEFAULT_INTENT_KEYWORDS)
+
+        Each keyword's n-gram votes for its labels with the given strength;
+        texts without any keyword fall to the background label.
+        """
+        labels = list(taxonomy) + [background_label]
+        model = cls(labels, background_label=background_label, **kwargs)
+        for column, label in enumerate(taxonomy):
+            for keyword in taxonomy[label]:
+                model.weights[model._hash(' '.join(tokenize(keyword))), column] += strength
+        model.bias[-1] = strength / 2
+        return model
+
+    def features(self, text: str) -> List[int]:
+        """Hash bucket of every word n-gram in text (repeats count repeatedly)"""
+        tokens = tokenize(text)
+        buckets = [self._hash(token) for token in tokens]
+        for n in range(2, self.ngram + 1):
+            buckets.extend(self._hash(' '.join(tokens[i:i + n])) for i in range(len(tokens) - n + 1))
+        return buckets
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """(len(texts), len(labels)) logits"""
+        features = [self.features(text) for text in texts]
+        logits = np.tile(self.bias, (len(texts), 1)).astype(np.float64)
+        lengths = np.array([len(f) for f in features])
+        if lengths.sum():
+            rows = np.repeat(np.arange(len(texts)), lengths)
+            np.add.at(logits, rows, self.weights[np.concatenate([f for f in features if f])])
+        return logits
+
+    def predict_proba(self, texts: List[str]) -> List[Dict[str, float]]:
+        if not texts:
+            return []
+        probabilities = self._softmax(self.decision_function(texts))
+        return [{label: float(row[i]) for i, label in self._output} for row in probabilities]
+
+    def fit(self, texts: List[str], labels: List[str], epochs: int = 5,
+            learning_rate: float = 0.5, seed: int = 0) -> 'HashedNGramClassifier':
+        """
+        Train with plain SGD on the log loss (starting from the current weights)
+
+        Args:
+            texts: Training texts
+            labels: One label (from self.labels) per text
+            epochs: Passes over the data
+            learning_rate: Step size, divided by the number of features of each text
+            seed: Shuffling seed
+        """
+        if len(texts) != len(labels):
+            raise ValueError(f"{len(texts)} texts but {len(labels)} labels")
+        columns = {label: i for i, label in enumerate(self.labels)}
+        samples = [(np.array(self.features(text), dtype=np.int64), columns[label]) for text, label in zip(texts, labels)]
+        rng = np.random.default_rng(seed)
+
+        for _ in range(epochs):
+            for index in rng.permutation(len(samples)):
+                buckets, target = samples[index]
+                logits = self.bias + self.weights[buckets].sum(axis=0)
+                gradient = self._softmax(logits[np.newaxis])[0]
+                gradient[target] -= 1
+                step = learning_rate / max(1, len(buckets))
+                np.subtract.at(self.weights, buckets, (step * gradient).astype(self.weights.dtype))
+                self.bias -= (learning_rate * gradient).astype(self.bias.dtype)
+        return self
+
+    def save(self, path: str):
+        """Write the model as a compressed .npz archive"""
+        np.savez_compressed(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels),
+            config=np.array([self.ngram, -1 if self.background_label is None else self.labels.index(self.background_label)])
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'HashedNGramClassifier':
+        """Read a model written by save()"""
+        with np.load(path) as archive:
+            labels = [str(label) for label in archive['labels']]
+            ngram, background = (int(v) for v in archive['config'])
+            weights = archive['weights']
+            return cls(labels, weights.shape[0], ngram,
+                       labels[background] if background >= 0 else None,
+                       weights, archive['bias'])
+
+    def _hash(self, gram: str) -> int:
+        return zlib.crc32(gram.encode()) % self.n_features
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+# Classifier of each BatchTextClassifier worker process, set by _init_worker
+_worker_classifier: Dict[str, TextClassifier] = {}
+
+
+def _init_worker(classifier: TextClassifier):
+    _worker_classifier['model'] = classifier
+
+
+def _classify_batch(texts: List[str]) -> List[Dict[str, float]]:
+    return _worker_classifier['model'].predict_proba(texts)
+
+
+class BatchTextClassifier:
+    """
+    Classify texts in micro-batches across a process pool, caching by text hash
+
+    Texts already classified (by content, not identity) are served from an
+    LRU cache, so re-scoring a product never re-classifies reviews seen before.
+    Only cache misses are deduplicated, batched and sent to the workers.
+    """
+
+    def __init__(self, classifier: TextClassifier, workers: int = 0,
+                 batch_size: int = 256, max_cache_entries: int = 100000):
+        """
+        Args:
+            classifier: Model to run; must be picklable when workers > 1
+            workers: Worker processes; 0 or 1 classifies in this process
+            batch_size: Texts per micro-batch
+            max_cache_entries: Cached results kept (least recently used evicted)
+        """
+        self.classifier = classifier
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_cache_entries = max_cache_entries
+        self._cache: 'OrderedDict[bytes, Dict[str, float]]' = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    def classify(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Intent probabilities for each text, in input order"""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[Dict[str, float]]] = [None] * len(texts)
+        missing: Dict[bytes, str] = {}
+
+        for i, key in enumerate(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.setdefault(key, texts[i])
+                self.misses += 1
+            else:
+                self._cache.move_to_end(key)
+                results[i] = cached
+                self.hits += 1
+
+        if missing:
+            computed = dict(zip(missing, self._run(list(missing.values()))))
+            for key, probabilities in computed.items():
+                self._cache[key] = probabilities
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+            for i, key in enumerate(keys):
+                if results[i] is None:
+                    results[i] = computed[key]
+
+        return results
+
+    @property
+    def window_size(self) -> int:
+        """Texts per classify() call that give every worker a micro-batch"""
+        return self.batch_size * max(1, self.workers)
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'BatchTextClassifier':
+        return self
+
+    def __exit__(self, *exc: Any):
+        self.close()
+
+    def _run(self, texts: List[str]) -> List[Dict[str, float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers <= 1 or len(batches) == 1:
+            return [p for batch in batches for p in self.classifier.predict_proba(batch)]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.classifier,))
+        return [p for batch in self._pool.map(_classify_batch, batches) for p in batch]
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
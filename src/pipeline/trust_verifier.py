@@ -3,20 +3,27 @@ AXP Trust Signal Verifier
 Verification and validation of external trust signals with anti-gaming measures
 """
 
+import asyncio
 import hashlib
 import json
 import time
+import httpx
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
 import requests
 import dns.resolver
 import whois
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Callable, Iterable
+from dataclasses import dataclass, field
 from enum import Enum
 import statistics
 import math
 from urllib.parse import urlparse
 
+from .domain_age_cache import DomainAgeCache, registrable_domain
+from .review_anomalies import ReviewRateMonitor, detect_time_anomalies_batch
+
 
 class VerificationMethod(Enum):
     API = "api"
@@ -37,6 +44,7 @@ class VerificationResult:
     snapshot_hash: Optional[str]
     anomalies: List[str]
     raw_data: Optional[Dict]
+    latency_ms: Optional[float] = None  # time to verify, set by the async review checks
 
 
 @dataclass
@@ -48,12 +56,63 @@ class DomainAgeResult:
     age_score: float
     confidence: float
     sources: List[str]
+    errors: Dict[str, str] = field(default_factory=dict)  # source -> failed lookup
+
+
+# Seconds an API call may take before a cached snapshot answers instead
+REVIEW_API_DEADLINE = 2.0
+
+# Seconds an API call may take when no snapshot is cached
+REVIEW_API_TIMEOUT = 10.0
+
+# Seconds a fetched review snapshot stays usable
+SNAPSHOT_TTL_SECONDS = 86400
+
+# Review snapshots kept in memory (least recently used evicted)
+SNAPSHOT_CACHE_SIZE = 10000
+
+# Lookup failures that say nothing about the domain; never cached
+TRANSIENT_LOOKUP_ERRORS = (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException, requests.exceptions.Timeout)
+
+# Domain age sources, in lookup order
+DOMAIN_AGE_SOURCES = ['whois', 'certificate_transparency', 'dns_history', 'internet_archive']
+
+# Per-source timeout (seconds) for calculate_domain_age_async
+DOMAIN_AGE_TIMEOUTS = {
+    'whois': 10.0,
+    'certificate_transparency': 5.0,
+    'dns_history': 5.0,
+    'internet_archive': 5.0
+}
+
+# HTTP endpoints for the async lookups, e.g. 'https://crt.sh/' and
+# 'https://web.archive.org/cdx/search/cdx'; None uses the blocking lookup
+DOMAIN_AGE_ENDPOINTS: Dict[str, Optional[str]] = {
+    'certificate_transparency': None,
+    'internet_archive': None
+}
 
 
 class TrustVerifier:
     """Verify and validate trust signals from external sources"""
     
-    def __init__(self):
+    def __init__(self,
+                 domain_age_endpoints: Optional[Dict[str, Optional[str]]] = None,
+                 domain_age_timeouts: Optional[Dict[str, float]] = None,
+                 domain_age_cache: Optional[DomainAgeCache] = None,
+                 review_monitor: Optional[ReviewRateMonitor] = None,
+                 review_api_endpoints: Optional[Dict[str, str]] = None,
+                 max_snapshots: int = SNAPSHOT_CACHE_SIZE):
+        self.domain_age_endpoints = {**DOMAIN_AGE_ENDPOINTS, **(domain_age_endpoints or {})}
+        self.domain_age_timeouts = {**DOMAIN_AGE_TIMEOUTS, **(domain_age_timeouts or {})}
+        self.domain_age_cache = domain_age_cache
+        self.review_monitor = review_monitor  # online time anomalies of dated histories in verify_review_source
+        # source -> URL template with {business_id} returning review stats JSON, for the async checks
+        self.review_api_endpoints = dict(review_api_endpoints or {})
+        # (source, business) -> (fetched at, data), LRU bounded by max_snapshots
+        self._snapshots: 'OrderedDict[Tuple[str, str], Tuple[float, Dict]]' = OrderedDict()
+        self.max_snapshots = max_snapshots
+        
         self.trusted_apis = {
             'trustpilot': 'https://api.trustpilot.com/v1/',
             'google': 'https://maps.googleapis.com/maps/api/',
@@ -91,28 +150,180 @@ class TrustVerifier:
         if source.lower() in self.trusted_apis:
             try:
                 api_data = self._fetch_via_api(source, business_id)
-                
-                # Compare with expected
-                anomalies.extend(self._detect_review_anomalies(api_data, expected_stats))
-                
-                # Generate signature
-                signature = self._generate_api_signature(api_data)
-                
-                return VerificationResult(
-                    method=VerificationMethod.API,
-                    confidence=0.95 if len(anomalies) == 0 else 0.7,
-                    last_checked=datetime.now(),
-                    source_signature=signature,
-                    snapshot_hash=None,
-                    anomalies=anomalies,
-                    raw_data=api_data
-                )
+                return self._api_result(api_data, expected_stats)
                 
             except Exception as e:
                 anomalies.append(f"API verification failed: {str(e)}")
         
         # Fallback to snapshot verification
         snapshot_data = self._fetch_snapshot(source, business_id)
+        self._remember_snapshot((source.lower(), business_id), snapshot_data)
+        
+        return self._snapshot_result(source, business_id, snapshot_data, expected_stats, anomalies)
+    
+    async def verify_review_source_async(self,
+                                         source: str,
+                                         business_id: str,
+                                         expected_stats: Dict,
+                                         client: Optional[httpx.AsyncClient] = None,
+                                         executor: Optional[Executor] = None) -> VerificationResult:
+        """
+        verify_review_source with the API call and the snapshot fetch running concurrently
+        
+        Unless a snapshot of the business is cached (SNAPSHOT_TTL_SECONDS),
+        a fresh one is fetched alongside the API call. The API answer is used
+        if it arrives within REVIEW_API_DEADLINE seconds when a snapshot is
+        cached (deadline, then fallback) and REVIEW_API_TIMEOUT otherwise;
+        when it fails or is too slow, the snapshot is verified instead. The
+        result records latency_ms.
+        
+        Args:
+            source: Review platform name
+            business_id: Business identifier on platform
+            expected_stats: Expected statistics to verify
+            client: Shared HTTP client for platforms in review_api_endpoints
+            executor: Thread pool for blocking fetches, so abandoned ones never
+                hold threads of the default executor (two threads are started
+                for this call if not given)
+        """
+        if client is None and self.review_api_endpoints:
+            async with httpx.AsyncClient() as client:
+                return await self.verify_review_source_async(source, business_id, expected_stats, client, executor)
+                
+        if executor is None:
+            executor = ThreadPoolExecutor(2)
+            try:
+                return await self.verify_review_source_async(source, business_id, expected_stats, client, executor)
+            finally:
+                # An abandoned fetch finishes on its own thread
+                executor.shutdown(wait=False)
+                
+        started = time.perf_counter()
+        key = (source.lower(), business_id)
+        anomalies = []
+        snapshot_data = self._cached_snapshot(key)
+        snapshot_task = None
+        if snapshot_data is None:
+            snapshot_task = asyncio.ensure_future(self._fetch_snapshot_async(key, source, business_id, executor))
+            
+        try:
+            if key[0] in self.trusted_apis:
+                timeout = REVIEW_API_DEADLINE if snapshot_task is None else REVIEW_API_TIMEOUT
+                try:
+                    api_data = await asyncio.wait_for(
+                        self._fetch_via_api_async(source, business_id, client, executor, timeout), timeout
+                    )
+                    result = self._api_result(api_data, expected_stats)
+                    result.latency_ms = (time.perf_counter() - started) * 1000
+                    return result
+                except asyncio.TimeoutError:
+                    anomalies.append(f"API verification failed: no answer within {timeout}s")
+                except Exception as e:
+                    anomalies.append(f"API verification failed: {str(e)}")
+                    
+            if snapshot_task is not None:
+                snapshot_data = await snapshot_task
+        finally:
+            if snapshot_task is not None and not snapshot_task.done():
+                snapshot_task.cancel()
+                
+        result = self._snapshot_result(source, business_id, snapshot_data, expected_stats, anomalies)
+        result.latency_ms = (time.perf_counter() - started) * 1000
+        return result
+    
+    async def verify_review_sources_async(self,
+                                          business_ids: Dict[str, str],
+                                          expected_stats: Dict,
+                                          concurrency: int = 20) -> Dict[str, VerificationResult]:
+        """
+        Verify one business on several review platforms concurrently
+        
+        All platforms share one keep-alive HTTP client and one thread pool
+        for blocking fetches.
+        
+        Args:
+            business_ids: Review platform -> business identifier on that platform
+            expected_stats: Expected statistics to verify on every platform
+            concurrency: Platforms checked at a time
+            
+        Returns:
+            Platform -> VerificationResult, each with its latency_ms
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        # An API call and a snapshot fetch per platform in flight
+        executor = ThreadPoolExecutor(2 * concurrency)
+        
+        try:
+            async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+                async def verify(source: str, business_id: str) -> VerificationResult:
+                    async with semaphore:
+                        return await self.verify_review_source_async(
+                            source, business_id, expected_stats, client, executor
+                        )
+                        
+                results = await asyncio.gather(
+                    *(verify(source, business_id) for source, business_id in business_ids.items())
+                )
+        finally:
+            executor.shutdown(wait=False)
+            
+        return dict(zip(business_ids, results))
+    
+    def _cached_snapshot(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """Snapshot of a (source, business) fetched within SNAPSHOT_TTL_SECONDS, or None"""
+        entry = self._snapshots.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > SNAPSHOT_TTL_SECONDS:
+            del self._snapshots[key]
+            return None
+        self._snapshots.move_to_end(key)
+        return entry[1]
+    
+    def _remember_snapshot(self, key: Tuple[str, str], data: Dict):
+        """Cache a fetched snapshot, evicting the least recently used beyond max_snapshots"""
+        self._snapshots[key] = (time.time(), data)
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+    
+    async def _fetch_snapshot_async(self,
+                                    key: Tuple[str, str],
+                                    source: str,
+                                    business_id: str,
+                                    executor: Optional[Executor]) -> Dict:
+        """Fetch a snapshot on the executor and cache it"""
+        loop = asyncio.get_running_loop()
+        snapshot_data = await loop.run_in_executor(executor, self._fetch_snapshot, source, business_id)
+        self._remember_snapshot(key, snapshot_data)
+        return snapshot_data
+    
+    def _api_result(self, api_data: Dict, expected_stats: Dict) -> VerificationResult:
+        """Verification result of statistics from a platform API"""
+        # Compare with expected
+        anomalies = self._detect_review_anomalies(api_data, expected_stats)
+        
+        # Generate signature
+        signature = self._generate_api_signature(api_data)
+        
+        return VerificationResult(
+            method=VerificationMethod.API,
+            confidence=0.95 if len(anomalies) == 0 else 0.7,
+            last_checked=datetime.now(),
+            source_signature=signature,
+            snapshot_hash=None,
+            anomalies=anomalies,
+            raw_data=api_data
+        )
+    
+    def _snapshot_result(self,
+                         source: str,
+                         business_id: str,
+                         snapshot_data: Dict,
+                         expected_stats: Dict,
+                         anomalies: List[str]) -> VerificationResult:
+        """Verification result of a public data snapshot, after any API failures in anomalies"""
+        anomalies = list(anomalies)
         snapshot_hash = self._hash_snapshot(snapshot_data)
         
         # Check for anomalies
@@ -120,7 +331,11 @@ class TrustVerifier:
         
         # Time series analysis
         if 'history' in snapshot_data:
-            anomalies.extend(self._detect_time_anomalies(snapshot_data['history']))
+            if self.review_monitor is not None and all('date' in h for h in snapshot_data['history']):
+                key = f"{source.lower()}:{business_id}"
+                anomalies.extend(self.review_monitor.update_history(key, snapshot_data['history']))
+            else:
+                anomalies.extend(self._detect_time_anomalies(snapshot_data['history']))
         
         # Distribution analysis
         if 'rating_distribution' in snapshot_data:
@@ -140,6 +355,45 @@ class TrustVerifier:
             raw_data=snapshot_data
         )
     
+    def verify_review_summary(self, review_summary: Dict) -> VerificationResult:
+        """
+        Score an exported review summary (trust_signals.review_summary) offline
+
+        Runs the snapshot anomaly detectors on data already in the catalog, without
+        contacting the review platform.
+        """
+
+        total = review_summary.get('count_total', 0)
+        distribution = review_summary.get('distribution', {})
+        snapshot_data = {
+            'avg_rating': review_summary.get('avg_rating'),
+            'total_reviews': total,
+            # Exports list stars high to low; the distribution detector indexes 1..5
+            'rating_distribution': {k: distribution[k] for k in sorted(distribution, key=int)}
+        }
+        if total and 'count_verified' in review_summary:
+            snapshot_data['verified_ratio'] = review_summary['count_verified'] / total
+        if 'history' in review_summary:
+            snapshot_data['history'] = review_summary['history']
+
+        anomalies = []
+        if snapshot_data.get('verified_ratio', 1.0) < 0.3:
+            anomalies.append(f"Low verified review ratio: {snapshot_data['verified_ratio']:.1%}")
+        if 'history' in snapshot_data:
+            anomalies.extend(self._detect_time_anomalies(snapshot_data['history']))
+        if snapshot_data['rating_distribution']:
+            anomalies.extend(self._detect_distribution_anomalies(snapshot_data['rating_distribution']))
+
+        return VerificationResult(
+            method=VerificationMethod.SNAPSHOT,
+            confidence=self._calculate_confidence(anomalies, snapshot_data),
+            last_checked=datetime.now(),
+            source_signature=None,
+            snapshot_hash=self._hash_snapshot(snapshot_data),
+            anomalies=anomalies,
+            raw_data=snapshot_data
+        )
+
     def verify_certification(self, 
                            cert_type: str,
                            cert_id: str,
@@ -253,50 +507,208 @@ class TrustVerifier:
         - First SSL certificate
         - DNS history
         - Internet Archive
+        
+        Sources are queried for the registrable domain. With a
+        domain_age_cache, answers still cached are not looked up again;
+        timeouts are reported in errors but not cached.
         """
+        key = registrable_domain(domain)
+        lookups = self._domain_age_lookups()
+        found, errors, missing = self._cached_domain_age(key)
         
-        earliest_date = None
-        sources = []
+        for source in missing:
+            try:
+                first_seen, error, transient = lookups[source](key), None, False
+            except Exception as e:
+                first_seen, error = None, f"{type(e).__name__}: {e}"
+                transient = isinstance(e, TRANSIENT_LOOKUP_ERRORS)
+            self._record_domain_age(key, source, first_seen, error, found, errors, transient)
+                
+        return self._domain_age_result(domain, found, errors)
+    
+    async def calculate_domain_age_async(self,
+                                         domain: str,
+                                         client: Optional[httpx.AsyncClient] = None,
+                                         min_agreeing: int = 2,
+                                         agree_days: int = 30,
+                                         executor: Optional[Executor] = None) -> DomainAgeResult:
+        """
+        calculate_domain_age with all sources queried concurrently
         
-        # 1. WHOIS lookup
-        try:
-            w = whois.whois(domain)
-            if w.creation_date:
-                creation = w.creation_date
-                if isinstance(creation, list):
-                    creation = creation[0]
-                if creation:
-                    earliest_date = creation
-                    sources.append('whois')
-        except Exception:
-            pass
-        
-        # 2. Certificate Transparency logs
+        Every source runs under its own timeout (domain_age_timeouts), counted
+        from when its lookup starts running: time spent waiting for a pooled
+        connection or a free thread does not count. Once min_agreeing sources put the
+        earliest date within agree_days of each other, the remaining lookups
+        are cancelled and the result returned. Cached answers
+        (domain_age_cache) count without a lookup.
+        
+        Args:
+            domain: Domain to check
+            client: Shared HTTP client for sources with a configured endpoint
+            min_agreeing: Sources that must agree for an early return
+            agree_days: Maximum spread of agreeing first-seen dates
+            executor: Thread pool for blocking lookups (one thread per blocking
+                source is started for this call if not given)
+        """
+        if client is None and any(self.domain_age_endpoints.values()):
+            async with httpx.AsyncClient() as client:
+                return await self.calculate_domain_age_async(domain, client, min_agreeing, agree_days, executor)
+                
+        if executor is None:
+            executor = ThreadPoolExecutor(max(1, len(self._blocking_domain_age_sources())))
+            try:
+                return await self.calculate_domain_age_async(domain, client, min_agreeing, agree_days, executor)
+            finally:
+                # Abandoned lookups finish on their own threads
+                executor.shutdown(wait=False)
+                
+        key = registrable_domain(domain)
+        found, errors, missing = self._cached_domain_age(key)
+        if not missing or self._sources_agree(found, min_agreeing, agree_days):
+            return self._domain_age_result(domain, found, errors)
+            
+        tasks = {
+            asyncio.ensure_future(self._lookup_domain_age(source, key, client, executor)): source
+            for source in missing
+        }
+        pending = set(tasks)
         try:
-            ct_date = self._get_earliest_cert(domain)
-            if ct_date and (not earliest_date or ct_date < earliest_date):
-                earliest_date = ct_date
-                sources.append('certificate_transparency')
-        except Exception:
-            pass
-        
-        # 3. DNS history
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    first_seen, error, transient = task.result()
+                    self._record_domain_age(key, tasks[task], first_seen, error, found, errors, transient)
+                if self._sources_agree(found, min_agreeing, agree_days):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+                
+        return self._domain_age_result(domain, found, errors)
+    
+    async def calculate_domain_ages_async(self,
+                                          domains: Iterable[str],
+                                          concurrency: int = 50,
+                                          min_agreeing: int = 2,
+                                          agree_days: int = 30) -> Dict[str, DomainAgeResult]:
+        """
+        Domain ages of many domains, at most concurrency checked at a time
+        
+        All checks share one keep-alive HTTP client, and blocking lookups a
+        thread pool with a thread per blocking source of every check in flight.
+        
+        Returns:
+            Domain -> DomainAgeResult (duplicates are checked once)
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        unique = list(dict.fromkeys(domains))
+        executor = ThreadPoolExecutor(max(1, concurrency * len(self._blocking_domain_age_sources())))
+        
         try:
-            dns_date = self._get_dns_first_seen(domain)
-            if dns_date and (not earliest_date or dns_date < earliest_date):
-                earliest_date = dns_date
-                sources.append('dns_history')
-        except Exception:
-            pass
-        
-        # 4. Internet Archive
+            async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+                async def check(domain: str) -> DomainAgeResult:
+                    async with semaphore:
+                        return await self.calculate_domain_age_async(
+                            domain, client, min_agreeing, agree_days, executor
+                        )
+                        
+                results = await asyncio.gather(*(check(domain) for domain in unique))
+        finally:
+            executor.shutdown(wait=False)
+            
+        return dict(zip(unique, results))
+    
+    def _domain_age_lookups(self) -> Dict[str, Callable[[str], Optional[datetime]]]:
+        """Blocking first-seen lookup per source"""
+        return {
+            'whois': self._get_whois_creation,
+            'certificate_transparency': self._get_earliest_cert,
+            'dns_history': self._get_dns_first_seen,
+            'internet_archive': self._get_archive_first_seen
+        }
+    
+    def _blocking_domain_age_sources(self) -> List[str]:
+        """Sources looked up on a thread because no HTTP endpoint is configured"""
+        return [source for source in DOMAIN_AGE_SOURCES if not self.domain_age_endpoints.get(source)]
+    
+    async def _lookup_domain_age(self,
+                                 source: str,
+                                 domain: str,
+                                 client: Optional[httpx.AsyncClient],
+                                 executor: Optional[Executor] = None) -> Tuple[Optional[datetime], Optional[str], bool]:
+        """
+        (first-seen date, None, False) from one source, or (None, error, transient)
+        on failure; transient is True for timeouts
+        """
+        endpoint = self.domain_age_endpoints.get(source)
+        timeout = self.domain_age_timeouts[source]
         try:
-            archive_date = self._get_archive_first_seen(domain)
-            if archive_date and (not earliest_date or archive_date < earliest_date):
-                earliest_date = archive_date
-                sources.append('internet_archive')
-        except Exception:
-            pass
+            if endpoint and client is not None:
+                return await DOMAIN_AGE_FETCHERS[source](client, endpoint, domain, timeout), None, False
+                
+            # The timeout starts once a thread picks the lookup up, not while it is queued
+            loop = asyncio.get_running_loop()
+            started = loop.create_future()
+            lookup = self._domain_age_lookups()[source]
+            
+            def run() -> Optional[datetime]:
+                loop.call_soon_threadsafe(lambda: started.done() or started.set_result(None))
+                return lookup(domain)
+                
+            job = loop.run_in_executor(executor, run)
+            try:
+                await asyncio.wait({started, job}, return_when=asyncio.FIRST_COMPLETED)
+            except asyncio.CancelledError:
+                job.cancel()
+                raise
+            return await asyncio.wait_for(job, timeout), None, False
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            return None, f"TimeoutError: no answer within {timeout}s", True
+        except Exception as e:
+            return None, f"{type(e).__name__}: {e}", isinstance(e, TRANSIENT_LOOKUP_ERRORS)
+    
+    def _cached_domain_age(self, key: str) -> Tuple[Dict[str, datetime], Dict[str, str], List[str]]:
+        """(dates, errors) still cached for a registrable domain, and the sources to look up"""
+        found, errors = {}, {}
+        cached = self.domain_age_cache.get(key) if self.domain_age_cache else {}
+        for source, entry in cached.items():
+            if entry.first_seen:
+                found[source] = entry.first_seen
+            elif entry.error:
+                errors[source] = entry.error
+        return found, errors, [source for source in DOMAIN_AGE_SOURCES if source not in cached]
+    
+    def _record_domain_age(self,
+                           key: str,
+                           source: str,
+                           first_seen: Optional[datetime],
+                           error: Optional[str],
+                           found: Dict[str, datetime],
+                           errors: Dict[str, str],
+                           transient: bool = False):
+        """Add one source's answer to the result being built and, unless transient, to the cache"""
+        if first_seen:
+            found[source] = first_seen
+        elif error:
+            errors[source] = error
+        if self.domain_age_cache is not None and not transient:
+            self.domain_age_cache.put(key, source, first_seen, error)
+    
+    def _sources_agree(self, found: Dict[str, datetime], min_agreeing: int, agree_days: int) -> bool:
+        """Whether min_agreeing sources saw the domain within agree_days of the earliest date"""
+        if len(found) < min_agreeing:
+            return False
+        earliest = min(found.values())
+        window = timedelta(days=agree_days)
+        return sum(1 for first_seen in found.values() if first_seen - earliest <= window) >= min_agreeing
+    
+    def _domain_age_result(self,
+                           domain: str,
+                           found: Dict[str, datetime],
+                           errors: Optional[Dict[str, str]] = None) -> DomainAgeResult:
+        """Score the earliest first-seen date over all sources that answered"""
+        sources = [source for source in DOMAIN_AGE_SOURCES if source in found]
+        earliest_date = min(found.values()) if found else None
         
         # Calculate age and score
         if earliest_date:
@@ -321,7 +733,8 @@ class TrustVerifier:
             age_days=age_days,
             age_score=age_score,
             confidence=confidence,
-            sources=sources
+            sources=sources,
+            errors=errors or {}
         )
     
     def _detect_review_anomalies(self, actual: Dict, expected: Dict) -> List[str]:
@@ -349,34 +762,11 @@ class TrustVerifier:
         return anomalies
     
     def _detect_time_anomalies(self, history: List[Dict]) -> List[str]:
-        """Detect temporal anomalies in review history"""
-        anomalies = []
-        
+        """Detect temporal anomalies in review history (see review_anomalies for many businesses at once)"""
         if len(history) < 3:
-            return anomalies
+            return []
         
-        # Extract daily counts
-        daily_counts = [h['count'] for h in history]
-        
-        # Check for spikes
-        mean = statistics.mean(daily_counts)
-        std = statistics.stdev(daily_counts) if len(daily_counts) > 1 else 0
-        
-        for i, count in enumerate(daily_counts):
-            if std > 0 and count > mean + 3 * std:
-                anomalies.append(f"Review spike on day {i}: {count} reviews (mean: {mean:.1f})")
-        
-        # Check for clustering
-        cluster_threshold = mean * 3
-        cluster_days = 0
-        for count in daily_counts:
-            if count > cluster_threshold:
-                cluster_days += 1
-        
-        if cluster_days > len(daily_counts) * 0.1:
-            anomalies.append(f"Review clustering detected: {cluster_days} high-activity days")
-        
-        return anomalies
+        return detect_time_anomalies_batch([[h['count'] for h in history]])[0]
     
     def _detect_distribution_anomalies(self, distribution: Dict) -> List[str]:
         """Detect anomalies in rating distribution"""
@@ -426,8 +816,8 @@ class TrustVerifier:
         
         return min(1.0, max(0.1, confidence))
     
-    def _fetch_via_api(self, source: str, business_id: str) -> Dict:
-        """Fetch data via official API"""
+    def _fetch_via_api(self, source: str, business_id: str, timeout: Optional[float] = None) -> Dict:
+        """Fetch data via official API (timeout bounds the request, so a thread is never held longer)"""
         # Mock implementation
         return {
             'avg_rating': 4.5,
@@ -436,6 +826,21 @@ class TrustVerifier:
             'last_updated': datetime.now().isoformat()
         }
     
+    async def _fetch_via_api_async(self,
+                                   source: str,
+                                   business_id: str,
+                                   client: Optional[httpx.AsyncClient],
+                                   executor: Optional[Executor] = None,
+                                   timeout: Optional[float] = None) -> Dict:
+        """Fetch data via official API over the shared client (blocking fetch on executor if no endpoint is configured)"""
+        endpoint = self.review_api_endpoints.get(source.lower())
+        if endpoint and client is not None:
+            response = await client.get(endpoint.format(business_id=business_id), timeout=_request_timeout(timeout))
+            response.raise_for_status()
+            return response.json()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self._fetch_via_api, source, business_id, timeout)
+    
     def _fetch_snapshot(self, source: str, business_id: str) -> Dict:
         """Fetch snapshot of public data"""
         # Mock implementation
@@ -508,6 +913,14 @@ class TrustVerifier:
         ]
         return issuer in trusted_issuers
     
+    def _get_whois_creation(self, domain: str) -> Optional[datetime]:
+        """Get WHOIS creation date"""
+        w = whois.whois(domain)
+        creation = w.creation_date
+        if isinstance(creation, list):
+            creation = creation[0] if creation else None
+        return creation
+    
     def _get_earliest_cert(self, domain: str) -> Optional[datetime]:
         """Get earliest certificate from CT logs"""
         # Mock - in production query crt.sh or similar
@@ -524,9 +937,45 @@ class TrustVerifier:
         return datetime(2019, 3, 15)
 
 
-def both(dict1: Dict, dict2: Dict) -> bool:
-    """Helper to check if key exists in both dicts"""
-    return all(k in d for k in dict1.keys() & dict2.keys() for d in [dict1, dict2])
+def _request_timeout(timeout: Optional[float]) -> httpx.Timeout:
+    """Connect, read and write limits of one lookup; waiting for a pooled connection is not limited"""
+    return httpx.Timeout(timeout, pool=None) if timeout else httpx.Timeout(5.0)
+
+
+async def fetch_ct_first_seen(client: httpx.AsyncClient,
+                              endpoint: str,
+                              domain: str,
+                              timeout: Optional[float] = None) -> Optional[datetime]:
+    """Earliest certificate not_before from a crt.sh-compatible JSON endpoint"""
+    response = await client.get(endpoint, params={'q': domain, 'output': 'json'}, timeout=_request_timeout(timeout))
+    response.raise_for_status()
+    dates = [entry['not_before'] for entry in response.json() if entry.get('not_before')]
+    return datetime.fromisoformat(min(dates)) if dates else None
+
+
+async def fetch_archive_first_seen(client: httpx.AsyncClient,
+                                   endpoint: str,
+                                   domain: str,
+                                   timeout: Optional[float] = None) -> Optional[datetime]:
+    """First capture from a Wayback CDX-compatible endpoint"""
+    response = await client.get(endpoint, params={'url': domain, 'output': 'json', 'fl': 'timestamp', 'limit': 1},
+                                timeout=_request_timeout(timeout))
+    response.raise_for_status()
+    rows = response.json()
+    # First row is the header
+    return datetime.strptime(rows[1][0], '%Y%m%d%H%M%S') if len(rows) > 1 else None
+
+
+# Async HTTP fetchers for sources that can be pointed at an endpoint
+DOMAIN_AGE_FETCHERS = {
+    'certificate_transparency': fetch_ct_first_seen,
+    'internet_archive': fetch_archive_first_seen
+}
+
+
+def both(dict1: Dict, dict2: Dict) -> set:
+    """Keys present in both dicts"""
+    return dict1.keys() & dict2.keys()
 
 
 # Example usage
@@ -0,0 +1,9 @@
+"""
+AXP pipeline tests
+Makes the pipeline package under src/ importable
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
@@ -0,0 +1,53 @@
+"""
+AXP Pipeline Benchmarks tests
+Baseline comparison, chunked timing and the committed 10k baseline
+"""
+
+import json
+import os
+import sys
+
+REPO_DIR = os.path.join(os.path.dirname(__file__), '..', '..')
+sys.path.insert(0, REPO_DIR)
+
+from benchmarks import run
+from benchmarks.run import BENCHMARKS, compare_to_baseline
+
+
+def report(**results) -> dict:
+    return {'results': {f"{name}@10k": result for name, result in results.items()}}
+
+
+def test_regressions_beyond_tolerance_are_reported():
+    baseline = report(kpi={'throughput_per_s': 1000.0, 'peak_rss_mb': 100.0},
+                      intent={'throughput_per_s': 500.0, 'peak_rss_mb': 200.0},
+                      trust={'skipped': 'missing dependency: requests'})
+    current = report(kpi={'throughput_per_s': 790.0, 'peak_rss_mb': 119.0},
+                     intent={'throughput_per_s': 450.0, 'peak_rss_mb': 260.0},
+                     trust={'throughput_per_s': 1.0, 'peak_rss_mb': 1.0},
+                     enrichment={'throughput_per_s': 1.0, 'peak_rss_mb': 1.0})
+
+    assert compare_to_baseline(current, baseline) == [
+        'kpi@10k: throughput 790.0/s vs baseline 1000.0/s (-21.0%)',
+        'intent@10k: peak RSS 260.0 MB vs baseline 200.0 MB (+30.0%)'
+    ]
+    assert compare_to_baseline(current, baseline, tolerance=0.5) == []
+
+
+def test_timing_covers_every_chunk(monkeypatch):
+    monkeypatch.setattr(run, 'CHUNK_SIZE', 3)
+    seen = []
+    result = run._timed(range(10), seen.append)
+    assert result['items'] == 10
+    assert seen == list(range(10))
+
+
+def test_committed_baseline_covers_every_benchmark_at_10k():
+    with open(os.path.join(REPO_DIR, 'benchmarks', 'baseline.json')) as f:
+        baseline = json.load(f)
+
+    assert set(baseline['results']) == {f"{name}@10k" for name in BENCHMARKS}
+    for result in baseline['results'].values():
+        assert result['items'] == 10_000
+        assert result['throughput_per_s'] > 0 and result['peak_rss_mb'] > 0
+    assert compare_to_baseline(baseline, baseline) == []
@@ -0,0 +1,102 @@
+"""
+AXP Bundle Rules tests
+Chunked and merged co-purchase counts against a brute-force count, and mined rules
+"""
+
+import random
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from pipeline.bundle_rules import BundleRuleTable, CoPurchaseCounter
+from pipeline.intent_extractor import IntentExtractor
+
+
+CATEGORIES = ['running_shoes', 'running_socks', 'dress_shoes', 'dress_shirt', 'belt', 'hat', '']
+
+
+def random_orders(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(n):
+        items = [{'category': rng.choice(CATEGORIES)} for _ in range(rng.randint(0, 5))]
+        if rng.random() < 0.3:
+            items += [{'category': 'running_shoes'}, {'category': 'running_socks'}]
+        orders.append({'items': items})
+    return orders
+
+
+def brute_force(orders: list) -> tuple:
+    """(orders with items, category -> orders, (category, category) -> orders) by name"""
+    baskets = [{item.get('category', '') for item in order['items']} for order in orders if order['items']]
+    items = Counter(category for basket in baskets for category in basket)
+    pairs = Counter(pair for basket in baskets for pair in combinations(sorted(basket), 2))
+    return len(baskets), dict(items), dict(pairs)
+
+
+def named_counts(counter: CoPurchaseCounter) -> tuple:
+    items = {counter.categories[code]: count for code, count in counter.item_counts.items() if count}
+    pairs = {
+        tuple(sorted((counter.categories[a], counter.categories[b]))): count
+        for (a, b), count in counter.pair_counts.items() if count
+    }
+    return counter.orders, items, pairs
+
+
+def test_chunked_counts_match_brute_force():
+    orders = random_orders(3000, seed=1)
+    expected = brute_force(orders)
+
+    for chunk_lines in (1, 7, 1000, 10 ** 6):
+        counter = CoPurchaseCounter()
+        counter.add_orders(iter(orders), chunk_lines=chunk_lines)
+        assert named_counts(counter) == expected, chunk_lines
+
+
+def test_merged_shards_match_brute_force():
+    orders = random_orders(3000, seed=2)
+    shards = [CoPurchaseCounter() for _ in range(3)]
+    for i, shard in enumerate(shards):
+        # Shards see categories in different orders, so their codes differ
+        shard.add_orders(orders[i::3], chunk_lines=50 + i)
+    merged = CoPurchaseCounter()
+    merged.add_orders(orders[:0])
+    for shard in shards:
+        merged.merge(shard)
+
+    assert named_counts(merged) == brute_force(orders)
+
+
+def test_associations_and_mined_rules():
+    orders = random_orders(2000, seed=3)
+    num_orders, items, pairs = brute_force(orders)
+    counter = CoPurchaseCounter()
+    counter.add_orders(orders, chunk_lines=100)
+
+    associations = counter.associations(min_support=50)
+    assert [a['lift'] for a in associations] == sorted((a['lift'] for a in associations), reverse=True)
+    assert {tuple(sorted(a['categories'])) for a in associations} == {p for p, c in pairs.items() if c >= 50}
+    for association in associations:
+        a, b = association['categories']
+        support = pairs[tuple(sorted((a, b)))]
+        assert association['support'] == support
+        assert association['confidence'] == pytest.approx((support / items[a], support / items[b]))
+        assert association['lift'] == pytest.approx(support * num_orders / (items[a] * items[b]))
+
+    rules = counter.mine(min_support=50, min_lift=1.2)
+    assert rules.rules == {('running_shoes', 'running_socks'): {'running': 0.8, 'sport': 0.5}}
+    assert rules.match(['running_socks', 'hat', 'running_shoes']) == {'running': 0.8, 'sport': 0.5}
+    assert rules.match(['running_socks', 'hat']) == {}
+
+
+def test_mined_tables_round_trip_and_drive_bundle_analysis(tmp_path):
+    table = BundleRuleTable({('hat', 'belt'): {'fashion': 0.6}})
+    table.add('belt', 'hat', {'fashion': 0.9})
+    path = str(tmp_path / 'rules.json')
+    table.save(path)
+
+    loaded = BundleRuleTable.load(path)
+    assert loaded.rules == {('belt', 'hat'): {'fashion': 0.9}} and len(loaded) == 1
+    extractor = IntentExtractor(bundle_rules=loaded)
+    assert extractor._analyze_bundle([{'category': 'hat'}, {'category': 'belt'}]) == {'fashion': 0.9}
@@ -0,0 +1,70 @@
+"""
+AXP Category Baselines tests
+Injection of category means into scalar and batch KPI calculation, and the shared index file
+"""
+
+import json
+import warnings
+
+import numpy as np
+import pytest
+
+from pipeline import category_baselines
+from pipeline.category_baselines import CategoryBaselineCache, CategoryBaselineIndex
+from pipeline.kpi_calculator import KPICalculator
+
+
+def zero_rma_index() -> CategoryBaselineIndex:
+    return CategoryBaselineIndex.build([
+        ('cables', {'rma_count': 0, 'units_sold': 500}),
+        ('cables', {'rma_count': 0, 'units_sold': 2000}),
+        ('cables', {'rma_count': 0, 'units_sold': 800})
+    ])
+
+
+def test_zero_mean_is_not_injected():
+    index = zero_rma_index()
+    assert index.get('cables', 'rma_per_1000').mean == 0.0
+
+    assert 'category_rma_avg' not in index.inject({'rma_count': 0, 'units_sold': 500}, 'cables')
+    columns = index.inject_columns({'rma_count': np.zeros(3)}, 'cables')
+    assert np.isnan(columns['category_rma_avg']).all()
+
+
+def test_all_zero_rma_category_scores_like_no_baseline():
+    product = {'rma_count': 0, 'units_sold': 500, 'claim_count': 1}
+    with_index = KPICalculator(baselines=zero_rma_index())
+    without_index = KPICalculator()
+
+    signals = with_index.calculate_all_soft_signals(product, 'cables')
+    assert signals.reliability_score == without_index.calculate_all_soft_signals(product, 'cables').reliability_score
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        batch = with_index.calculate_batch(
+            {'rma_count': np.array([0.0, 0.0]), 'units_sold': np.array([500.0, 2000.0]), 'claim_count': np.array([1.0, 0.0])},
+            'cables'
+        )
+    assert np.isfinite(batch['reliability_score']).all()
+    assert batch['reliability_score'][0] == signals.reliability_score
+
+
+def test_cache_file_is_replaced_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / 'baselines.json')
+    CategoryBaselineCache(zero_rma_index, path).get()
+    with open(path) as f:
+        saved = f.read()
+
+    def failing_dump(payload, f):
+        f.write('{"built_at": ')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(category_baselines.json, 'dump', failing_dump)
+    with pytest.raises(OSError, match='disk full'):
+        zero_rma_index().save(path)
+    monkeypatch.undo()
+
+    with open(path) as f:
+        assert f.read() == saved
+    assert json.loads(saved)['baselines']['cables']
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['baselines.json']
@@ -0,0 +1,85 @@
+"""
+AXP Domain Age Cache tests
+Evidence and negative TTLs, persistence across connections, and registrable domains
+"""
+
+import types
+from datetime import datetime
+
+import pytest
+
+from pipeline import domain_age_cache
+from pipeline.domain_age_cache import DomainAgeCache, registrable_domain
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable unix time seen by the cache module"""
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(domain_age_cache, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_failed_and_empty_lookups_expire_after_the_negative_ttl(clock):
+    cache = DomainAgeCache(evidence_ttl_days=1, negative_ttl_seconds=60)
+    cache.put('example.com', 'whois', datetime(2019, 5, 1))
+    cache.put('example.com', 'dns_history', error='ConnectionRefusedError: refused')
+    cache.put('example.com', 'internet_archive')
+
+    assert set(cache.get('example.com')) == {'whois', 'dns_history', 'internet_archive'}
+    clock[0] += 61
+    assert set(cache.get('example.com')) == {'whois'}
+    assert cache.get('example.com')['whois'].first_seen == datetime(2019, 5, 1)
+    assert (cache.hits, cache.misses) == (5, 4)
+
+    # A retried lookup replaces the expired failure
+    cache.put('example.com', 'dns_history', datetime(2019, 5, 10))
+    clock[0] += 86400 - 61
+    assert set(cache.get('example.com')) == {'dns_history'}
+    clock[0] += 61
+    assert cache.get('example.com') == {}
+
+
+def test_entries_persist_across_connections(tmp_path, clock):
+    path = str(tmp_path / 'domains.db')
+    cache = DomainAgeCache(path, negative_ttl_seconds=60)
+    cache.put('example.com', 'whois', datetime(2019, 5, 1))
+    cache.put('example.com', 'certificate_transparency', error='HTTPStatusError: 503')
+    cache.put('other.org', 'whois')
+    cache.close()
+
+    reopened = DomainAgeCache(path, negative_ttl_seconds=60)
+    stored = reopened.get('example.com')
+    assert stored['whois'].first_seen == datetime(2019, 5, 1)
+    assert stored['certificate_transparency'].error == 'HTTPStatusError: 503'
+
+    clock[0] += 61
+    assert reopened.purge_expired() == 2
+    assert set(reopened.get('example.com')) == {'whois'}
+    assert reopened.get('other.org') == {}
+
+    reopened.invalidate('example.com')
+    assert reopened.get('example.com') == {}
+    reopened.close()
+
+
+def test_memory_lru_falls_back_to_disk(tmp_path):
+    cache = DomainAgeCache(str(tmp_path / 'domains.db'), max_memory_domains=1)
+    cache.put('a.com', 'whois', datetime(2010, 1, 1))
+    cache.put('b.com', 'whois', datetime(2011, 1, 1))
+    assert list(cache._memory) == ['b.com']
+    assert cache.get('a.com')['whois'].first_seen == datetime(2010, 1, 1)
+    assert list(cache._memory) == ['a.com']
+    cache.close()
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Shop.Example.COM', 'example.com'),
+    ('https://www.example.co.uk:8443/path?q=1', 'example.co.uk'),
+    ('a.b.example.com.', 'example.com'),
+    ('example.com/products', 'example.com'),
+    ('localhost', 'localhost'),
+    ('store.example.com.au', 'example.com.au')
+])
+def test_registrable_domain(name, expected):
+    assert registrable_domain(name) == expected
@@ -0,0 +1,106 @@
+"""
+AXP Event Intent Table tests
+The compiled dispatch table against the per-event if/elif chain it replaced
+"""
+
+import math
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from pipeline.event_intents import DEFAULT_EVENT_TO_INTENT, EventIntentTable
+from pipeline.intent_extractor import INTENT_NAMES, IntentExtractor, intent_vector
+
+
+def chain_intents(event: dict) -> dict:
+    """Intent scores of one event, as the extract_from_behavior branch chain computed them"""
+    scores = defaultdict(float)
+    event_type = event['type']
+    if event_type == 'view_size_guide':
+        scores['fashion'] += 0.3
+        scores['sport'] += 0.2
+    elif event_type == 'view_3d':
+        scores['fashion'] += 0.2
+        scores['luxury'] += 0.1
+    elif event_type == 'use_configurator':
+        scores['professional_use'] += 0.3
+        scores['hobby'] += 0.2
+    elif event_type == 'compare_products':
+        scores['value'] += 0.2
+    elif event_type == 'read_guide' and event.get('guide_type'):
+        guide = event['guide_type']
+        if 'running' in guide.lower():
+            scores['running'] += 0.5
+        elif 'basketball' in guide.lower():
+            scores['basketball'] += 0.5
+    return dict(scores)
+
+
+GUIDES = ['Running basics', 'BASKETBALL drills', 'basketball and running', 'hiking', '', None]
+EVENT_TYPES = ['view_size_guide', 'view_3d', 'use_configurator', 'compare_products', 'read_guide',
+               'read_guide', 'add_to_cart', 'page_view']
+AS_OF = datetime(2026, 6, 1)
+
+
+def random_events(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    events = []
+    for _ in range(n):
+        event = {'type': rng.choice(EVENT_TYPES),
+                 'timestamp': (AS_OF - timedelta(hours=rng.randint(0, 24 * 400))).isoformat()}
+        if event['type'] == 'read_guide' and rng.random() < 0.9:
+            event['guide_type'] = rng.choice(GUIDES)
+        events.append(event)
+    return events
+
+
+def test_each_event_resolves_like_the_chain():
+    table = EventIntentTable(DEFAULT_EVENT_TO_INTENT, INTENT_NAMES)
+    for event in random_events(500, seed=1):
+        assert table.intent_weights(event) == pytest.approx(chain_intents(event)), event
+    assert table.row({'type': 'page_view'}) == table.none_row
+
+
+def test_behavior_scores_match_the_chain():
+    extractor = IntentExtractor()
+    events = random_events(300, seed=2)
+
+    summed = defaultdict(float)
+    total_weight = 0.0
+    for event in events:
+        days_ago = (AS_OF - datetime.fromisoformat(event['timestamp'])).total_seconds() / 86400
+        decay = math.exp(-days_ago / extractor.recency_half_life_days)
+        total_weight += decay
+        for intent, score in chain_intents(event).items():
+            summed[intent] += score * decay
+    expected = extractor.normalize_source('events', intent_vector(summed), total_weight)
+
+    scores = extractor.extract_from_behavior('sku_1', iter(events), as_of=AS_OF)
+    np.testing.assert_allclose(intent_vector(scores), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_batch_scores_match_per_product_scores():
+    table = EventIntentTable(DEFAULT_EVENT_TO_INTENT, INTENT_NAMES)
+    rng = np.random.default_rng(3)
+    events = random_events(400, seed=3)
+    rows = np.array([table.row(event) for event in events])
+    products = rng.integers(0, 7, len(events))
+    weights = rng.uniform(0.1, 1.0, len(events))
+
+    batch = table.score_batch(products, rows, 7, weights)
+    for product in range(7):
+        selected = products == product
+        np.testing.assert_allclose(batch[product], table.score_rows(rows[selected], weights[selected]))
+
+
+def test_custom_tables_override_and_validate_intents():
+    extractor = IntentExtractor(event_to_intent={'share_wishlist': {'gift': 0.6}, 'read_guide:travel': {'travel': 0.4}})
+    assert extractor.event_intents.intent_weights({'type': 'share_wishlist'}) == {'gift': 0.6}
+    assert extractor.event_intents.intent_weights({'type': 'read_guide', 'guide_type': 'Travel light'}) == {'travel': 0.4}
+    assert extractor.event_intents.intent_weights({'type': 'view_size_guide'}) == {}
+
+    with pytest.raises(ValueError, match='camping'):
+        EventIntentTable({'pitch_tent': {'camping': 1.0}}, INTENT_NAMES)
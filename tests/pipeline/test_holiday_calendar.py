@@ -0,0 +1,94 @@
+"""
+AXP Holiday Calendar tests
+Per-locale gift-season bitmaps against day-by-day range checks, and timestamp parsing
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from pipeline.holiday_calendar import (
+    DEFAULT_PARENT_SEASONS, FIXED_GIFT_SEASONS, GIFT_HOLIDAYS, GiftSeasonCalendar, easter, parse_timestamp
+)
+from pipeline.intent_extractor import IntentExtractor
+
+
+def in_ranges(day: date, locale: str, lead_days: int = 21) -> bool:
+    """Gift season membership by checking every season range of the locale"""
+    holidays = GIFT_HOLIDAYS.get(locale.upper())
+    seasons = FIXED_GIFT_SEASONS + ([] if holidays else DEFAULT_PARENT_SEASONS)
+    if any(date(day.year, *first) <= day <= date(day.year, *last) for first, last in seasons):
+        return True
+    return any(
+        holiday(day.year) - timedelta(days=lead_days - 1) <= day <= holiday(day.year)
+        for holiday in (holidays or {}).values()
+    )
+
+
+def test_movable_holidays():
+    assert [easter(y) for y in (2024, 2025, 2026, 2038)] == [
+        date(2024, 3, 31), date(2025, 4, 20), date(2026, 4, 5), date(2038, 4, 25)
+    ]
+    # Mothering Sunday is three weeks before Easter
+    assert GIFT_HOLIDAYS['GB']['mothers_day'](2026) == date(2026, 3, 15)
+    assert GIFT_HOLIDAYS['GB']['mothers_day'](2025) == date(2025, 3, 30)
+    # Fete des meres moves to June when the last Sunday of May is Pentecost
+    assert GIFT_HOLIDAYS['FR']['mothers_day'](2023) == date(2023, 6, 4)
+    assert GIFT_HOLIDAYS['FR']['mothers_day'](2012) == date(2012, 6, 3)
+    assert GIFT_HOLIDAYS['FR']['mothers_day'](2024) == date(2024, 5, 26)
+    assert GIFT_HOLIDAYS['DE']['fathers_day'](2026) == date(2026, 5, 14)
+    assert GIFT_HOLIDAYS['US']['mothers_day'](2026) == date(2026, 5, 10)
+
+
+def test_locale_seasons():
+    calendar = GiftSeasonCalendar()
+
+    assert calendar.is_gift_season(date(2026, 3, 15), 'GB')
+    assert calendar.is_gift_season(date(2026, 2, 23), 'GB')
+    assert not calendar.is_gift_season(date(2026, 2, 22), 'GB')
+    assert not calendar.is_gift_season(date(2026, 3, 15), 'US')
+
+    # Without the Pentecost shift the FR season would start on 2023-05-08
+    assert not calendar.is_gift_season(date(2023, 5, 14), 'FR')
+    assert calendar.is_gift_season(date(2023, 5, 15), 'FR')
+    assert calendar.is_gift_season(date(2023, 5, 14), 'US')
+
+    assert calendar.is_gift_season(datetime(2026, 5, 31, 23, 59), 'XX')
+    assert not calendar.is_gift_season(date(2026, 6, 21))
+    assert calendar.is_gift_season(date(2024, 12, 31), 'gb') and len(calendar.bitmap('GB', 2024)) == 366
+
+
+def test_bitmaps_match_range_checks():
+    calendar = GiftSeasonCalendar()
+    for locale in list(GIFT_HOLIDAYS) + ['default']:
+        for year in range(2020, 2031):
+            day = date(year, 1, 1)
+            while day.year == year:
+                assert calendar.is_gift_season(day, locale) == in_ranges(day, locale), (locale, day)
+                day += timedelta(days=1)
+
+    short = GiftSeasonCalendar(lead_days=1)
+    assert short.is_gift_season(date(2026, 3, 15), 'GB')
+    assert not short.is_gift_season(date(2026, 3, 14), 'GB')
+
+
+def test_orders_use_their_country_or_the_extractor_locale():
+    order = {'created_at': '2026-03-10T12:00:00Z', 'items': []}
+    gb_extractor = IntentExtractor(locale='GB')
+    us_extractor = IntentExtractor(locale='US')
+    as_of = datetime(2026, 3, 20)
+
+    gb = gb_extractor.extract_from_orders('sku_1', [order], as_of=as_of)
+    assert gb['gift'] > 0
+    assert us_extractor.extract_from_orders('sku_1', [order], as_of=as_of).get('gift', 0) == 0
+    assert us_extractor.extract_from_orders('sku_1', [{**order, 'country': 'GB'}], as_of=as_of) == gb
+
+
+def test_parse_timestamp():
+    assert parse_timestamp('2026-03-10T12:00:00Z') == datetime(2026, 3, 10, 12)
+    assert parse_timestamp('2026-03-10T12:00:00z') == datetime(2026, 3, 10, 12)
+    assert parse_timestamp('2026-03-10T14:30:00+02:00') == datetime(2026, 3, 10, 12, 30)
+    assert parse_timestamp('2026-03-10T12:00:00') == datetime(2026, 3, 10, 12)
+    assert parse_timestamp('2026-03-10') == datetime(2026, 3, 10)
+    with pytest.raises(ValueError):
+        parse_timestamp('10/03/2026')
@@ -0,0 +1,143 @@
+"""
+AXP Intent Extractor tests
+Intent labels outside the IntentType taxonomy, and streaming or async data sources
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from pipeline.intent_extractor import AsyncSourceBridge, IntentExtractor, intent_vector
+from pipeline.text_classifier import HashedNGramClassifier, TextClassifier
+
+
+class FixedClassifier(TextClassifier):
+    def __init__(self, probs):
+        self.probs = probs
+
+    def predict_proba(self, texts):
+        return [dict(self.probs) for _ in texts]
+
+
+def test_unknown_labels_raise_instead_of_being_dropped():
+    with pytest.raises(ValueError, match='camping'):
+        intent_vector({'gift': 0.5, 'camping': 0.5})
+    with pytest.raises(ValueError, match='camping'):
+        IntentExtractor(intent_keywords={'camping': ['tent']})
+    with pytest.raises(ValueError, match='camping'):
+        IntentExtractor().set_intent_keywords({'camping': ['tent']})
+    with pytest.raises(ValueError, match='camping'):
+        IntentExtractor(text_classifier=HashedNGramClassifier.from_keywords({'camping': ['tent']}))
+
+    extractor = IntentExtractor(text_classifier=FixedClassifier({'gift': 0.4, 'camping': 0.6}))
+    with pytest.raises(ValueError, match='camping'):
+        extractor.compute_intent_signals('sku_1', {'texts': [{'text': 'a tent'}]})
+
+
+def test_known_labels_and_background_label_are_accepted():
+    model = HashedNGramClassifier.from_keywords({'gift': ['gift'], 'travel': ['trip']})
+    extractor = IntentExtractor(text_classifier=model)
+    signals = extractor.compute_intent_signals('sku_1', {'texts': [{'text': 'a gift for a trip'}]})
+    assert abs(sum(s.share for s in signals) - 1.0) < 1e-9
+
+
+def test_batch_scans_order_products_like_python_strings():
+    from pipeline.intent_extractor import SQL_BATCH_QUERIES
+
+    for name, query in SQL_BATCH_QUERIES.items():
+        assert 'product_id::text' in query and query.rstrip().endswith('COLLATE "C"'), name
+
+
+AS_OF = datetime(2026, 6, 1)
+
+DATA_SOURCES = {
+    'orders': [
+        {'created_at': '2026-05-20T10:00:00Z', 'gift_wrap': True, 'items': [{'category': 'socks'}]},
+        {'created_at': '2025-12-10T10:00:00Z', 'items': [{'category': 'shoes'}, {'category': 'running_shorts'}]},
+        {'created_at': '2026-02-01T10:00:00Z', 'items': []}
+    ],
+    'returns': [{'reason': 'size_issue', 'created_at': '2026-04-01T00:00:00Z'}, {'reason': 'quality_expectation'}],
+    'events': [
+        {'type': 'read_guide', 'guide_type': 'running', 'timestamp': '2026-05-30T08:00:00Z'},
+        {'type': 'view_size_guide', 'timestamp': '2026-05-29T08:00:00Z'},
+        {'type': 'add_to_wishlist', 'timestamp': '2026-03-01T08:00:00Z'}
+    ],
+    'texts': [
+        {'text': 'Bought as a birthday gift', 'verified_purchase': True, 'created_at': '2026-05-01T00:00:00Z'},
+        {'text': 'Great for my daily commute to the office', 'source': 'q_and_a', 'created_at': '2026-01-01T00:00:00Z'}
+    ],
+    'acquisitions': [
+        {'utm_campaign': 'holiday_gifts', 'utm_term': 'gift for runner', 'landing_page': '/products/running',
+         'timestamp': '2026-05-15T00:00:00Z'}
+    ]
+}
+
+
+def shares(signals) -> dict:
+    return {s.intent: (s.share, s.confidence) for s in signals}
+
+
+class OnePass:
+    """Iterable that fails when iterated twice or asked for its length"""
+
+    def __init__(self, records):
+        self.records = records
+        self.used = False
+
+    def __iter__(self):
+        assert not self.used, 'source iterated twice'
+        self.used = True
+        return iter(self.records)
+
+
+def test_generators_and_one_pass_iterables_match_lists():
+    extractor = IntentExtractor()
+    expected = shares(extractor.compute_intent_signals('sku_1', DATA_SOURCES, as_of=AS_OF))
+
+    generators = {name: (record for record in records) for name, records in DATA_SOURCES.items()}
+    assert shares(extractor.compute_intent_signals('sku_1', generators, as_of=AS_OF)) == expected
+    one_pass = {name: OnePass(records) for name, records in DATA_SOURCES.items()}
+    assert shares(extractor.compute_intent_signals('sku_1', one_pass, as_of=AS_OF)) == expected
+    assert all(source.used for source in one_pass.values())
+
+
+def test_async_sources_match_lists():
+    extractor = IntentExtractor()
+    expected = shares(extractor.compute_intent_signals('sku_1', DATA_SOURCES, as_of=AS_OF))
+
+    async def stream(records):
+        for record in records:
+            await asyncio.sleep(0)
+            yield record
+
+    async def check():
+        mixed = {name: stream(records) for name, records in DATA_SOURCES.items() if name != 'returns'}
+        mixed['returns'] = iter(DATA_SOURCES['returns'])
+        return await extractor.compute_intent_signals_async('sku_1', mixed, chunk_size=2, as_of=AS_OF)
+
+    assert shares(asyncio.run(check())) == expected
+
+
+def test_async_bridge_buffers_one_chunk_at_a_time():
+    produced = []
+
+    async def records():
+        for i in range(10):
+            produced.append(i)
+            yield {'i': i}
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        bridge = AsyncSourceBridge(records(), loop, chunk_size=4)
+        assert next(bridge) == {'i': 0}
+        assert len(produced) == 4
+        assert [record['i'] for record in bridge] == list(range(1, 10))
+        assert list(bridge) == []
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
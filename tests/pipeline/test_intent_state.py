@@ -0,0 +1,98 @@
+"""
+AXP Incremental Intent State tests
+Incremental decayed sums against a full recompute of the same records
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pipeline.intent_extractor import IntentExtractor
+from pipeline.intent_state import IntentDecayState, IntentStateStore
+
+
+def iso(value: datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def shares(signals) -> dict:
+    return {signal.intent: signal.share for signal in signals}
+
+
+def assert_equivalent(data_sources: dict):
+    extractor = IntentExtractor()
+    state = IntentDecayState(extractor)
+    store = IntentStateStore(':memory:', extractor)
+    for source, records in data_sources.items():
+        for record in records:
+            state.apply(source, {**record, 'product_id': 'sku_1'})
+            store.apply(source, {**record, 'product_id': 'sku_1'})
+
+    as_of = datetime.now(timezone.utc)
+    full = shares(extractor.compute_intent_signals('sku_1', data_sources, since_days=100000, as_of=as_of))
+    for incremental in (state.signals('sku_1', as_of), store.signals('sku_1', as_of)):
+        assert shares(incremental) == pytest.approx(full, abs=1e-6)
+    return full
+
+
+def test_undated_returns_match_full_recompute():
+    full = assert_equivalent({
+        'returns': [{'reason': 'quality_expectation'}, {'reason': 'quality_expectation'}, {'reason': 'size_issue'}]
+    })
+    assert max(full, key=full.get) == 'professional_use'
+
+
+def test_mixed_dated_and_undated_texts_match_full_recompute():
+    now = datetime.now(timezone.utc)
+    assert_equivalent({
+        'texts': [
+            {'text': 'Bought as a gift for my husband'},
+            {'text': 'A gift for my sister, she loved it'},
+            {'text': 'Perfect for travel, fits in my carry-on', 'created_at': iso(now - timedelta(days=200))},
+            {'text': 'Took it on vacation', 'created_at': iso(now - timedelta(days=90))}
+        ],
+        'orders': [{'gift_wrap': True, 'items': [], 'created_at': iso(now - timedelta(days=10))}]
+    })
+
+
+def test_default_as_of_is_utc_now(monkeypatch):
+    monkeypatch.setenv('TZ', 'America/Los_Angeles')
+    time.tzset()
+    try:
+        now = datetime.now(timezone.utc)
+        data_sources = {
+            'orders': [{'gift_wrap': True, 'items': [], 'created_at': iso(now - timedelta(days=1))}],
+            'texts': [{'text': 'Perfect for travel', 'created_at': iso(now - timedelta(hours=2))}]
+        }
+        extractor = IntentExtractor()
+        state = IntentDecayState(extractor)
+        for source, records in data_sources.items():
+            for record in records:
+                state.apply(source, {**record, 'product_id': 'sku_1'})
+
+        expected = shares(extractor.compute_intent_signals('sku_1', data_sources, as_of=now))
+        assert shares(extractor.compute_intent_signals('sku_1', data_sources)) == pytest.approx(expected, abs=1e-6)
+        assert shares(state.signals('sku_1')) == pytest.approx(expected, abs=1e-6)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_unknown_intents_are_rejected_before_they_are_stored(tmp_path):
+    path = str(tmp_path / 'intents.db')
+    store = IntentStateStore(path)
+    state = IntentDecayState()
+    good = {'product_id': 1, 'text': 'a gift', 'intent_probs': {'gift': 0.5}}
+    bad = {'product_id': 1, 'text': 'a gift', 'intent_probs': {'bogus': 0.5}}
+    for target in (store, state):
+        target.apply('texts', good)
+        with pytest.raises(ValueError, match='bogus'):
+            target.apply('texts', bad)
+    store.close()
+
+    reopened = IntentStateStore(path)
+    assert reopened.signals('1')[0].intent == 'gift'
+    assert state.signals('1')[0].intent == 'gift'
+    assert list(state.products) == ['1']
+    reopened.close()
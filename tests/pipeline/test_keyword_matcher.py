@@ -0,0 +1,69 @@
+"""
+AXP Keyword Matcher tests
+Whole-word and phrase matching against a regex reference
+"""
+
+import random
+import re
+
+from pipeline.intent_extractor import DEFAULT_INTENT_KEYWORDS
+from pipeline.keyword_matcher import KeywordMatcher
+
+
+def reference_counts(taxonomy: dict, text: str) -> dict:
+    """Distinct keywords per label found by one word-boundary regex per keyword"""
+    counts = {}
+    for label, keywords in taxonomy.items():
+        found = {
+            keyword for keyword in keywords
+            if re.search(r'(?<!\w)' + r'[\W_]+'.join(map(re.escape, keyword.split())) + r'(?!\w)', text, re.I)
+        }
+        if found:
+            counts[label] = len(found)
+    return counts
+
+
+def test_keywords_match_whole_words_only():
+    matcher = KeywordMatcher(DEFAULT_INTENT_KEYWORDS)
+
+    assert matcher.label_counts('Homework after my workout') == {'sport': 1}
+    assert matcher.label_counts('Gifts and presents, presently') == {}
+    assert matcher.label_counts('A GIFT-wrapped present! Worn daily at work.') == {
+        'gift': 2, 'professional_use': 2, 'daily_commute': 1
+    }
+    assert matcher.label_counts('“gift”—for the office…') == {'gift': 1, 'professional_use': 1}
+    assert matcher.label_counts('gift gift gift') == {'gift': 1}
+
+
+def test_phrases_match_across_separators_but_not_gaps():
+    matcher = KeywordMatcher({
+        'travel': ['carry on', 'carry-on bag', 'new york'],
+        'city': ['new york city', 'york'],
+        'gift': ['carry on']
+    })
+
+    assert matcher.label_counts('My Carry-On fits the overhead bin') == {'travel': 1, 'gift': 1}
+    assert matcher.label_counts('carry on bag') == {'travel': 2, 'gift': 1}
+    assert matcher.label_counts('carry the bag on') == {}
+    assert matcher.label_counts('New York City trip') == {'travel': 1, 'city': 2}
+    assert matcher.label_counts('newyork yorkshire') == {}
+    assert sorted(matcher.keywords[i] for i in matcher.find('new york, carry on')) == ['carry on', 'new york', 'york']
+
+
+def test_random_texts_match_the_regex_reference():
+    taxonomy = {**DEFAULT_INTENT_KEYWORDS, 'travel': DEFAULT_INTENT_KEYWORDS['travel'] + ['carry on', 'road trip']}
+    matcher = KeywordMatcher(taxonomy)
+    words = [w for keywords in taxonomy.values() for keyword in keywords for w in keyword.split()]
+    words += ['homework', 'gifts', 'runner', 'a', 'the', 'for', 'my_trip', 'workouts', 'stylish']
+    separators = [' ', ' ', ', ', '. ', '-', '! ', ' (', ') ', '\n', '/', "'"]
+
+    rng = random.Random(11)
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(0, 12)):
+            word = rng.choice(words)
+            parts.append(word.upper() if rng.random() < 0.1 else word)
+            # Occasionally glue words together ('giftwork' matches neither)
+            parts.append('' if rng.random() < 0.05 else rng.choice(separators))
+        text = ''.join(parts)
+        assert matcher.label_counts(text) == reference_counts(taxonomy, text), text
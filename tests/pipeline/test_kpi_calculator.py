@@ -0,0 +1,224 @@
+"""
+AXP KPI Calculator tests
+Set-based SQL loading of catalog KPI inputs, evidence storage, and memoized, clock-injected runs
+"""
+
+import math
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from pipeline.kpi_calculator import (
+    SQL_KPI_BATCH_QUERIES, EvidenceStore, KPIBatchLoader, KPICalculator, KPIEvidence, KPIMemoCache
+)
+from pipeline.kpi_formulas import FIT_HINT_FORMULA, SCORE_NAMES, default_formula_registry
+
+
+RUN_TIME = datetime(2026, 5, 1, 12, 0)
+
+FOOTWEAR_PRODUCT = {
+    'returns_total': 40, 'returns_size': 12, 'exchanges_size': 5, 'purchases_total': 900,
+    'purchases_with_advisor': 300, 'reviews_with_fit': 120, 'reviews_fit_positive': 95,
+    'claim_count': 6, 'rma_count': 4, 'units_sold': 2500, 'avg_days_to_claim': 200,
+    'reviews_durability_avg': 4.2, 'cushioning_index': 0.7, 'energy_return_percent': 62, 'weight_grams': 280,
+    'avg_rating': 4.4, 'avg_rating_verified': 4.5, 'review_count_total': 400, 'review_count_verified': 300,
+    'csat_product': 4.3, 'csat_responses': 80, 'sentiment_90d': 0.7, 'sentiment_prev_90d': 0.6,
+    'repeat_purchase_rate': 0.2, 'rare_feature_count': 2, 'total_feature_count': 10,
+    'material_grade': 'premium', 'craftsmanship_mention_rate': 0.1,
+    'sustainability_certifications': ['bluesign', 'fsc'], 'recycled_content_percent': 30,
+    'patent_count': 1, 'new_feature_count': 2
+}
+
+
+BATCH_COLUMNS = {
+    'fit_metrics': ['product_id', 'returns_total', 'returns_size', 'exchanges_size',
+                    'purchases_total', 'purchases_with_advisor', 'reviews_with_fit', 'reviews_fit_positive'],
+    'reliability_metrics': ['product_id', 'claim_count', 'rma_count', 'avg_days_to_claim',
+                            'units_sold', 'category_rma_avg', 'reviews_durability_avg'],
+    'satisfaction_metrics': ['product_id', 'avg_rating', 'avg_rating_verified', 'review_count_total',
+                             'review_count_verified', 'csat_product', 'csat_responses',
+                             'sentiment_90d', 'sentiment_prev_90d', 'repeat_purchase_rate']
+}
+
+
+def catalog_rows(num_products: int) -> dict:
+    """Rows of each batch query, ordered by product id, with some NULL cells"""
+    rng = np.random.default_rng(7)
+    rows = {name: [] for name in BATCH_COLUMNS}
+    for product_id in range(1, num_products + 1):
+        for name, columns in BATCH_COLUMNS.items():
+            row = [product_id]
+            for column in columns[1:]:
+                if rng.random() < 0.15:
+                    row.append(None)
+                elif column.startswith(('avg_rating', 'csat_product')):
+                    row.append(round(float(rng.uniform(1, 5)), 2))
+                elif column.startswith(('sentiment', 'repeat', 'reviews_durability')):
+                    row.append(round(float(rng.uniform(0, 1)), 3))
+                else:
+                    row.append(int(rng.integers(0, 400)))
+            rows[name].append(tuple(row))
+    return rows
+
+
+class FakeCursor:
+    """DB-API cursor over canned rows for one SQL_KPI_BATCH_QUERIES entry"""
+
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.name = name
+        self.description = None
+        self._rows = []
+
+    def execute(self, query, params):
+        (query_name,) = [name for name, sql in SQL_KPI_BATCH_QUERIES.items() if sql == query]
+        self.connection.executed.append((self.name, query_name, params))
+        self.description = [(column,) for column in BATCH_COLUMNS[query_name]]
+        self._rows = [
+            row for row in self.connection.rows[query_name]
+            if params['all_products'] or row[0] in params['product_ids']
+        ]
+
+    def fetchmany(self, size):
+        chunk, self._rows = self._rows[:size], self._rows[size:]
+        return chunk
+
+    def close(self):
+        self.connection.closed += 1
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+        self.closed = 0
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+
+def test_batch_loader_scores_like_one_product_at_a_time():
+    rows = catalog_rows(25)
+    connection = FakeConnection(rows)
+    calculator = KPICalculator()
+    loader = KPIBatchLoader(connection, chunk_size=10)
+
+    scored = list(loader.iter_scores(calculator))
+    assert [len(ids) for ids, _ in scored] == [10, 10, 5]
+    assert [name for name, _, _ in connection.executed] == [f'axp_kpi_{name}' for name in SQL_KPI_BATCH_QUERIES]
+    assert connection.closed == 3
+
+    for ids, scores in scored:
+        for i, product_id in enumerate(ids):
+            product_data = {}
+            for name, columns in BATCH_COLUMNS.items():
+                row = rows[name][product_id - 1]
+                product_data.update({c: v for c, v in zip(columns[1:], row[1:]) if v is not None})
+            expected = calculator.calculate_all_soft_signals(product_data, 'general')
+            for field, values in scores.items():
+                assert values[i] == pytest.approx(getattr(expected, field), abs=1e-9), (product_id, field)
+
+
+def test_batch_loader_filters_and_checks_alignment():
+    rows = catalog_rows(6)
+    connection = FakeConnection(rows)
+    chunks = list(KPIBatchLoader(connection, server_side=False).iter_chunks([2, 5]))
+
+    assert [ids for ids, _ in chunks] == [[2, 5]]
+    assert all(name is None for name, _, _ in connection.executed)
+    columns = chunks[0][1]
+    for i, product_id in enumerate([2, 5]):
+        raw = rows['satisfaction_metrics'][product_id - 1][1]
+        assert math.isnan(columns['avg_rating'][i]) if raw is None else columns['avg_rating'][i] == raw
+
+    rows['reliability_metrics'] = rows['reliability_metrics'][1:]
+    with pytest.raises(ValueError, match='misaligned'):
+        list(KPIBatchLoader(FakeConnection(rows)).iter_chunks())
+
+
+def test_evidence_store_compares_and_indexes_like_the_evidence_list():
+    calculator = KPICalculator(clock=lambda: RUN_TIME)
+    evidence = calculator.calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear').evidence
+
+    expected = []
+    for name in SCORE_NAMES:
+        calculate = getattr(calculator, f'calculate_{name}_score')
+        args = (FOOTWEAR_PRODUCT, 'footwear') if name == 'performance' else (FOOTWEAR_PRODUCT,)
+        expected.extend(calculate(*args)[1].to_list())
+
+    assert len(evidence) == len(expected) > len(SCORE_NAMES)
+    assert evidence == expected and expected == evidence
+    assert list(evidence) == expected == evidence.to_list()
+    assert evidence[-1] == expected[-1]
+    assert evidence[3:7] == expected[3:7]
+    assert all(isinstance(e, KPIEvidence) and e.timestamp == RUN_TIME for e in evidence)
+
+    assert evidence != expected[:-1]
+    assert evidence != [replace(expected[0], value=expected[0].value + 1)] + expected[1:]
+
+    copied = EvidenceStore(RUN_TIME)
+    copied.extend(evidence)
+    assert copied == evidence
+    copied.add('extra_factor', 1.0, 'test', 0.5)
+    assert copied[-1] == KPIEvidence('extra_factor', 1.0, 'test', 0.5, RUN_TIME)
+    assert copied != evidence
+
+
+def ticking_clock():
+    """A clock that advances one minute per call"""
+    ticks = iter(range(10 ** 6))
+    return lambda: RUN_TIME + timedelta(minutes=next(ticks))
+
+
+def test_fixed_clock_runs_are_identical():
+    first = KPICalculator(clock=lambda: RUN_TIME).calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear')
+    again = KPICalculator(clock=lambda: RUN_TIME).calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear')
+    assert first == again
+    assert first.last_updated == RUN_TIME
+
+
+def test_memo_hits_until_a_consumed_input_or_formula_changes(tmp_path):
+    memo = KPIMemoCache()
+    calculator = KPICalculator(clock=ticking_clock(), memo=memo)
+
+    first = calculator.calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear')
+    assert first.input_hash == calculator.input_hash(FOOTWEAR_PRODUCT, 'footwear')
+    assert calculator.calculate_all_soft_signals(dict(FOOTWEAR_PRODUCT), 'footwear') is first
+    # Fields no formula reads do not change the hash
+    assert calculator.calculate_all_soft_signals({**FOOTWEAR_PRODUCT, 'title': 'Runner'}, 'footwear') is first
+    assert (memo.hits, memo.misses) == (2, 1)
+
+    changed = calculator.calculate_all_soft_signals({**FOOTWEAR_PRODUCT, 'returns_size': 30}, 'footwear')
+    other_category = calculator.calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'electronics')
+    assert len({first.input_hash, changed.input_hash, other_category.input_hash}) == 3
+    assert changed.fit_hint_score < first.fit_hint_score
+    assert changed.last_updated > first.last_updated
+    assert (memo.hits, memo.misses) == (2, 3)
+
+    registry = default_formula_registry()
+    registry.register(FIT_HINT_FORMULA.with_weights(advisor_usage_rate=0.8))
+    recalibrated = KPICalculator(formulas=registry, clock=ticking_clock(), memo=memo)
+    assert recalibrated.input_hash(FOOTWEAR_PRODUCT, 'footwear') != first.input_hash
+    assert recalibrated.calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear').fit_hint_score > first.fit_hint_score
+
+    path = str(tmp_path / 'memo.json')
+    memo.save(path)
+    reloaded = KPICalculator(clock=ticking_clock(), memo=KPIMemoCache.load(path))
+    restored = reloaded.calculate_all_soft_signals(FOOTWEAR_PRODUCT, 'footwear')
+    assert restored == first and restored is not first
+    assert reloaded.memo.hits == 1
+
+
+def test_memo_evicts_the_least_recently_used():
+    memo = KPIMemoCache(max_entries=2)
+    calculator = KPICalculator(clock=lambda: RUN_TIME, memo=memo)
+    products = [{**FOOTWEAR_PRODUCT, 'returns_total': total} for total in (10, 20, 30)]
+
+    a, b = (calculator.calculate_all_soft_signals(p) for p in products[:2])
+    assert calculator.calculate_all_soft_signals(products[0]) is a
+    calculator.calculate_all_soft_signals(products[2])
+    assert len(memo) == 2
+    assert memo.get(a.input_hash) is a
+    assert memo.get(b.input_hash) is None
@@ -0,0 +1,117 @@
+"""
+AXP KPI Formulas tests
+Flag inputs in the scalar and batch evaluators, and registered formula specs
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from pipeline.kpi_calculator import KPICalculator
+from pipeline.kpi_formulas import (
+    FIT_HINT_FORMULA, FormulaColumns, FormulaEvidence, FormulaInput, FormulaSpec, default_formula_registry
+)
+
+
+def test_nan_and_none_flags_are_false():
+    columns = FormulaColumns({'a': np.array([np.nan, 0.0, 1.0, 2.0]), 'b': np.array([None, True, False, 1], dtype=object)}, 4)
+    assert columns.flag('a').tolist() == [0.0, 0.0, 1.0, 1.0]
+    assert columns.flag('b').tolist() == [0.0, 1.0, 0.0, 1.0]
+
+
+def test_missing_flag_scores_like_absent_field():
+    calculator = KPICalculator()
+    batch = calculator.calculate_batch({
+        'is_limited_edition': np.array([np.nan, 1.0]),
+        'sustainable_packaging': np.array([np.nan, 0.0]),
+        'uses_cutting_edge_tech': np.array([np.nan, 1.0])
+    })
+    absent = calculator.calculate_all_soft_signals({})
+    with_nan = calculator.calculate_all_soft_signals({'is_limited_edition': math.nan, 'uses_cutting_edge_tech': math.nan})
+    for score in ('uniqueness_score', 'sustainability_score', 'innovation_score'):
+        assert batch[score][0] == getattr(absent, score) == getattr(with_nan, score)
+    assert batch['uniqueness_score'][1] > batch['uniqueness_score'][0]
+
+
+def test_list_columns_match_the_scalar_path():
+    calculator = KPICalculator()
+    for certifications in ([['fsc'], ['fsc', 'gots'], []], [['fsc', 'gots'], ['fsc', 'bci'], ['a', 'b']]):
+        batch = calculator.calculate_batch({'sustainability_certifications': certifications})
+        expected = [
+            calculator.calculate_all_soft_signals({'sustainability_certifications': c}).sustainability_score
+            for c in certifications
+        ]
+        assert batch['sustainability_score'].tolist() == expected
+
+
+GADGET_INNOVATION_FORMULA = FormulaSpec(
+    score='innovation',
+    inputs=[
+        FormulaInput('tier', 0.1, kind='lookup', table={'gold': 1.0, 'silver': 0.5}),
+        FormulaInput('tags', kind='count'),
+        FormulaInput('featured', kind='flag'),
+        FormulaInput('rating', 3.0)
+    ],
+    factors={
+        'tag_score': 'min(1.0, tags / 4)',
+        'rating_score': '_where(rating > 4, 1.0, rating / 5)'
+    },
+    weights={'tier': 0.4, 'tag_score': 0.3, 'featured': 0.1, 'rating_score': 0.2},
+    normalization='capped',
+    evidence=[FormulaEvidence('tag_score', 'tag_score', 'catalog', 'min(1.0, tags / 2)')]
+)
+
+
+def test_category_formulas_override_the_default_in_both_paths():
+    registry = default_formula_registry()
+    version = registry.version
+    registry.register(GADGET_INNOVATION_FORMULA, category='gadgets')
+    registry.register(FIT_HINT_FORMULA.with_weights(advisor_usage_rate=0.8), category='footwear')
+    assert registry.version != version
+
+    products = [
+        {'tier': 'gold', 'tags': ['a', 'b', 'c'], 'featured': True, 'rating': 4.5,
+         'purchases_with_advisor': 40, 'purchases_total': 100},
+        {'tier': 'bronze', 'tags': [], 'rating': 2.0, 'purchases_with_advisor': 5, 'purchases_total': 100},
+        {}
+    ]
+    categories = ['gadgets', 'footwear', 'general']
+    calculator = KPICalculator(formulas=registry)
+    columns = {
+        'tier': np.array([p.get('tier') for p in products], dtype=object),
+        'tags': [p.get('tags', []) for p in products],
+        'featured': np.array([p.get('featured', np.nan) for p in products], dtype=np.float64),
+        'rating': np.array([p.get('rating', np.nan) for p in products]),
+        'purchases_with_advisor': np.array([p.get('purchases_with_advisor', np.nan) for p in products]),
+        'purchases_total': np.array([p.get('purchases_total', np.nan) for p in products])
+    }
+    batch = calculator.calculate_batch(columns, np.array(categories, dtype=object))
+
+    for i, (product, category) in enumerate(zip(products, categories)):
+        signals = calculator.calculate_all_soft_signals(product, category)
+        for score, values in batch.items():
+            assert values[i] == getattr(signals, score), (category, score)
+
+    gadget = calculator.calculate_all_soft_signals(products[0], 'gadgets')
+    assert gadget.innovation_score == round(0.4 * 1.0 + 0.3 * 0.75 + 0.1 + 0.2, 3)
+    assert any(e.factor == 'tag_score' and e.source == 'catalog' and e.confidence == 1.0 for e in gadget.evidence)
+
+    default = KPICalculator()
+    assert calculator.calculate_all_soft_signals(products[1], 'footwear').fit_hint_score > \
+        default.calculate_all_soft_signals(products[1], 'footwear').fit_hint_score
+    assert calculator.calculate_all_soft_signals(products[1], 'general').fit_hint_score == \
+        default.calculate_all_soft_signals(products[1], 'general').fit_hint_score
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError, match='Unknown weight terms'):
+        FIT_HINT_FORMULA.with_weights(bogus=1.0)
+
+    registry = default_formula_registry()
+    registry.register(FormulaSpec(score='innovation', inputs=[], factors={'one': '1.0'}, weights={'one': 1.0},
+                                  normalization='tanh'))
+    with pytest.raises(ValueError, match='Unknown normalization'):
+        registry.resolve('innovation')
+    with pytest.raises(KeyError):
+        registry.resolve('durability')
@@ -0,0 +1,86 @@
+"""
+AXP Incremental KPI State tests
+Repeat buyers counted by distinct orders and bounded by the windows
+"""
+
+import random
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from pipeline.kpi_state import KPIAccumulator
+
+
+def line(order_id, customer_id, created_at, quantity=1):
+    return {'product_id': 'p1', 'order_id': order_id, 'customer_id': customer_id,
+            'created_at': created_at, 'quantity': quantity}
+
+
+def test_repeat_buyers_need_two_distinct_orders():
+    accumulator = KPIAccumulator()
+    accumulator.apply_order(line('o1', 'alice', '2026-01-05', quantity=3))
+    accumulator.apply_order(line('o1', 'alice', '2026-01-05'))
+    accumulator.apply_order(line('o2', 'bob', '2026-01-06'))
+    accumulator.apply_order(line('o3', 'bob', '2026-02-01'))
+
+    data = accumulator.build_product_data('p1', date(2026, 3, 1))
+    assert data['repeat_purchase_rate'] == 0.5
+
+
+def test_customers_are_pruned_with_their_buckets(tmp_path):
+    accumulator = KPIAccumulator()
+    accumulator.apply_order(line('o1', 'alice', '2024-01-05'))
+    accumulator.apply_order(line('o2', 'alice', '2024-02-05'))
+    accumulator.apply_order(line('o3', 'bob', '2026-01-05'))
+    accumulator.emit(date(2026, 3, 10))
+
+    path = str(tmp_path / 'kpi.json')
+    accumulator.save(path)
+    loaded = KPIAccumulator.load(path)
+    assert loaded.build_product_data('p1', date(2026, 3, 10))['repeat_purchase_rate'] == 0.0
+    assert list(loaded.products['p1'].customer_orders) == [date(2026, 1, 5).toordinal()]
+
+
+def test_multi_line_orders_count_once():
+    accumulator = KPIAccumulator()
+    accumulator.apply_order({**line('o1', 'alice', '2026-01-05', quantity=2), 'used_size_guide': False})
+    accumulator.apply_order({**line('o1', 'alice', '2026-01-05'), 'used_size_guide': True})
+    accumulator.apply_order(line('o2', 'bob', '2026-01-06'))
+
+    data = accumulator.build_product_data('p1', date(2026, 3, 1))
+    assert data['purchases_total'] == 2
+    assert data['purchases_with_advisor'] == 1
+    assert accumulator.build_product_data('p1', date(2026, 3, 1))['units_sold'] == 4
+
+
+def test_running_windows_match_a_full_scan():
+    rng = random.Random(7)
+    accumulator = KPIAccumulator()
+    start = date(2024, 1, 1).toordinal()
+    today = start
+    for step in range(3000):
+        today += rng.choice([0, 0, 0, 1, 1, 3, 40])
+        created_at = date.fromordinal(today - rng.randint(-5, 800)).isoformat()
+        if rng.random() < 0.5:
+            accumulator.apply_order(line(f'o{rng.randint(0, 400)}', f'c{rng.randint(0, 30)}', created_at))
+        else:
+            accumulator.apply_review({'product_id': 'p1', 'created_at': created_at, 'rating': rng.randint(1, 5),
+                                      'sentiment_score': rng.random()})
+        if step % 50 == 0:
+            accumulator.emit(date.fromordinal(today))
+
+        state = accumulator.products['p1']
+        for max_age, min_age in ((90, 0), (180, 0), (365, 0), (730, 0), (180, 91)):
+            for counter in ('orders', 'units', 'reviews', 'rating_sum', 'sentiment_sum'):
+                expected = sum(bucket.get(counter, 0.0) for day, bucket in state.buckets.items()
+                               if min_age <= today - day <= max_age)
+                assert state.window_sum(counter, today, max_age, min_age) == pytest.approx(expected, abs=1e-9)
+
+        orders = defaultdict(set)
+        for day, customers in state.customer_orders.items():
+            if 0 <= today - day <= 730:
+                for customer_id, order_ids in customers.items():
+                    orders[customer_id] |= order_ids
+        expected_rate = sum(len(o) > 1 for o in orders.values()) / len(orders) if orders else None
+        assert state.repeat_rate(today) == expected_rate
@@ -0,0 +1,108 @@
+"""
+AXP Quantile Sketches tests
+KLL rank error against exact ranks, shard merges, and percentile injection
+"""
+
+import json
+
+import numpy as np
+
+from pipeline.kpi_calculator import KPICalculator
+from pipeline.quantile_sketch import CategorySketchIndex, KLLSketch
+
+
+# 1.7/k for the default k=200 is 0.85%; allow some slack for the coin flips
+RANK_ERROR = 0.02
+
+
+def stream(n: int, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).lognormal(3.0, 1.0, n)
+
+
+def max_rank_error(sketch: KLLSketch, values: np.ndarray) -> float:
+    exact = np.sort(values)
+    probes = np.quantile(exact, np.linspace(0.001, 0.999, 199))
+    true_ranks = np.searchsorted(exact, probes, side='right') / len(exact)
+    return float(np.max(np.abs(sketch.ranks(probes) - true_ranks)))
+
+
+def retained(sketch: KLLSketch) -> int:
+    return sum(len(c) for c in sketch.compactors)
+
+
+def test_rank_and_quantile_error_is_bounded():
+    values = stream(100_000)
+    sketch = KLLSketch()
+    sketch.extend(values)
+
+    assert sketch.n == len(values)
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+    assert retained(sketch) < 1_000
+    assert max_rank_error(sketch, values) < RANK_ERROR
+
+    exact = np.sort(values)
+    for q in (0.1, 0.25, 0.5, 0.9, 0.99):
+        true_rank = np.searchsorted(exact, sketch.quantile(q), side='right') / len(exact)
+        assert abs(true_rank - q) < RANK_ERROR
+    assert sketch.rank(float(values[0])) == sketch.ranks(np.array([values[0]]))[0]
+
+
+def test_merged_shards_match_the_whole_stream():
+    values = stream(80_000, seed=2)
+    shards = [KLLSketch(seed=i) for i in range(8)]
+    for i, shard in enumerate(shards):
+        shard.extend(values[i::8])
+    merged = KLLSketch(seed=99)
+    for shard in shards:
+        merged.merge(shard)
+    merged.merge(KLLSketch())
+
+    assert merged.n == len(values)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+    assert retained(merged) < 1_000
+    assert max_rank_error(merged, values) < RANK_ERROR
+
+
+def test_restored_sketch_ranks_and_updates_like_the_original():
+    values = stream(20_000, seed=3)
+    sketch = KLLSketch(seed=5)
+    sketch.extend(values[:10_000])
+
+    restored = KLLSketch.from_dict(json.loads(json.dumps(sketch.to_dict())), seed=5)
+    probes = np.array([5.0, 20.0, 60.0, np.nan])
+    np.testing.assert_array_equal(restored.ranks(probes), sketch.ranks(probes))
+
+    restored.extend(values[10_000:])
+    assert restored.n == 20_000
+    assert max_rank_error(restored, values) < RANK_ERROR
+    assert KLLSketch().quantile(0.5) is None and KLLSketch().rank(1.0) == 0.0
+
+
+def test_percentiles_are_injected_in_both_paths():
+    prices = stream(5_000, seed=4)
+    index = CategorySketchIndex.build(
+        [('footwear', {'price': p}) for p in prices] + [('electronics', {'price': 10 * p}) for p in prices[:500]]
+    )
+    shard = CategorySketchIndex.build([('footwear', {'price': p}) for p in prices[:2_500]])
+    assert index.get('footwear', 'price').n == 5_000
+    assert shard.merge(CategorySketchIndex.build([('footwear', {'price': p}) for p in prices[2_500:]])) \
+        .get('footwear', 'price').n == 5_000
+
+    median = float(np.median(prices))
+    assert abs(index.percentile(median, 'footwear', 'price') - 50) < 100 * RANK_ERROR
+    assert index.percentile(median, 'electronics', 'price') < 10
+    assert index.percentile(median, 'toys', 'price') is None
+
+    calculator = KPICalculator(sketches=index)
+    high = float(np.quantile(prices, 0.9))
+    products = [{'price': high}, {'price': high, 'price_percentile_category': 20.0}, {}]
+    batch = calculator.calculate_batch(
+        {'price': np.array([high, high, np.nan]), 'price_percentile_category': np.array([np.nan, 20.0, np.nan])},
+        'footwear'
+    )
+    for i, product in enumerate(products):
+        assert batch['uniqueness_score'][i] == calculator.calculate_all_soft_signals(product, 'footwear').uniqueness_score
+    assert len(set(batch['uniqueness_score'].tolist())) == 3
+    assert index.inject(products[0], 'footwear')['price_percentile_category'] == \
+        index.percentile(high, 'footwear', 'price')
+    assert index.inject(products[1], 'footwear') is products[1]
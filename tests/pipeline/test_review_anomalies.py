@@ -0,0 +1,66 @@
+"""
+AXP Review Anomalies tests
+Online spike and clustering detection on rolling, dated review histories
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from pipeline.review_anomalies import ReviewRateMonitor, detect_time_anomalies_batch
+
+
+def dated(counts, start: date = date(2026, 1, 1)):
+    return [{'date': (start + timedelta(days=i)).isoformat(), 'count': int(c)} for i, c in enumerate(counts)]
+
+
+def test_rolling_snapshots_fold_new_days_and_keep_reporting():
+    history = dated(np.random.default_rng(1).poisson(10, 31))
+    history[30]['count'] = 90
+    monitor = ReviewRateMonitor()
+
+    assert monitor.update_history('trustpilot:b1', history[:30]) == []
+    first = monitor.update_history('trustpilot:b1', history[1:31])
+    assert len(first) == 1 and first[0].startswith('Review spike on 2026-01-31: 90 reviews')
+    # Re-verifying the same snapshot reports the same state
+    assert monitor.update_history('trustpilot:b1', history[1:31]) == first
+
+
+def test_undated_history_is_rejected():
+    with pytest.raises(ValueError):
+        ReviewRateMonitor().update_history('trustpilot:b1', [{'count': 3}] * 30)
+
+
+def test_spikes_leave_the_report_after_the_window():
+    history = dated([10] * 20 + [90] + [10] * 40)
+    monitor = ReviewRateMonitor(spike_window_days=30)
+    assert len(monitor.update_history('k', history[:45])) == 1
+    assert monitor.update_history('k', history) == []
+
+
+@pytest.mark.parametrize('rate,max_spikes,max_clustered', [(10, 0.3, 0.01), (2, 0.3, 0.02)])
+def test_steady_poisson_rates_are_rarely_flagged(rate, max_spikes, max_clustered):
+    rng = np.random.default_rng(0)
+    spikes = clustered = 0
+    for business in range(1000):
+        monitor = ReviewRateMonitor()
+        anomalies = monitor.update_history('k', dated(rng.poisson(rate, 30)))
+        spikes += sum(a.startswith('Review spike') for a in anomalies)
+        clustered += monitor.states['k'].clustered
+    assert spikes / 1000 < max_spikes
+    assert clustered / 1000 < max_clustered
+
+
+def test_save_and_load_keep_reported_anomalies(tmp_path):
+    monitor = ReviewRateMonitor()
+    monitor.update_history('k', dated([10] * 20 + [90]))
+    monitor.save(str(tmp_path / 'monitor.json'))
+    loaded = ReviewRateMonitor.load(str(tmp_path / 'monitor.json'))
+    assert loaded.anomalies('k') == monitor.anomalies('k') != []
+
+
+def test_batch_messages_quote_the_history_values():
+    history = [10, 11.5, 9, 10, 12, 10, 11, 9, 10] * 3 + [90]
+    assert detect_time_anomalies_batch([history])[0][0].startswith('Review spike on day 27: 90 reviews')
+    assert detect_time_anomalies_batch(np.array([history]))[0][0].startswith('Review spike on day 27: 90.0 reviews')
@@ -0,0 +1,37 @@
+"""
+AXP Text Intent Classifier tests
+Micro-batches of streamed texts spread over the worker pool
+"""
+
+from typing import Dict, List
+
+from pipeline.intent_extractor import IntentExtractor
+from pipeline.text_classifier import BatchTextClassifier, HashedNGramClassifier
+
+
+class RecordingBatchClassifier(BatchTextClassifier):
+    """Records the micro-batches each classify() call hands to _run"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.runs: List[int] = []
+
+    def _run(self, texts: List[str]) -> List[Dict[str, float]]:
+        self.runs.append(-(-len(texts) // self.batch_size))
+        return super()._run(texts)
+
+
+def texts(n: int) -> List[Dict]:
+    return [{'text': f'review {i}: a gift for my sister, great for running'} for i in range(n)]
+
+
+def test_streamed_texts_fill_every_worker():
+    model = HashedNGramClassifier.from_keywords({'gift': ['gift'], 'sport': ['running']})
+    with RecordingBatchClassifier(model, workers=2, batch_size=8) as pooled:
+        extractor = IntentExtractor(text_classifier=pooled)
+        signals = extractor.compute_intent_signals('sku_1', {'texts': texts(40)})
+
+    assert pooled.runs == [2, 2, 1]
+    local = IntentExtractor(text_classifier=BatchTextClassifier(model, batch_size=8))
+    expected = local.compute_intent_signals('sku_1', {'texts': texts(40)})
+    assert [(s.intent, round(s.share, 9)) for s in signals] == [(s.intent, round(s.share, 9)) for s in expected]
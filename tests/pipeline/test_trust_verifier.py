@@ -0,0 +1,228 @@
+"""
+AXP Trust Verifier tests
+Domain age lookups against a local stub server, and online review monitoring of snapshots
+"""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('requests')
+pytest.importorskip('dns.resolver')
+pytest.importorskip('whois')
+
+from pipeline.domain_age_cache import DomainAgeCache
+from pipeline import trust_verifier
+from pipeline.trust_verifier import TrustVerifier, VerificationMethod
+
+
+LOOKUP_SECONDS = 0.5
+
+
+async def handle_stub(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Keep-alive HTTP/1.1 stub: crt.sh-, Wayback CDX- and review API-style answers after LOOKUP_SECONDS, /hang never answers"""
+    try:
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            path = head.split(b' ', 2)[1]
+            if path.startswith(b'/hang'):
+                await asyncio.sleep(3600)
+            await asyncio.sleep(LOOKUP_SECONDS)
+            if path.startswith(b'/ct'):
+                payload = [{'not_before': '2019-05-20T00:00:00'}, {'not_before': '2021-01-01T00:00:00'}]
+            elif path.startswith(b'/reviews'):
+                payload = {'avg_rating': 4.4, 'total_reviews': 321, 'verified_ratio': 0.9}
+            else:
+                payload = [['timestamp'], ['20190601000000']]
+            body = json.dumps(payload).encode()
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                         b'Content-Length: %d\r\n\r\n%s' % (len(body), body))
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+
+@pytest.fixture(scope='module')
+def stub_url():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(handle_stub, '127.0.0.1', 0, backlog=1024))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+
+    async def stop():
+        server.close()
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+class SlowVerifier(TrustVerifier):
+    """Blocking WHOIS and DNS lookups that take LOOKUP_SECONDS"""
+
+    def _get_whois_creation(self, domain):
+        time.sleep(LOOKUP_SECONDS)
+        return datetime(2019, 5, 1)
+
+    def _get_dns_first_seen(self, domain):
+        time.sleep(LOOKUP_SECONDS)
+        return datetime(2019, 5, 10)
+
+
+def test_batch_timeouts_do_not_count_queueing(stub_url):
+    verifier = SlowVerifier(
+        domain_age_endpoints={'certificate_transparency': stub_url + '/ct', 'internet_archive': stub_url + '/cdx'},
+        domain_age_timeouts={source: 2.0 for source in ('whois', 'certificate_transparency', 'dns_history', 'internet_archive')}
+    )
+    domains = [f'shop{i}.example.com' for i in range(200)]
+    results = asyncio.run(verifier.calculate_domain_ages_async(domains, concurrency=50, min_agreeing=4))
+
+    assert len(results) == 200
+    for result in results.values():
+        assert result.errors == {}
+        assert len(result.sources) == 4
+
+
+def test_blocking_sources_time_out_while_running():
+    verifier = SlowVerifier(domain_age_timeouts={'whois': 0.1, 'dns_history': 0.1})
+    result = asyncio.run(verifier.calculate_domain_age_async('example.com', min_agreeing=4))
+
+    assert 'TimeoutError' in result.errors['whois']
+    assert 'TimeoutError' in result.errors['dns_history']
+    assert result.sources == ['certificate_transparency', 'internet_archive']
+
+
+def test_early_return_cancels_slow_sources(stub_url):
+    verifier = TrustVerifier(
+        domain_age_endpoints={'certificate_transparency': stub_url + '/hang', 'internet_archive': stub_url + '/hang'}
+    )
+
+    async def check():
+        started = time.perf_counter()
+        result = await verifier.calculate_domain_age_async('example.com', min_agreeing=1)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(check())
+    assert elapsed < 1
+    assert result.sources == ['dns_history']
+
+
+
+def test_timeouts_are_not_cached(stub_url):
+    cache = DomainAgeCache()
+    verifier = TrustVerifier(
+        domain_age_endpoints={'certificate_transparency': stub_url + '/hang', 'internet_archive': stub_url + '/cdx'},
+        domain_age_timeouts={'certificate_transparency': 0.2},
+        domain_age_cache=cache
+    )
+    result = asyncio.run(verifier.calculate_domain_age_async('example.com', min_agreeing=4))
+
+    assert 'TimeoutError' in result.errors['certificate_transparency']
+    assert 'certificate_transparency' not in cache.get('example.com')
+    assert 'internet_archive' in cache.get('example.com')
+
+
+def test_sync_timeouts_are_not_cached():
+    class TimingOutVerifier(TrustVerifier):
+        def _get_whois_creation(self, domain):
+            raise TimeoutError('whois timed out')
+
+        def _get_dns_first_seen(self, domain):
+            raise ConnectionRefusedError('refused')
+
+    cache = DomainAgeCache()
+    result = TimingOutVerifier(domain_age_cache=cache).calculate_domain_age('www.example.com')
+
+    assert set(result.errors) == {'whois', 'dns_history'}
+    cached = cache.get('example.com')
+    assert 'whois' not in cached
+    assert cached['dns_history'].error == 'ConnectionRefusedError: refused'
+
+
+def test_reverifying_a_snapshot_keeps_monitor_anomalies():
+    from pipeline.review_anomalies import ReviewRateMonitor
+
+    history = [{'date': f'2026-01-{day:02d}', 'count': 10 + day % 3} for day in range(1, 31)]
+    history[-1]['count'] = 90
+    snapshot = {'avg_rating': 4.2, 'total_reviews': 400, 'history': history}
+    verifier = TrustVerifier(review_monitor=ReviewRateMonitor())
+
+    first = verifier._snapshot_result('trustpilot', 'b1', snapshot, {}, [])
+    again = verifier._snapshot_result('trustpilot', 'b1', snapshot, {}, [])
+    assert any(a.startswith('Review spike on 2026-01-30') for a in first.anomalies)
+    assert again.anomalies == first.anomalies
+    assert again.confidence == first.confidence
+
+
+class SlowSnapshotVerifier(TrustVerifier):
+    """Snapshot fetches that take LOOKUP_SECONDS, recording the HTTP client of every API call"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.clients = []
+
+    def _fetch_snapshot(self, source, business_id):
+        time.sleep(LOOKUP_SECONDS)
+        return super()._fetch_snapshot(source, business_id)
+
+    async def _fetch_via_api_async(self, source, business_id, client, executor=None, timeout=None):
+        self.clients.append(client)
+        return await super()._fetch_via_api_async(source, business_id, client, executor, timeout)
+
+
+def test_review_sources_share_a_client_and_fall_back_to_snapshots(stub_url, monkeypatch):
+    monkeypatch.setattr(trust_verifier, 'REVIEW_API_TIMEOUT', 1.0)
+    verifier = SlowSnapshotVerifier(review_api_endpoints={
+        'trustpilot': stub_url + '/reviews/{business_id}',
+        'google': stub_url + '/hang/{business_id}'
+    })
+
+    async def check():
+        started = time.perf_counter()
+        results = await verifier.verify_review_sources_async({'trustpilot': 't1', 'google': 'g1'}, {})
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(check())
+    assert results['trustpilot'].method == VerificationMethod.API
+    assert results['trustpilot'].raw_data['total_reviews'] == 321
+    assert results['google'].method == VerificationMethod.SNAPSHOT
+    assert results['google'].anomalies[0] == 'API verification failed: no answer within 1.0s'
+    # The google snapshot was fetched while its API call hung
+    assert elapsed < 1.0 + LOOKUP_SECONDS
+    for result in results.values():
+        assert 0 < result.latency_ms < elapsed * 1000
+    assert len(verifier.clients) == 2 and verifier.clients[0] is verifier.clients[1]
+
+
+def test_cached_snapshot_is_the_fallback_after_the_deadline(stub_url, monkeypatch):
+    monkeypatch.setattr(trust_verifier, 'REVIEW_API_DEADLINE', 0.2)
+    verifier = SlowSnapshotVerifier(review_api_endpoints={'google': stub_url + '/hang/{business_id}'})
+    verifier.verify_review_source('yelp', 'y1', {})
+
+    cached = verifier._snapshots[('yelp', 'y1')][1]
+    verifier._snapshots[('google', 'g1')] = (time.time(), cached)
+    result = asyncio.run(verifier.verify_review_source_async('google', 'g1', {}))
+    assert result.method == VerificationMethod.SNAPSHOT
+    assert result.anomalies[0] == 'API verification failed: no answer within 0.2s'
+    assert result.latency_ms < 200 + LOOKUP_SECONDS * 1000
+
+
+def test_snapshot_cache_is_a_bounded_lru_with_ttl():
+    verifier = TrustVerifier(max_snapshots=2)
+    for business_id in ('a', 'b'):
+        verifier.verify_review_source('yelp', business_id, {})
+    assert verifier._cached_snapshot(('yelp', 'a')) is not None
+    verifier.verify_review_source('yelp', 'c', {})
+    assert list(verifier._snapshots) == [('yelp', 'a'), ('yelp', 'c')]
+
+    fetched_at, data = verifier._snapshots[('yelp', 'a')]
+    verifier._snapshots[('yelp', 'a')] = (fetched_at - trust_verifier.SNAPSHOT_TTL_SECONDS - 1, data)
+    assert verifier._cached_snapshot(('yelp', 'a')) is None
+    assert list(verifier._snapshots) == [('yelp', 'c')]